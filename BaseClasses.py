@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import collections
+import dis
 import functools
 import logging
 import random
 import secrets
+import threading
+import types
 import warnings
 from argparse import Namespace
 from collections import Counter, deque, defaultdict
@@ -93,6 +96,12 @@ class MultiWorld():
     start_hints: Dict[int, Options.StartHints]
     start_location_hints: Dict[int, Options.StartLocationHints]
     item_links: Dict[int, Options.ItemLinks]
+    entrance_dependencies: EntranceDependencies
+    stage_times: Dict[str, Dict[Union[int, str], float]]
+    """seconds spent per world stage, keyed by stage name and then by player or world type"""
+    _sphere_walk: Optional[Tuple[Tuple[Any, ...], SphereWalk]]
+    _sendable_spheres: Optional[Tuple[SphereWalk, List[Set[Location]]]]
+    _sphere_walk_lock: threading.Lock
 
     plando_item_blocks: Dict[int, List[PlandoItemBlock]]
 
@@ -166,6 +175,11 @@ class MultiWorld():
         self.early_items = {player: {} for player in self.player_ids}
         self.local_early_items = {player: {} for player in self.player_ids}
         self.indirect_connections = {}
+        self.entrance_dependencies = EntranceDependencies(self)
+        self.stage_times = {}
+        self._sphere_walk = None
+        self._sendable_spheres = None
+        self._sphere_walk_lock = threading.Lock()
         self.start_inventory_from_pool: Dict[int, Options.StartInventoryPool] = {}
         self.plando_item_blocks = {}
 
@@ -581,6 +595,23 @@ class MultiWorld():
 
         return False
 
+    def get_sphere_walk(self) -> SphereWalk:
+        """
+        Returns the spheres of all filled locations, walked once for the current item placement and shared by
+        get_spheres, get_sendable_spheres, fulfills_accessibility and the spoiler playthrough.
+        Its state is shared as well, so it may only be read through SphereWalk.copy_state.
+        """
+        placement = (tuple((location, location.item, location.item.advancement)
+                           for location in self.get_filled_locations()),
+                     frozenset(id(item) for items in self.precollected_items.values() for item in items),
+                     tuple(world.explicit_indirect_conditions for world in self.worlds.values()))
+        with self._sphere_walk_lock:
+            if self._sphere_walk and self._sphere_walk[0] == placement:
+                return self._sphere_walk[1]
+            sphere_walk = SphereWalk(self, self.get_filled_locations())
+            self._sphere_walk = placement, sphere_walk
+            return sphere_walk
+
     def get_spheres(self) -> Iterator[Set[Location]]:
         """
         yields a set of locations for each logical sphere
@@ -589,24 +620,12 @@ class MultiWorld():
         locations is followed by an empty set, and then a set of all of the
         unreachable locations.
         """
-        state = CollectionState(self)
-        locations = set(self.get_filled_locations())
-
-        while locations:
-            sphere: Set[Location] = set()
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
-            yield sphere
-            if not sphere:
-                if locations:
-                    yield locations  # unreachable locations
-                break
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-            locations -= sphere
+        sphere_walk = self.get_sphere_walk()
+        for sphere in sphere_walk.spheres:
+            yield set(sphere)
+        if sphere_walk.unreachable:
+            yield set()
+            yield set(sphere_walk.unreachable)
 
     def get_sendable_spheres(self) -> Iterator[Set[Location]]:
         """
@@ -615,46 +634,23 @@ class MultiWorld():
         If there are unreachable locations, the last sphere of reachable locations is followed by an empty set,
         and then a set of all of the unreachable locations.
         """
-        state = CollectionState(self)
-        locations: Set[Location] = set()
-        events: Set[Location] = set()
-        for location in self.get_filled_locations():
-            if type(location.item.code) is int and type(location.address) is int:
-                locations.add(location)
-            else:
-                events.add(location)
-
-        while locations:
-            sphere: Set[Location] = set()
-
-            # cull events out
-            done_events: Set[Union[Location, None]] = {None}
-            while done_events:
-                done_events = set()
-                for event in events:
-                    if event.can_reach(state):
-                        state.collect(event.item, True, event)
-                        done_events.add(event)
-                events -= done_events
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
-
-            yield sphere
-            if not sphere:
-                if locations:
-                    yield locations  # unreachable locations
-                break
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-            locations -= sphere
+        def is_event(location: Location) -> bool:
+            return not (type(location.item.code) is int and type(location.address) is int)
+
+        sphere_walk = self.get_sphere_walk()
+        with self._sphere_walk_lock:
+            if not self._sendable_spheres or self._sendable_spheres[0] is not sphere_walk:
+                self._sendable_spheres = sphere_walk, sphere_walk.regroup(is_event)
+            spheres = self._sendable_spheres[1]
+        for sphere in spheres:
+            yield set(sphere)
+        unreachable = {location for location in sphere_walk.unreachable if not is_event(location)}
+        if unreachable:
+            yield set()
+            yield unreachable
 
     def fulfills_accessibility(self, state: Optional[CollectionState] = None):
         """Check if accessibility rules are fulfilled with current or supplied state."""
-        if not state:
-            state = CollectionState(self)
         players: Dict[str, Set[int]] = {
             "minimal": set(),
             "items": set(),
@@ -682,8 +678,36 @@ class MultiWorld():
                 return False  # still locations required to be collected
             return True
 
+        def unreachable() -> Literal[False]:
+            """Report the relevant locations that could not be reached"""
+            if __debug__:
+                from Fill import FillError
+                raise FillError(
+                    f"Could not access required locations for accessibility check. Missing: {locations}",
+                    multiworld=self,
+                )
+            # ran out of places and did not finish yet, quit
+            logging.warning(f"Could not access required locations for accessibility check."
+                            f" Missing: {locations}")
+            return False
+
         locations = [location for location in self.get_locations() if location_relevant(location)]
 
+        if not state:
+            if not locations:
+                return False
+            # relevant locations hold all advancement items, so they reach the same as a walk of all filled ones
+            sphere_walk = self.get_sphere_walk()
+            final_state = sphere_walk.copy_state()
+            locations = [location for location in locations if location in sphere_walk.unreachable or
+                         not location.item and not location.can_reach(final_state)]
+            beatable_fulfilled = self.has_beaten_game(final_state)
+            if all_done():
+                return True
+            if locations:
+                return unreachable()
+            return False
+
         while locations:
             sphere: List[Location] = []
             for n in range(len(locations) - 1, -1, -1):
@@ -691,16 +715,7 @@ class MultiWorld():
                     sphere.append(locations.pop(n))
 
             if not sphere:
-                if __debug__:
-                    from Fill import FillError
-                    raise FillError(
-                        f"Could not access required locations for accessibility check. Missing: {locations}",
-                        multiworld=self,
-                    )
-                # ran out of places and did not finish yet, quit
-                logging.warning(f"Could not access required locations for accessibility check."
-                                f" Missing: {locations}")
-                return False
+                return unreachable()
 
             for location in sphere:
                 if location.item:
@@ -717,9 +732,265 @@ class MultiWorld():
 
 PathValue = Tuple[str, Optional["PathValue"]]
 
+# CollectionState methods that only read the prog_items of the player they are given
+_item_query_methods = frozenset((
+    "has", "has_all", "has_any", "has_all_counts", "has_any_count", "count", "has_from_list", "has_from_list_unique",
+    "count_from_list", "count_from_list_unique", "has_group", "has_group_unique", "count_group", "count_group_unique",
+))
+_item_group_query_methods = frozenset(("has_group", "has_group_unique", "count_group", "count_group_unique"))
+# bytecode that can't create new values, so every item name a rule can query is one of its constants
+_item_query_opnames = frozenset((
+    "RESUME", "NOP", "CACHE", "EXTENDED_ARG", "NOT_TAKEN", "COPY_FREE_VARS", "LOAD_DEREF", "LOAD_CONST",
+    "LOAD_SMALL_INT", "LOAD_ATTR", "LOAD_METHOD", "PUSH_NULL", "KW_NAMES", "PRECALL", "CALL", "CALL_KW",
+    "COMPARE_OP", "IS_OP", "CONTAINS_OP", "UNARY_NOT", "TO_BOOL", "COPY", "SWAP", "POP_TOP", "BUILD_TUPLE",
+    "BUILD_LIST", "BUILD_SET", "BUILD_MAP", "BUILD_CONST_KEY_MAP", "LIST_EXTEND", "SET_UPDATE", "RETURN_VALUE",
+    "RETURN_CONST",
+))
+
+
+class EntranceDependencies:
+    """
+    Cache of which item names each Entrance's access_rule can depend on, used by CollectionState to only re-evaluate
+    blocked connections that could have been unblocked by the items collected since the last region update.
+
+    Rules that cannot be analysed map to None and are always re-evaluated, same as before.
+    """
+    multiworld: MultiWorld
+    rules: Dict[Entrance, Tuple[Callable[[CollectionState], bool], Optional[Region], Optional[FrozenSet[str]]]]
+    location_rules: Dict[Location, Tuple[Callable[[CollectionState], bool], Optional[FrozenSet[str]]]]
+    epoch: int
+    """Incremented whenever an already analysed Entrance is found with a different access_rule or connected_region,
+    which invalidates the incremental updates of every CollectionState that evaluated it before the change."""
+
+    def __init__(self, multiworld: MultiWorld) -> None:
+        self.multiworld = multiworld
+        self.rules = {}
+        self.location_rules = {}
+        self.epoch = 0
+
+    def get(self, entrance: Entrance) -> Optional[FrozenSet[str]]:
+        """Returns the item names the access_rule of entrance can depend on, or None if it has to be re-evaluated
+        on every region update."""
+        rule = entrance.access_rule
+        connected_region = entrance.connected_region
+        cached = self.rules.get(entrance, None)
+        if cached is not None:
+            if self.same_rule(cached[0], rule) and cached[1] is connected_region:
+                return cached[2]
+            self.epoch += 1
+        # partial entrances stay blocked regardless of their rule until they get connected
+        dependencies = self.analyse(rule, entrance.player) if connected_region else None
+        self.rules[entrance] = rule, connected_region, dependencies
+        return dependencies
+
+    def get_location(self, location: Location) -> Optional[FrozenSet[str]]:
+        """Returns the item names the access_rule of location can depend on, or None if it can't be analysed."""
+        rule = location.access_rule
+        cached = self.location_rules.get(location, None)
+        if cached is not None and self.same_rule(cached[0], rule):
+            return cached[1]
+        dependencies = self.analyse(rule, location.player)
+        self.location_rules[location] = rule, dependencies
+        return dependencies
+
+    @staticmethod
+    def same_rule(cached_rule: Callable[[CollectionState], bool], rule: Callable[[CollectionState], bool]) -> bool:
+        # == instead of is, as bound methods are created on each attribute access
+        if cached_rule == rule:
+            return True
+        # a rule tree from worlds.generic.Rules replaces its stub with its compiled function on first use
+        rule_tree = getattr(rule, "rule", None)
+        return rule_tree is not None and getattr(cached_rule, "rule", None) is rule_tree
+
+    def analyse(self, rule: Callable[[CollectionState], bool], player: int) -> Optional[FrozenSet[str]]:
+        """
+        Conservatively determines the item names of player that rule can read, by inspecting its code.
+        Only plain functions that exclusively call item queries on the state, such as
+        `lambda state: state.has("Hookshot", player)`, can be analysed.
+        """
+        # rule trees from worlds.generic.Rules, or functions compiled from them
+        rule_tree = rule if hasattr(rule, "item_dependencies") else getattr(rule, "rule", None)
+        if hasattr(rule_tree, "item_dependencies"):
+            return rule_tree.item_dependencies(player, lambda leaf: self.analyse(leaf, player))
+        if type(rule) is not types.FunctionType:
+            return None
+        code = rule.__code__
+        names = frozenset(code.co_names)
+        if not names <= _item_query_methods | {"player"}:
+            return None  # globals, attribute access or calls to anything other than item queries
+        values: List[Any] = list(code.co_consts)
+        for instruction in dis.get_instructions(code):
+            opname = instruction.opname
+            if opname not in _item_query_opnames and not opname.startswith(("LOAD_FAST", "POP_JUMP", "JUMP")):
+                return None  # could compute item names, such as with f-strings
+            if opname == "LOAD_SMALL_INT":
+                values.append(instruction.argval)  # not part of co_consts
+
+        from worlds.AutoWorld import World
+        item_names: Set[str] = set()
+        for value in (*(cell.cell_contents for cell in rule.__closure__ or ()),
+                      *(rule.__defaults__ or ()), *(rule.__kwdefaults__ or {}).values()):
+            if isinstance(value, World) and "player" in names:
+                value = value.player
+            elif type(value) not in (str, int, float, bool, type(None), tuple, frozenset):
+                return None  # mutable or arbitrary objects could change after analysis
+            values.append(value)
+        foreign_players = set(self.multiworld.get_all_ids()) - {player}
+        while values:
+            value = values.pop()
+            if type(value) is str:
+                item_names.add(value)
+            elif type(value) is int and value in foreign_players:
+                return None  # may query another player's items, which does not stale this player
+            elif type(value) in (tuple, frozenset):
+                values.extend(value)
+            elif isinstance(value, types.CodeType):
+                return None  # nested functions and comprehensions
+        if names & _item_group_query_methods:
+            item_name_groups = self.multiworld.worlds[player].item_name_groups
+            for name in tuple(item_names):
+                item_names.update(item_name_groups.get(name, ()))
+        return frozenset(item_names)
+
+
+class SphereWalk:
+    """
+    Logical spheres of the given locations, collected from a fresh CollectionState.
+    A location that could not be reached is only tested again once its region became reachable,
+    or once an item its access rule depends on was collected.
+    """
+    spheres: List[Set[Location]]
+    """reachable locations per sphere, not including free locations"""
+    unreachable: Set[Location]
+    """locations that were never reached, not including free locations, only filled in by a complete walk"""
+    state: CollectionState
+    """state after collecting all reachable locations, or the ones collected so far"""
+
+    def __init__(self, multiworld: MultiWorld, locations: Iterable[Location],
+                 free: Callable[[Location], bool] = lambda location: False, walk: bool = True,
+                 state: Optional[CollectionState] = None) -> None:
+        """
+        :param locations: locations to sort into spheres, their items are collected
+        :param free: locations that are collected as soon as they are reachable, without forming a sphere of their own
+        :param walk: if False, no spheres are collected, so the caller can step through them with find_reachable and
+            collect instead
+        :param state: state to start from instead of a fresh one, it is modified by the walk
+        """
+        self.multiworld = multiworld
+        self.state = CollectionState(multiworld) if state is None else state
+        self.spheres = []
+        self._state_lock = threading.Lock()
+        self._remaining = set(locations)
+        self._candidates = set(self._remaining)
+        self._by_region: Dict[Region, List[Location]] = defaultdict(list)
+        self._by_item: Dict[Tuple[int, str], List[Location]] = defaultdict(list)
+        self._opaque: List[Location] = []
+
+        if not walk:
+            self.unreachable = set()
+            return
+        free_locations = {location for location in self._remaining if free(location)}
+        while True:
+            while reachable := self._test(self._candidates & free_locations):
+                self._collect(reachable)
+            sphere = self._test(self._candidates - free_locations)
+            if not sphere:
+                break
+            self.spheres.append(sphere)
+            self._collect(sphere)
+        self.unreachable = self._remaining - free_locations
+
+    @property
+    def remaining(self) -> Set[Location]:
+        """locations that were not found reachable yet, must not be modified"""
+        return self._remaining
+
+    def find_reachable(self, locations: Optional[Set[Location]] = None) -> Set[Location]:
+        """
+        Returns the remaining locations, or the remaining ones of locations, that became reachable since they were last
+        tested and no longer counts them as remaining. Their items are not collected.
+        """
+        return self._test(self._candidates.copy() if locations is None else self._candidates & locations)
+
+    def collect(self, locations: Set[Location]) -> None:
+        """Collects the items of locations into state, making the locations waiting on them candidates again."""
+        self._collect(locations)
+
+    def copy_state(self) -> CollectionState:
+        """Returns a copy of state, which can be called from multiple threads at once."""
+        with self._state_lock:
+            return self.state.copy()
+
+    def regroup(self, free: Callable[[Location], bool]) -> List[Set[Location]]:
+        """
+        Returns the spheres the locations reached by this walk form when the ones matched by free are collected as soon
+        as they are reachable, without forming spheres of their own. Locations this walk could not reach are not tested.
+        """
+        return SphereWalk(self.multiworld, (location for sphere in self.spheres for location in sphere), free).spheres
+
+    def copy(self) -> SphereWalk:
+        """Returns a walk that continues independently from where this one is."""
+        ret = SphereWalk.__new__(SphereWalk)
+        ret.multiworld = self.multiworld
+        ret.state = self.copy_state()
+        ret._state_lock = threading.Lock()
+        ret.spheres = self.spheres.copy()
+        ret.unreachable = self.unreachable.copy()
+        ret._remaining = self._remaining.copy()
+        ret._candidates = self._candidates.copy()
+        ret._by_region = defaultdict(list, {region: locations.copy() for region, locations in self._by_region.items()})
+        ret._by_item = defaultdict(list, {key: locations.copy() for key, locations in self._by_item.items()})
+        ret._opaque = self._opaque.copy()
+        return ret
+
+    def _test(self, locations: Set[Location]) -> Set[Location]:
+        state = self.state
+        reachable: Set[Location] = set()
+        self._candidates -= locations
+        for location in locations:
+            region = location.parent_region
+            if type(location).can_reach is not Location.can_reach or not region:
+                if location.can_reach(state):
+                    reachable.add(location)
+                else:
+                    self._opaque.append(location)
+            elif not region.can_reach(state):
+                self._by_region[region].append(location)
+            elif location.access_rule(state):
+                reachable.add(location)
+            else:
+                item_names = self.multiworld.entrance_dependencies.get_location(location)
+                if item_names:
+                    for item_name in item_names:
+                        self._by_item[location.player, item_name].append(location)
+                else:
+                    self._opaque.append(location)
+        self._remaining -= reachable
+        return reachable
+
+    def _collect(self, locations: Set[Location]) -> None:
+        prog_items = self.state.prog_items
+        previous_items = {location.item.player: prog_items[location.item.player].copy() for location in locations
+                          if location.item}
+        for location in locations:
+            if location.item:
+                self.state.collect(location.item, True, location)
+
+        woken: Set[Location] = set(self._opaque)
+        self._opaque.clear()
+        for player, previous in previous_items.items():
+            for item_name, count in prog_items[player].items():
+                if previous[item_name] != count:
+                    woken.update(self._by_item.pop((player, item_name), ()))
+        for region in tuple(self._by_region):
+            if region.can_reach(self.state):
+                woken.update(self._by_region.pop(region))
+        self._candidates |= woken & self._remaining
+
 
 class CollectionState():
     prog_items: Dict[int, Counter[str]]
+    """Per-player collections are copy-on-access, see Utils.CopyOnAccessDict."""
     multiworld: MultiWorld
     reachable_regions: Dict[int, Set[Region]]
     blocked_connections: Dict[int, Set[Entrance]]
@@ -727,20 +998,23 @@ class CollectionState():
     path: Dict[Union[Region, Entrance], PathValue]
     locations_checked: Set[Location]
     stale: Dict[int, bool]
+    reachability_snapshots: Dict[int, Optional[Tuple[int, Dict[str, int]]]]
+    """Per player, the EntranceDependencies epoch and prog_items as of the last region update."""
     allow_partial_entrances: bool
     additional_init_functions: List[Callable[[CollectionState, MultiWorld], None]] = []
     additional_copy_functions: List[Callable[[CollectionState, CollectionState], CollectionState]] = []
 
     def __init__(self, parent: MultiWorld, allow_partial_entrances: bool = False):
         assert parent.worlds, "CollectionState created without worlds initialized in parent"
-        self.prog_items = {player: Counter() for player in parent.get_all_ids()}
+        self.prog_items = Utils.CopyOnAccessDict({player: Counter() for player in parent.get_all_ids()})
         self.multiworld = parent
-        self.reachable_regions = {player: set() for player in parent.get_all_ids()}
-        self.blocked_connections = {player: set() for player in parent.get_all_ids()}
+        self.reachable_regions = Utils.CopyOnAccessDict({player: set() for player in parent.get_all_ids()})
+        self.blocked_connections = Utils.CopyOnAccessDict({player: set() for player in parent.get_all_ids()})
         self.advancements = set()
         self.path = {}
         self.locations_checked = set()
         self.stale = {player: True for player in parent.get_all_ids()}
+        self.reachability_snapshots = {player: None for player in parent.get_all_ids()}
         self.allow_partial_entrances = allow_partial_entrances
         for function in self.additional_init_functions:
             function(self, parent)
@@ -752,30 +1026,65 @@ class CollectionState():
         self.stale[player] = False
         world: AutoWorld.World = self.multiworld.worlds[player]
         reachable_regions = self.reachable_regions[player]
-        queue = deque(self.blocked_connections[player])
+        blocked_connections = self.blocked_connections[player]
+        dependencies = self.multiworld.entrance_dependencies
+        snapshot = self.reachability_snapshots[player]
         start: Region = world.get_region(world.origin_region_name)
 
+        if start in reachable_regions and snapshot is not None and snapshot[0] == dependencies.epoch:
+            queue = self._get_unblockable_connections(player, snapshot[1])
+        else:
+            queue = deque(blocked_connections)
+
         # init on first call - this can't be done on construction since the regions don't exist yet
         if start not in reachable_regions:
             reachable_regions.add(start)
-            self.blocked_connections[player].update(start.exits)
+            blocked_connections.update(start.exits)
             queue.extend(start.exits)
 
         if world.explicit_indirect_conditions:
             self._update_reachable_regions_explicit_indirect_conditions(player, queue)
         else:
             self._update_reachable_regions_auto_indirect_conditions(player, queue)
+        self.reachability_snapshots[player] = dependencies.epoch, dict(self.prog_items[player])
+
+    def _get_unblockable_connections(self, player: int, previous_items: Dict[str, int]) -> deque:
+        """
+        Returns the blocked connections of player that may have been unblocked since the region update that
+        previous_items was recorded at, i.e. those whose access_rule depends on a changed item or could not be analysed.
+        """
+        # items whose count differs or that were only present on one side
+        changed_items = {item for item, _ in self.prog_items[player].items() ^ previous_items.items()}
+        reachable_regions = self.reachable_regions[player]
+        blocked_connections = self.blocked_connections[player]
+        entrance_dependencies = self.multiworld.entrance_dependencies
+        epoch = entrance_dependencies.epoch
+        queue = deque()
+        for connection in tuple(blocked_connections):
+            dependencies = entrance_dependencies.get(connection)
+            # a changed access_rule bumps the epoch and has never been evaluated by this state
+            if dependencies is None or entrance_dependencies.epoch != epoch or \
+                    not dependencies.isdisjoint(changed_items):
+                queue.append(connection)
+            elif connection.connected_region in reachable_regions:
+                blocked_connections.remove(connection)
+        return queue
 
     def _update_reachable_regions_explicit_indirect_conditions(self, player: int, queue: deque):
         reachable_regions = self.reachable_regions[player]
         blocked_connections = self.blocked_connections[player]
+        get_dependencies = self.multiworld.entrance_dependencies.get
         # run BFS on all connections, and keep track of those blocked by missing items
         while queue:
             connection = queue.popleft()
             new_region = connection.connected_region
             if new_region in reachable_regions:
                 blocked_connections.remove(connection)
-            elif connection.can_reach(self):
+            else:
+                # remember which rule was evaluated, so a later change to it invalidates incremental updates
+                get_dependencies(connection)
+                if not connection.can_reach(self):
+                    continue
                 if self.allow_partial_entrances and not new_region:
                     continue
                 assert new_region, f"tried to search through an Entrance \"{connection}\" with no connected Region"
@@ -793,6 +1102,7 @@ class CollectionState():
     def _update_reachable_regions_auto_indirect_conditions(self, player: int, queue: deque):
         reachable_regions = self.reachable_regions[player]
         blocked_connections = self.blocked_connections[player]
+        get_dependencies = self.multiworld.entrance_dependencies.get
         new_connection: bool = True
         # run BFS on all connections, and keep track of those blocked by missing items
         while new_connection:
@@ -802,7 +1112,11 @@ class CollectionState():
                 new_region = connection.connected_region
                 if new_region in reachable_regions:
                     blocked_connections.remove(connection)
-                elif connection.can_reach(self):
+                else:
+                    # remember which rule was evaluated, so a later change to it invalidates incremental updates
+                    get_dependencies(connection)
+                    if not connection.can_reach(self):
+                        continue
                     if self.allow_partial_entrances and not new_region:
                         continue
                     assert new_region, f"tried to search through an Entrance \"{connection}\" with no connected Region"
@@ -813,23 +1127,31 @@ class CollectionState():
                     self.path[new_region] = (new_region.name, self.path.get(connection, None))
                     new_connection = True
             # sweep for indirect connections, mostly Entrance.can_reach(unrelated_Region)
-            queue.extend(blocked_connections)
+            # rules that only depend on items were already evaluated with the current items, so are not retried
+            queue.extend(connection for connection in blocked_connections if get_dependencies(connection) is None)
 
     def copy(self) -> CollectionState:
         ret = CollectionState(self.multiworld)
-        ret.prog_items = {player: counter.copy() for player, counter in self.prog_items.items()}
-        ret.reachable_regions = {player: region_set.copy() for player, region_set in
-                                 self.reachable_regions.items()}
-        ret.blocked_connections = {player: entrance_set.copy() for player, entrance_set in
-                                   self.blocked_connections.items()}
+        # per-player data is shared with self and only copied once a player is accessed
+        ret.prog_items = self._copy_per_player(self.prog_items)
+        ret.reachable_regions = self._copy_per_player(self.reachable_regions)
+        ret.blocked_connections = self._copy_per_player(self.blocked_connections)
         ret.advancements = self.advancements.copy()
         ret.path = self.path.copy()
         ret.locations_checked = self.locations_checked.copy()
+        ret.reachability_snapshots = self.reachability_snapshots.copy()
         ret.allow_partial_entrances = self.allow_partial_entrances
         for function in self.additional_copy_functions:
             ret = function(self, ret)
         return ret
 
+    @staticmethod
+    def _copy_per_player(data: Dict[int, Any]) -> Utils.CopyOnAccessDict:
+        if isinstance(data, Utils.CopyOnAccessDict):
+            return data.copy()
+        # replaced with a regular dict from outside, make it copy-on-access from here on
+        return Utils.CopyOnAccessDict({player: value.copy() for player, value in data.items()}).copy()
+
     def can_reach(self,
                   spot: Union[Location, Entrance, Region, str],
                   resolution_hint: Optional[str] = None,
@@ -1139,6 +1461,7 @@ class CollectionState():
             # invalidate caches, nothing can be trusted anymore now
             self.reachable_regions[item.player] = set()
             self.blocked_connections[item.player] = set()
+            self.reachability_snapshots[item.player] = None
             self.stale[item.player] = True
 
     def remove_item(self, item: str, player: int, count: int = 1) -> None:
@@ -1692,42 +2015,34 @@ class Spoiler:
     def create_playthrough(self, create_paths: bool = True) -> None:
         """Destructive to the multiworld while it is run, damage gets repaired afterwards."""
         from itertools import chain
-        # get locations containing progress items
         multiworld = self.multiworld
+        # get locations containing progress items
         prog_locations = {location for location in multiworld.get_filled_locations() if location.item.advancement}
+        logging.debug('Building up collection spheres.')
+        # only advancement items change the state, so their spheres are the ones of the walk of all filled locations
+        sphere_walk = multiworld.get_sphere_walk()
+        collection_spheres = [sphere & prog_locations for sphere in sphere_walk.spheres]
+        collection_spheres = [sphere for sphere in collection_spheres if sphere]
+        unreachables = sphere_walk.unreachable & prog_locations
+        # the state before each sphere
         state_cache: List[Optional[CollectionState]] = [None]
-        collection_spheres: List[Set[Location]] = []
         state = CollectionState(multiworld)
-        sphere_candidates = set(prog_locations)
-        logging.debug('Building up collection spheres.')
-        while sphere_candidates:
-
-            # build up spheres of collection radius.
-            # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
-
-            sphere = {location for location in sphere_candidates if state.can_reach(location)}
-
+        for sphere in collection_spheres[:-1]:
             for location in sphere:
                 state.collect(location.item, True, location)
-
-            sphere_candidates -= sphere
-            collection_spheres.append(sphere)
             state_cache.append(state.copy())
-
-            logging.debug('Calculated sphere %i, containing %i of %i progress items.', len(collection_spheres),
-                          len(sphere),
-                          len(prog_locations))
-            if not sphere:
-                logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
-                    location.item.name, location.item.player, location.name, location.player) for location in
-                                                                               sphere_candidates])
-                if not multiworld.has_beaten_game(state):
-                    raise RuntimeError("During playthrough generation, the game was determined to be unbeatable. "
-                                       "Something went terribly wrong here. "
-                                       f"Unreachable progression items: {sphere_candidates}")
-                else:
-                    self.unreachables = sphere_candidates
-                    break
+        logging.debug('Calculated %i collection spheres, containing %i of %i progress items.',
+                      len(collection_spheres), len(prog_locations) - len(unreachables), len(prog_locations))
+        if unreachables:
+            logging.debug('The following items could not be reached: %s', ['%s (Player %d) at %s (Player %d)' % (
+                location.item.name, location.item.player, location.name, location.player) for location in
+                                                                           unreachables])
+            if not multiworld.has_beaten_game(sphere_walk.copy_state()):
+                raise RuntimeError("During playthrough generation, the game was determined to be unbeatable. "
+                                   "Something went terribly wrong here. "
+                                   f"Unreachable progression items: {unreachables}")
+            else:
+                self.unreachables = unreachables
 
         # in the second phase, we cull each sphere such that the game is still beatable,
         # reducing each range of influence to the bare minimum required inside it
@@ -1773,22 +2088,12 @@ class Spoiler:
         # to build up the correct spheres
 
         required_locations = {item for sphere in collection_spheres for item in sphere}
-        state = CollectionState(multiworld)
-        collection_spheres = []
-        while required_locations:
-            sphere = set(filter(state.can_reach, required_locations))
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-
-            collection_spheres.append(sphere)
-
-            logging.debug('Calculated final sphere %i, containing %i of %i progress items.', len(collection_spheres),
-                          len(sphere), len(required_locations))
-
-            required_locations -= sphere
-            if not sphere:
-                raise RuntimeError(f'Not all required items reachable. Unreachable locations: {required_locations}')
+        sphere_walk = SphereWalk(multiworld, required_locations)
+        if sphere_walk.unreachable:
+            raise RuntimeError(f'Not all required items reachable. Unreachable locations: {sphere_walk.unreachable}')
+        state = sphere_walk.state
+        collection_spheres = sphere_walk.spheres
+        logging.debug('Calculated %i final spheres.', len(collection_spheres))
 
         # we can finally output our playthrough
         self.playthrough = {"0": sorted([self.multiworld.get_name_string_for_object(item) for item in
@@ -1,10 +1,11 @@
 import collections
 import itertools
 import logging
+import time
 import typing
 from collections import Counter, deque
 
-from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, PlandoItemBlock
+from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, PlandoItemBlock, SphereWalk
 from Options import Accessibility
 
 from worlds.AutoWorld import call_all
@@ -33,6 +34,137 @@ def sweep_from_pool(base_state: CollectionState, itempool: typing.Sequence[Item]
     return new_state
 
 
+class PlacementCandidates:
+    """Locations that may accept the items of a signature, in order, with filled locations dropped lazily."""
+    __slots__ = ("locations", "start", "filled")
+
+    locations: typing.List[Location]
+    start: int
+    """index of the first location that may not be filled yet"""
+    filled: int
+    """number of filled locations still in locations"""
+
+    def __init__(self, locations: typing.List[Location]) -> None:
+        self.locations = locations
+        self.start = 0
+        self.filled = 0
+
+
+class PlacementIndex:
+    """
+    The unfilled locations of a fill, to find the first one in their original order that can be filled with an item.
+
+    The locations that may accept an item are collected per item signature. For locations without an item rule, or of
+    worlds with static_item_rules, the parts of Location.can_fill that don't depend on the state, the excluded check
+    and item_rule, are only checked once per signature. Locations with their own always_allow or can_fill are always
+    fully checked.
+    Reachability is cached until a different state is used.
+
+    Filled locations are removed from the given list of locations by remove_filled.
+    """
+    locations: typing.List[Location]
+    """locations of the fill, in order, including locations filled since the last remove_filled"""
+    candidates: typing.Dict[typing.Tuple[typing.Any, ...], PlacementCandidates]
+    containing: typing.Dict[Location, typing.List[PlacementCandidates]]
+    """candidates each unfilled location is part of"""
+    filled: typing.Set[Location]
+    unfilled: int
+    full_check: typing.Set[Location]
+    """locations that need Location.can_fill for every item"""
+    rule_check: typing.Set[Location]
+    """locations that need their item rule checked for every item"""
+    reachable: typing.Dict[Location, bool]
+
+    def __init__(self, multiworld: MultiWorld, locations: typing.List[Location]) -> None:
+        self.locations = locations
+        self.candidates = {}
+        self.containing = {}
+        self.filled = set()
+        self.unfilled = len(locations)
+        self.full_check = set()
+        self.rule_check = set()
+        for location in locations:
+            if type(location).can_fill is not Location.can_fill or location.always_allow is not Location.always_allow:
+                self.full_check.add(location)
+            elif location.item_rule is not Location.item_rule and \
+                    not multiworld.worlds[location.player].static_item_rules:
+                self.rule_check.add(location)
+        self.state: typing.Optional[CollectionState] = None
+        self.reachable = {}
+
+    def __len__(self) -> int:
+        return self.unfilled
+
+    def get_candidates(self, item: Item, player: typing.Optional[int]) -> PlacementCandidates:
+        key = type(item), item.player, item.name, item.classification, player
+        candidates = self.candidates.get(key, None)
+        if candidates is None:
+            excluded_allowed = not (item.advancement or item.useful)
+            candidates = self.candidates[key] = PlacementCandidates([
+                location for location in self.locations
+                if location not in self.filled and (player is None or location.player == player) and (
+                    location in self.full_check or location in self.rule_check or (
+                        (location.progress_type != LocationProgressType.EXCLUDED or excluded_allowed)
+                        and location.item_rule(item)
+                    )
+                )
+            ])
+            for location in candidates.locations:
+                self.containing.setdefault(location, []).append(candidates)
+        return candidates
+
+    def pop(self, state: CollectionState, item: Item, check_access: bool = True,
+            player: typing.Optional[int] = None) -> typing.Optional[Location]:
+        """Removes and returns the first location that can be filled with item, optionally only of player."""
+        if state is not self.state:
+            self.state = state
+            self.reachable = {}
+        candidates = self.get_candidates(item, player)
+        locations = candidates.locations
+        start = candidates.start
+        while start < len(locations) and locations[start] in self.filled:
+            start += 1
+        candidates.start = start
+        for index in range(start, len(locations)):
+            location = locations[index]
+            if location in self.filled:
+                continue
+            if location in self.full_check:
+                if not location.can_fill(state, item, check_access):
+                    continue
+            else:
+                if location in self.rule_check and not (
+                        (location.progress_type != LocationProgressType.EXCLUDED
+                         or not (item.advancement or item.useful))
+                        and location.item_rule(item)):
+                    continue
+                if check_access:
+                    reachable = self.reachable.get(location, None)
+                    if reachable is None:
+                        reachable = self.reachable[location] = location.can_reach(state)
+                    if not reachable:
+                        continue
+            self.fill(location)
+            return location
+        return None
+
+    def fill(self, location: Location) -> None:
+        """Marks location as filled, compacting the candidates it was part of once they are mostly filled."""
+        self.filled.add(location)
+        self.unfilled -= 1
+        for candidates in self.containing.pop(location, ()):
+            candidates.filled += 1
+            if candidates.filled * 2 > len(candidates.locations):
+                candidates.locations = [location for location in candidates.locations if location not in self.filled]
+                candidates.start = 0
+                candidates.filled = 0
+
+    def remove_filled(self) -> None:
+        """Removes the filled locations from the list of locations given to this index."""
+        if len(self.locations) != self.unfilled:
+            self.locations[:] = [location for location in self.locations if location not in self.filled]
+
+
 def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locations: typing.List[Location],
                      item_pool: typing.List[Item], single_player_placement: bool = False, lock: bool = False,
                      swap: bool = True, on_place: typing.Optional[typing.Callable[[Location], None]] = None,
@@ -59,11 +191,18 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     for item in item_pool:
         reachable_items.setdefault(item.player, deque()).append(item)
 
+    placement_index = PlacementIndex(multiworld, locations)
+    # base_state with everything in item_pool and unplaced_items collected, kept up to date as items move in and out of
+    # them, so each batch only has to sweep a copy instead of collecting the whole pool again
+    pool_state = base_state.copy()
+    for item in item_pool:
+        pool_state.collect(item, True)
+
     # for progress logging
     total = min(len(item_pool), len(locations))
     placed = 0
 
-    while any(reachable_items.values()) and locations:
+    while any(reachable_items.values()) and placement_index:
         if one_item_per_player:
             # grab one item per player
             items_to_place = [items.pop()
@@ -80,17 +219,22 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             for p, pool_item in enumerate(reversed(item_pool), start=1):
                 if pool_item is item:
                     del item_pool[-p]
+                    pool_state.remove(item)
                     break
 
+        # not patched with remove: the previous sweep may have collected items that were only reachable through the
+        # items just taken out of the pool, so every batch sweeps a fresh copy of the pool state
         maximum_exploration_state = sweep_from_pool(
-            base_state, item_pool + unplaced_items, multiworld.get_filled_locations(item.player)
+            pool_state, (), multiworld.get_filled_locations(item.player)
             if single_player_placement else None)
 
         has_beaten_game = multiworld.has_beaten_game(maximum_exploration_state)
 
         while items_to_place:
             # if we have run out of locations to fill,break out of this loop
-            if not locations:
+            if not placement_index:
+                for unplaced_item in items_to_place:
+                    pool_state.collect(unplaced_item, True)
                 unplaced_items += items_to_place
                 break
             item_to_place = items_to_place.pop(0)
@@ -105,15 +249,9 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             else:
                 perform_access_check = True
 
-            for i, location in enumerate(locations):
-                if (not single_player_placement or location.player == item_to_place.player) \
-                        and location.can_fill(maximum_exploration_state, item_to_place, perform_access_check):
-                    # popping by index is faster than removing by content,
-                    spot_to_fill = locations.pop(i)
-                    # skipping a scan for the element
-                    break
-
-            else:
+            spot_to_fill = placement_index.pop(maximum_exploration_state, item_to_place, perform_access_check,
+                                               item_to_place.player if single_player_placement else None)
+            if spot_to_fill is None:
                 # we filled all reachable spots.
                 if swap:
                     # Keep a cache of previous safe swap states that might be usable to sweep from to produce the next
@@ -180,6 +318,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                             reachable_items[placed_item.player].appendleft(
                                 placed_item)
                             item_pool.append(placed_item)
+                            pool_state.collect(placed_item, True)
 
                             # cleanup at the end to hopefully get better errors
                             cleanup_required = True
@@ -193,9 +332,11 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                     if spot_to_fill is None:
                         # Can't place this item, move on to the next
                         unplaced_items.append(item_to_place)
+                        pool_state.collect(item_to_place, True)
                         continue
                 else:
                     unplaced_items.append(item_to_place)
+                    pool_state.collect(item_to_place, True)
                     continue
             multiworld.push_item(spot_to_fill, item_to_place, False)
             spot_to_fill.locked = lock
@@ -206,6 +347,8 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             if on_place:
                 on_place(spot_to_fill)
 
+    placement_index.remove_filled()
+
     if total > 1000:
         _log_fill_progress(name, placed, total)
 
@@ -747,9 +890,14 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
     else:
         logging.info(f"Balancing multiworld progression for {len(balanceable_players)} Players.")
         logging.debug(balanceable_players)
-        state: CollectionState = CollectionState(multiworld)
+        start = time.perf_counter()
+        # time spent per part of balancing, logged at the end
+        timings: typing.Counter[str] = Counter()
+        # steps through the spheres, only testing locations again once something they depend on was collected
+        walk = SphereWalk(multiworld, multiworld.get_locations(), walk=False)
+        state: CollectionState = walk.state
         checked_locations: typing.Set[Location] = set()
-        unchecked_locations: typing.Set[Location] = set(multiworld.get_locations())
+        unchecked_locations: typing.Set[Location] = walk.remaining
 
         total_locations_count: typing.Counter[int] = Counter(
             location.player
@@ -769,9 +917,8 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
         sphere_num: int = 1
         moved_item_count: int = 0
 
-        def get_sphere_locations(sphere_state: CollectionState,
-                                 locations: typing.Set[Location]) -> typing.Set[Location]:
-            return {loc for loc in locations if sphere_state.can_reach(loc)}
+        def collect_advancements(sphere_walk: SphereWalk, locations: typing.Iterable[Location]) -> None:
+            sphere_walk.collect({location for location in locations if location.advancement})
 
         def item_percentage(player: int, num: int) -> float:
             return num / total_locations_count[player]
@@ -784,9 +931,10 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
             # Gather non-locked locations.
             # This ensures that only shuffled locations get counted for progression balancing,
             #   i.e. the items the players will be checking.
-            sphere_locations = get_sphere_locations(state, unchecked_locations)
+            sphere_start = time.perf_counter()
+            sphere_locations = walk.find_reachable()
+            timings["finding spheres"] += time.perf_counter() - sphere_start
             for location in sphere_locations:
-                unchecked_locations.remove(location)
                 if not location.locked:
                     reachable_locations_count[location.player] += 1
 
@@ -814,8 +962,10 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                         and item_percentage(player, reachables) < threshold_percentages[player])
                 }
                 if balancing_players:
-                    balancing_state = state.copy()
-                    balancing_unchecked_locations = unchecked_locations.copy()
+                    candidates_start = time.perf_counter()
+                    balancing_walk = walk.copy()
+                    balancing_state = balancing_walk.state
+                    balancing_unchecked_locations = balancing_walk.remaining
                     balancing_reachables = reachable_locations_count.copy()
                     balancing_sphere = sphere_locations.copy()
                     candidate_items: typing.Dict[int, typing.Set[Location]] = collections.defaultdict(set)
@@ -823,7 +973,6 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                         # Check locations in the current sphere and gather progression items to swap earlier
                         for location in balancing_sphere:
                             if location.advancement:
-                                balancing_state.collect(location.item, True, location)
                                 player = location.item.player
                                 # only replace items that end up in another player's world
                                 if (not location.locked and not location.item.skip_in_prog_balancing and
@@ -832,9 +981,9 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                                         location.progress_type != LocationProgressType.PRIORITY):
                                     candidate_items[player].add(location)
                                     logging.debug(f"Candidate item: {location.name}, {location.item.name}")
-                        balancing_sphere = get_sphere_locations(balancing_state, balancing_unchecked_locations)
+                        collect_advancements(balancing_walk, balancing_sphere)
+                        balancing_sphere = balancing_walk.find_reachable()
                         for location in balancing_sphere:
-                            balancing_unchecked_locations.remove(location)
                             if not location.locked:
                                 balancing_reachables[location.player] += 1
                         if multiworld.has_beaten_game(balancing_state) or all(
@@ -850,6 +999,8 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                         if l not in balancing_unchecked_locations:
                             unlocked_locations[l.player].add(l)
                     items_to_replace: typing.List[Location] = []
+                    validation_start = time.perf_counter()
+                    timings["finding candidates"] += validation_start - candidates_start
                     for player in balancing_players:
                         locations_to_test = unlocked_locations[player]
                         items_to_test = list(candidate_items[player])
@@ -864,17 +1015,23 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                             ), items_to_test):
                                 reducing_state.collect(location.item, True, location)
 
-                            reducing_state.sweep_for_advancements(locations=locations_to_test)
+                            # sweep locations_to_test, only testing a location again once something it depends on
+                            # was collected
+                            reducing_walk = SphereWalk(multiworld, locations_to_test, walk=False, state=reducing_state)
+                            while reachable := reducing_walk.find_reachable():
+                                collect_advancements(reducing_walk, reachable)
 
                             if multiworld.has_beaten_game(balancing_state):
                                 if not multiworld.has_beaten_game(reducing_state):
                                     items_to_replace.append(testing)
                             else:
-                                reduced_sphere = get_sphere_locations(reducing_state, locations_to_test)
+                                reduced_sphere = locations_to_test - reducing_walk.remaining
                                 p = item_percentage(player, reachable_locations_count[player] + len(reduced_sphere))
                                 if p < threshold_percentages[player]:
                                     items_to_replace.append(testing)
 
+                    swap_start = time.perf_counter()
+                    timings["validating candidates"] += swap_start - validation_start
                     old_moved_item_count = moved_item_count
 
                     # sort then shuffle to maintain deterministic behaviour,
@@ -895,7 +1052,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                                 logging.debug(f"Progression balancing moved {new_location.item} to {new_location}, "
                                               f"displacing {old_location.item} into {old_location}")
                                 moved_item_count += 1
-                                state.collect(new_location.item, True, new_location)
+                                walk.collect({new_location})
                                 break
                         else:
                             logging.warning(f"Could not Progression Balance {old_location.item}")
@@ -903,15 +1060,13 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                     if old_moved_item_count < moved_item_count:
                         logging.debug(f"Moved {moved_item_count} items so far\n")
                         unlocked = {fresh for player in balancing_players for fresh in unlocked_locations[player]}
-                        for location in get_sphere_locations(state, unlocked):
-                            unchecked_locations.remove(location)
+                        for location in walk.find_reachable(unlocked):
                             if not location.locked:
                                 reachable_locations_count[location.player] += 1
                             sphere_locations.add(location)
+                    timings["swapping"] += time.perf_counter() - swap_start
 
-            for location in sphere_locations:
-                if location.advancement:
-                    state.collect(location.item, True, location)
+            collect_advancements(walk, sphere_locations)
             checked_locations |= sphere_locations
 
             if multiworld.has_beaten_game(state):
@@ -920,6 +1075,10 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                 logging.warning("Progression Balancing ran out of paths.")
                 break
 
+        logging.info(f"Progression balancing moved {moved_item_count} items over {sphere_num - 1} spheres in "
+                     f"{time.perf_counter() - start:.2f} seconds "
+                     f"({', '.join(f'{part}: {time_taken:.2f}' for part, time_taken in timings.items())}).")
+
 
 def swap_location_item(location_1: Location, location_2: Location, check_locked: bool = True) -> None:
     """Swaps Items of locations. Does NOT swap flags like shop_slot or locked, but does swap event"""
@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import copy
 import logging
+import multiprocessing
 import os
 import random
 import string
 import sys
+import traceback
 import urllib.parse
 import urllib.request
 from collections import Counter
 from itertools import chain
-from typing import Any
+from typing import Any, Callable, NamedTuple
 
 import ModuleUpdate
 
@@ -47,6 +50,8 @@ def mystery_argparse(argv: list[str] | None = None):
                         default=defaults.logtime, action='store_true')
     parser.add_argument("--csv_output", action="store_true",
                         help="Output rolled player options to csv (made for async multiworld).")
+    parser.add_argument("--yaml_processes", default=defaults.yaml_processes, type=int,
+                        help="Number of worker processes to read player files and roll their options in.")
     parser.add_argument("--plando", default=defaults.plando_options,
                         help="List of options that can be set manually. Can be combined, for example \"bosses, items\"")
     parser.add_argument("--skip_prog_balancing", action="store_true",
@@ -122,26 +127,31 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
     player_id: int = 1
     player_files: dict[int, str] = {}
     player_errors: list[str] = []
+    player_file_names: list[str] = []
     for file in os.scandir(args.player_files_path):
         fname = file.name
         if file.is_file() and not fname.startswith(".") and not fname.lower().endswith(".ini") and \
                 os.path.join(args.player_files_path, fname) not in {args.meta_file_path, args.weights_file_path}:
-            path = os.path.join(args.player_files_path, fname)
-            try:
-                weights_for_file = []
-                for doc_idx, yaml in enumerate(read_weights_yamls(path)):
-                    if yaml is None:
-                        logging.warning(f"Ignoring empty yaml document #{doc_idx + 1} in {fname}")
-                    else:
-                        weights_for_file.append(yaml)
-                weights_cache[fname] = tuple(weights_for_file)
-                        
-            except Exception as e:
-                logging.exception(f"Exception reading weights in file {fname}")
-                player_errors.append(
-                    f"{len(player_errors) + 1}. "
-                    f"File {fname} is invalid. Please fix your yaml.\n{Utils.get_all_causes(e)}"
-                )
+            player_file_names.append(fname)
+    yaml_processes = get_yaml_processes(args.yaml_processes)
+    player_file_weights = map_player_files(
+        read_player_file, [(os.path.join(args.player_files_path, fname),) for fname in player_file_names],
+        yaml_processes)
+    for fname, weights in zip(player_file_names, player_file_weights):
+        if isinstance(weights, PlayerFileError):
+            logging.error(f"Exception reading weights in file {fname}\n{weights.traceback}")
+            player_errors.append(
+                f"{len(player_errors) + 1}. "
+                f"File {fname} is invalid. Please fix your yaml.\n{weights.causes}"
+            )
+        else:
+            weights_for_file = []
+            for doc_idx, yaml in enumerate(weights):
+                if yaml is None:
+                    logging.warning(f"Ignoring empty yaml document #{doc_idx + 1} in {fname}")
+                else:
+                    weights_for_file.append(yaml)
+            weights_cache[fname] = tuple(weights_for_file)
 
     # sort dict for consistent results across platforms:
     weights_cache = {key: value for key, value in sorted(weights_cache.items(), key=lambda k: k[0].casefold())}
@@ -207,15 +217,19 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
 
     settings_cache: dict[str, tuple[argparse.Namespace, ...]] = {fname: None for fname in weights_cache}
     if args.sameoptions:
+        rolled_settings = iter(roll_player_settings(
+            [yaml for yamls in weights_cache.values() for yaml in yamls], args.plando, yaml_processes))
         for fname, yamls in weights_cache.items():
-            try:
-                settings_cache[fname] = tuple(roll_settings(yaml, args.plando) for yaml in yamls)
-            except Exception as e:
-                logging.exception(f"Exception reading settings in file {fname}")
+            file_settings = tuple(next(rolled_settings) for _ in yamls)
+            error = next((settings for settings in file_settings if isinstance(settings, PlayerFileError)), None)
+            if error:
+                logging.error(f"Exception reading settings in file {fname}\n{error.traceback}")
                 player_errors.append(
                     f"{len(player_errors) + 1}. "
-                    f"File {fname} is invalid. Please fix your yaml.\n{Utils.get_all_causes(e)}"
+                    f"File {fname} is invalid. Please fix your yaml.\n{error.causes}"
                 )
+            else:
+                settings_cache[fname] = file_settings
         # Exit early here to avoid throwing the same errors again later
         if player_errors:
             errors = "\n\n".join(player_errors)
@@ -228,6 +242,8 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
     name_counter = Counter()
     args.player_options = {}
 
+    # player, path and yaml document index of each slot
+    slots: list[tuple[int, str, int]] = []
     player = 1
     while player <= args.multi:
         path = player_path_cache[player]
@@ -236,17 +252,23 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
             player += 1
             continue
 
-        for doc_index, yaml in enumerate(weights_cache[path]):
-            name = yaml.get("name")
+        for doc_index in range(len(weights_cache[path])):
+            slots.append((player, path, doc_index))
+            # increment for each yaml document in the file
+            player += 1
+
+    # Use the cached settings objects if they exist, otherwise roll settings for each slot
+    # Invariant: settings_cache[path] and weights_cache[path] have the same length
+    if args.sameoptions:
+        slot_settings = [settings_cache[path][doc_index] for _, path, doc_index in slots]
+    else:
+        slot_settings = roll_player_settings(
+            [weights_cache[path][doc_index] for _, path, doc_index in slots], args.plando, yaml_processes)
+
+    for (player, path, doc_index), settingsObject in zip(slots, slot_settings):
+        name = weights_cache[path][doc_index].get("name")
+        if not isinstance(settingsObject, PlayerFileError):
             try:
-                # Use the cached settings object if it exists, otherwise roll settings within the try-catch
-                # Invariant: settings_cache[path] and weights_cache[path] have the same length
-                settingsObject: argparse.Namespace = (
-                    settings_cache[path][doc_index]
-                    if settings_cache[path]
-                    else roll_settings(yaml, args.plando)
-                )
-                
                 for k, v in vars(settingsObject).items():
                     if v is not None:
                         try:
@@ -267,15 +289,15 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
                 args.name[player] = handle_name(args.name[player], player, name_counter)
 
             except Exception as e:
-                logging.exception(f"Exception reading settings in file {path} document #{doc_index + 1} "
-                                  f"(name: {args.name.get(player, name)})")
-                player_errors.append(
-                    f"{len(player_errors) + 1}. "
-                    f"File {path} document #{doc_index + 1} (name: {args.name.get(player, name)}) is invalid. "
-                    f"Please fix your yaml.\n{Utils.get_all_causes(e)}")
+                settingsObject = PlayerFileError.from_exception(e)
 
-            # increment for each yaml document in the file
-            player += 1
+        if isinstance(settingsObject, PlayerFileError):
+            logging.error(f"Exception reading settings in file {path} document #{doc_index + 1} "
+                          f"(name: {args.name.get(player, name)})\n{settingsObject.traceback}")
+            player_errors.append(
+                f"{len(player_errors) + 1}. "
+                f"File {path} document #{doc_index + 1} (name: {args.name.get(player, name)}) is invalid. "
+                f"Please fix your yaml.\n{settingsObject.causes}")
 
     if len(set(name.lower() for name in args.name.values())) != len(args.name):
         player_errors.append(
@@ -291,6 +313,68 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
     return args, seed
 
 
+class PlayerFileError(NamedTuple):
+    """An exception raised while reading or rolling a player file, in a form that can be sent between processes."""
+    causes: str
+    traceback: str
+
+    @classmethod
+    def from_exception(cls, e: Exception) -> PlayerFileError:
+        return cls(Utils.get_all_causes(e), "".join(traceback.format_exception(e)).rstrip())
+
+
+def get_yaml_processes(processes: int) -> int:
+    """Returns the number of worker processes to read player files and roll their options in, 0 if unsupported."""
+    if processes and "fork" not in multiprocessing.get_all_start_methods():
+        logging.warning("Yaml processes require fork support, reading player files in this process instead.")
+        return 0
+    return processes
+
+
+def map_player_files(function: Callable[..., Any], arguments: list[tuple[Any, ...]], processes: int) -> list[Any]:
+    """
+    Calls function with each tuple of arguments and returns the results in the same order,
+    using up to processes forked worker processes, or this process if processes is 0.
+    """
+    processes = min(processes, len(arguments))
+    if not processes:
+        return [function(*function_arguments) for function_arguments in arguments]
+    # workers are forked, so they inherit the loaded worlds and the logging setup of this process
+    with concurrent.futures.ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("fork")) as pool:
+        return list(pool.map(function, *zip(*arguments), chunksize=max(1, len(arguments) // (processes * 4))))
+
+
+def read_player_file(path: str) -> tuple[Any, ...] | PlayerFileError:
+    try:
+        return read_weights_yamls(path)
+    except Exception as e:
+        return PlayerFileError.from_exception(e)
+
+
+def roll_player_settings(weights: list[dict], plando_options: PlandoOptions,
+                         processes: int) -> list[argparse.Namespace | PlayerFileError]:
+    """
+    Rolls settings for each of weights, in order, each from its own seed drawn from the global random,
+    so the results are the same whether they are rolled in this process or in any number of worker processes.
+    """
+    arguments = [(yaml, plando_options, random.getrandbits(64)) for yaml in weights]
+    if not min(processes, len(weights)):
+        return [try_roll_settings(*argument) for argument in arguments]
+    return map_player_files(try_roll_settings, arguments, processes)
+
+
+def try_roll_settings(weights: dict, plando_options: PlandoOptions, seed: int) -> argparse.Namespace | PlayerFileError:
+    """Rolls settings with the global random seeded by seed, and restores the state of the global random after."""
+    random_state = random.getstate()
+    random.seed(seed)
+    try:
+        return roll_settings(weights, plando_options)
+    except Exception as e:
+        return PlayerFileError.from_exception(e)
+    finally:
+        random.setstate(random_state)
+
+
 def read_weights_yamls(path) -> tuple[Any, ...]:
     try:
         if urllib.parse.urlparse(path).scheme in ('https', 'file'):
@@ -31,8 +31,12 @@ import settings
 import Utils
 from Utils import (init_logging, is_frozen, is_linux, is_macos, is_windows, local_path, messagebox, open_filename,
                    user_path)
+from worlds import load_all_worlds
 from worlds.LauncherComponents import Component, components, icon_paths, SuffixIdentifier, Type
 
+# worlds register their components when imported
+load_all_worlds()
+
 
 def open_host_yaml():
     s = settings.get_settings()
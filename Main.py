@@ -1,13 +1,15 @@
 import collections
 from collections.abc import Mapping
 import concurrent.futures
+import contextlib
+import functools
 import logging
+import multiprocessing
 import os
 import tempfile
 import time
 from typing import Any
 import zipfile
-import zlib
 
 import worlds
 from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld
@@ -15,7 +17,7 @@ from Fill import FillError, balance_multiworld_progression, distribute_items_res
     parse_planned_blocks, distribute_planned_blocks, resolve_early_locations_for_planned
 from NetUtils import convert_to_base_types
 from Options import StartInventoryPool
-from Utils import __version__, output_path, restricted_dumps, version_tuple
+from Utils import __version__, output_path, version_tuple
 from settings import get_settings
 from worlds import AutoWorld
 from worlds.generic.Rules import exclusion_rules, locality_rules
@@ -51,21 +53,23 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     multiworld.state = CollectionState(multiworld)
     logger.info('Archipelago Version %s  -  Seed: %s\n', __version__, multiworld.seed)
 
-    logger.info(f"Found {len(AutoWorld.AutoWorldRegister.world_types)} World Types:")
-    longest_name = max(len(text) for text in AutoWorld.AutoWorldRegister.world_types)
+    # listed from the info of the worlds, to not import the ones that are not used
+    world_info = {game: worlds.world_info[game] for game in AutoWorld.AutoWorldRegister.world_types.keys()
+                  if game in worlds.world_info}
+    logger.info(f"Found {len(world_info)} World Types:")
+    longest_name = max(len(text) for text in world_info)
 
-    world_classes = AutoWorld.AutoWorldRegister.world_types.values()
+    version_count = max(len(info["world_version"]) for info in world_info.values())
+    item_count = len(str(max(len(info["data_package"]["item_name_to_id"]) for info in world_info.values())))
+    location_count = len(str(max(len(info["data_package"]["location_name_to_id"]) for info in world_info.values())))
 
-    version_count = max(len(cls.world_version.as_simple_string()) for cls in world_classes)
-    item_count = len(str(max(len(cls.item_names) for cls in world_classes)))
-    location_count = len(str(max(len(cls.location_names) for cls in world_classes)))
-
-    for name, cls in AutoWorld.AutoWorldRegister.world_types.items():
-        if not cls.hidden and len(cls.item_names) > 0:
+    for name, info in world_info.items():
+        item_names = info["data_package"]["item_name_to_id"]
+        if not info["hidden"] and len(item_names) > 0:
             logger.info(f" {name:{longest_name}}: "
-                        f"v{cls.world_version.as_simple_string():{version_count}} | "
-                        f"Items: {len(cls.item_names):{item_count}} | "
-                        f"Locations: {len(cls.location_names):{location_count}}")
+                        f"v{info['world_version']:{version_count}} | "
+                        f"Items: {len(item_names):{item_count}} | "
+                        f"Locations: {len(info['data_package']['location_name_to_id']):{location_count}}")
 
     del item_count, location_count
 
@@ -211,6 +215,7 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     multiworld.random.passthrough = False
 
     if args.skip_output:
+        AutoWorld.log_stage_times(multiworld)
         logger.info('Done. Skipped output/spoiler generation. Total Time: %s', time.perf_counter() - start)
         return multiworld
 
@@ -223,17 +228,45 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
             multiworld.spoiler.create_playthrough(create_paths=args.spoiler > 2)
 
         multiworld.spoiler.to_file(output_path('%s_Spoiler.txt' % outfilebase))
+        AutoWorld.log_stage_times(multiworld)
         logger.info('Done. Skipped multidata modification. Total time: %s', time.perf_counter() - start)
         return multiworld
 
     output = tempfile.TemporaryDirectory()
-    with output as temp_dir:
+    with output as temp_dir, contextlib.ExitStack() as process_pool_stack:
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
                           is not multiworld.worlds[player].generate_output.__code__]
+        process_players = [player for player in output_players
+                           if not multiworld.worlds[player].thread_only_output]
+        output_processes = min(get_settings().generator.output_processes, len(process_players))
+        if output_processes and "fork" not in multiprocessing.get_all_start_methods():
+            logger.warning("Output processes require fork support, generating output in threads instead.")
+            output_processes = 0
+
+        output_file_futures: list[concurrent.futures.Future] = []
+        if output_processes:
+            # stage_generate_output may signal data that generate_output waits for, so it has to finish before forking.
+            AutoWorld.call_stage(multiworld, "generate_output", temp_dir)
+            # workers inherit the multiworld from this module, as its rules and worlds can't be pickled;
+            # their output files are written straight into temp_dir.
+            global _output_multiworld
+            _output_multiworld = multiworld
+            process_pool_stack.callback(_clear_output_multiworld)
+            process_pool = process_pool_stack.enter_context(concurrent.futures.ProcessPoolExecutor(
+                output_processes, mp_context=multiprocessing.get_context("fork")))
+            # with fork, the first submit starts all workers before any thread, including the pool's own, is started,
+            # so no worker is forked while another thread holds a lock.
+            for player in process_players:
+                future = process_pool.submit(_generate_output_in_process, player, temp_dir)
+                future.add_done_callback(functools.partial(_apply_process_output, multiworld.worlds[player]))
+                output_file_futures.append(future)
+            output_players = [player for player in output_players if player not in process_players]
+
         with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
             check_accessibility_task = pool.submit(multiworld.fulfills_accessibility)
 
-            output_file_futures = [pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir)]
+            if not output_processes:
+                output_file_futures.append(pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir))
             for player in output_players:
                 # skip starting a thread for methods that say "pass".
                 output_file_futures.append(
@@ -350,10 +383,9 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
                 for key in ("slot_data", "er_hint_data"):
                     multidata[key] = convert_to_base_types(multidata[key])
 
-                serialized_multidata = zlib.compress(restricted_dumps(multidata), 9)
+                serialized_multidata = NetUtils.encode_multidata(multidata)
 
                 with open(os.path.join(temp_dir, f'{outfilebase}.archipelago'), 'wb') as f:
-                    f.write(bytes([3]))  # version of format
                     f.write(serialized_multidata)
 
             output_file_futures.append(pool.submit(write_multidata))
@@ -383,5 +415,37 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
             for file in os.scandir(temp_dir):
                 zf.write(file.path, arcname=file.name)
 
+    AutoWorld.log_stage_times(multiworld)
     logger.info('Done. Enjoy. Total Time: %s', time.perf_counter() - start)
     return multiworld
+
+
+_output_multiworld: MultiWorld | None = None
+"""MultiWorld inherited by forked output worker processes."""
+
+
+def _generate_output_in_process(player: int, output_directory: str) -> tuple[dict[str, Any], str | None]:
+    assert _output_multiworld, "output worker was not forked from the generating process"
+    AutoWorld.call_single(_output_multiworld, "generate_output", player, output_directory)
+    world = _output_multiworld.worlds[player]
+    return ({attribute: getattr(world, attribute) for attribute in world.output_attributes if hasattr(world, attribute)},
+            _output_multiworld.spoiler.hashes.get(player))
+
+
+def _apply_process_output(world: AutoWorld.World, future: concurrent.futures.Future) -> None:
+    try:
+        if not future.exception():
+            attributes, spoiler_hash = future.result()
+            for attribute, value in attributes.items():
+                setattr(world, attribute, value)
+            if spoiler_hash is not None:
+                world.multiworld.spoiler.hashes[world.player] = spoiler_hash
+    finally:
+        # make sure stages waiting for this output continue and errors are collected
+        for event in world.output_events:
+            getattr(world, event).set()
+
+
+def _clear_output_multiworld() -> None:
+    global _output_multiworld
+    _output_multiworld = None
@@ -16,6 +16,7 @@ import operator
 import pickle
 import random
 import shlex
+import struct
 import threading
 import time
 import typing
@@ -33,6 +34,7 @@ if typing.TYPE_CHECKING:
 import colorama
 import websockets
 from websockets.extensions.permessage_deflate import PerMessageDeflate, ServerPerMessageDeflateFactory
+from websockets.frames import Frame, Opcode
 try:
     # ponyorm is a requirement for webhost, not default server, so may not be importable
     from pony.orm.dbapiprovider import OperationalError
@@ -133,6 +135,26 @@ modify_functions = {
 }
 
 
+journaled_save_keys = frozenset({"received_items", "location_checks", "hints", "stored_data"})
+"""get_save keys that Context.get_save_delta only contains the changes of"""
+journal_record_header = struct.Struct("<I")
+
+
+def apply_save_delta(savedata: typing.Dict[str, typing.Any], delta: typing.Dict[str, typing.Any]) -> None:
+    """Updates a save from Context.get_save with a delta from Context.get_save_delta that was made after it."""
+    received_items = savedata["received_items"]
+    for key, (saved_count, items) in delta["received_items"].items():
+        key_items = received_items.setdefault(key, [])
+        del key_items[saved_count:]
+        key_items.extend(items)
+    location_checks = savedata["location_checks"]
+    for key, checks in delta["location_checks"].items():
+        location_checks[key] = location_checks.get(key, set()) | checks
+    savedata["hints"].update((key, set(hints)) for key, hints in delta["hints"].items())
+    savedata["stored_data"].update(delta["stored_data"])
+    savedata.update((key, value) for key, value in delta.items() if key not in journaled_save_keys)
+
+
 def get_saving_second(seed_name: str, interval: int = 60) -> int:
     # save at expected times so other systems using savegame can expect it
     # represents the target second of the auto_save_interval at which to save
@@ -212,6 +234,57 @@ class Client(Endpoint):
 team_slot = typing.Tuple[int, int]
 
 
+class EncodedDataPackages:
+    """
+    Encoded data packages of games by checksum and compressed DataPackage replies by checksums of their games,
+    shared by all contexts of the process, dropping the least recently used ones once they take up more than max_size
+    characters and bytes.
+    """
+    max_size: int
+    size: int
+    _packages: collections.OrderedDict[typing.Hashable, typing.Any]
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self._packages = collections.OrderedDict()
+
+    def _get(self, key: typing.Hashable, create: typing.Callable[[], typing.Any],
+             sizeof: typing.Callable[[typing.Any], int]) -> typing.Any:
+        value = self._packages.get(key)
+        if value is None:
+            value = self._packages[key] = create()
+            self.size += sizeof(value)
+            while self.size > self.max_size and len(self._packages) > 1:
+                self.size -= sizeof(self._packages.popitem(last=False)[1])
+        else:
+            self._packages.move_to_end(key)
+        return value
+
+    def get(self, game_package: typing.Dict[str, typing.Any], dumper: typing.Callable[[typing.Any], str]) -> str:
+        checksum = game_package.get("checksum")
+        if checksum is None:
+            return dumper(game_package)
+        return self._get(checksum, lambda: dumper(game_package), len)
+
+    def get_deflated(self, checksums: typing.Tuple[str, ...], window_bits: int,
+                     reply: typing.Callable[[], str]) -> typing.Tuple[bytes, bytes]:
+        """
+        Raw deflate stream of the reply for the games of checksums, as sent in a permessage-deflate frame with
+        window_bits, and the end of the reply that is left in the window of the receiving decompressor.
+        """
+        def deflate() -> typing.Tuple[bytes, bytes]:
+            data = reply().encode("utf-8")
+            compressor = zlib.compressobj(9, zlib.DEFLATED, -window_bits)
+            deflated = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            return deflated.removesuffix(b"\x00\x00\xff\xff"), data[-(1 << window_bits):]
+
+        return self._get((checksums, window_bits), deflate, lambda value: len(value[0]) + len(value[1]))
+
+
+encoded_data_packages = EncodedDataPackages(128 * 1024 * 1024)
+
+
 class Context:
     dumper = staticmethod(encode)
     loader = staticmethod(decode)
@@ -237,6 +310,14 @@ class Context:
     stored_data: typing.Dict[str, object]
     read_data: typing.Dict[str, object]
     stored_data_notification_clients: typing.Dict[str, typing.Set[Client]]
+    stored_data_coalesced_clients: typing.Dict[str, typing.Set[Client]]
+    """clients that get the SetReplies of a key merged into one per event loop tick"""
+    pending_set_replies: typing.Dict[Client, typing.Dict[str, typing.Dict[str, typing.Any]]]
+    stored_data_traffic: typing.Counter[str]
+    """characters of SetReplies sent per key"""
+    tagged_clients: typing.Dict[typing.Tuple[int, str], typing.Set[Client]]
+    """connected clients by team and tag, to route Bounce"""
+    game_slots: typing.Dict[str, typing.List[int]]
     slot_info: typing.Dict[int, NetworkSlot]
     generator_version = Version(0, 0, 0)
     checksums: typing.Dict[str, str]
@@ -277,6 +358,7 @@ class Context:
         self.server = None
         self.countdown_timer = 0
         self.received_items = {}
+        self.pending_item_slots: typing.Set[team_slot] = set()  # slots that received items not yet sent to clients
         self.start_inventory = {}
         self.name_aliases: typing.Dict[team_slot, str] = {}
         self.location_checks = collections.defaultdict(set)
@@ -284,6 +366,8 @@ class Context:
         self.location_check_points = location_check_points
         self.hints_used = collections.defaultdict(int)
         self.hints: typing.Dict[team_slot, typing.Set[Hint]] = collections.defaultdict(set)
+        # unfound hints by (team, finding player, location), may hold hints that were replaced since
+        self.hint_index: typing.Dict[typing.Tuple[int, int, int], typing.Set[Hint]] = collections.defaultdict(set)
         self.release_mode: str = release_mode
         self.remaining_mode: str = remaining_mode
         self.collect_mode: str = collect_mode
@@ -303,8 +387,19 @@ class Context:
         self.auto_save_interval = 60  # in seconds
         self.auto_saver_thread: typing.Optional[threading.Thread] = None
         self.save_dirty = False
+        self.journal_size: typing.Optional[int] = None  # bytes in the save journal, None to write a snapshot next
+        self.snapshot_size = 0
+        self.journal_generation = 0
+        self._saved_item_counts: typing.Dict[typing.Tuple[int, int, bool], int] = {}
+        self._saved_location_checks: typing.Dict[team_slot, typing.Set[int]] = {}
+        self._saved_hints: typing.Dict[team_slot, typing.FrozenSet[Hint]] = {}
+        self._saved_random_state: typing.Optional[typing.Tuple[typing.Any, ...]] = None
+        self.stored_data_changes: typing.Set[str] = set()  # stored_data keys set since the last save
+        # slots whose received items, location checks or hints changed since the last save
+        self.unsaved_slots: typing.Set[team_slot] = set()
         self.tags = ['AP']
         self.games: typing.Dict[int, str] = {}
+        self.game_slots = {}
         self.minimum_client_versions: typing.Dict[int, Version] = {}
         self.seed_name = ""
         self.groups = {}
@@ -312,6 +407,10 @@ class Context:
         self.random = random.Random()
         self.stored_data = {}
         self.stored_data_notification_clients = collections.defaultdict(weakref.WeakSet)
+        self.stored_data_coalesced_clients = collections.defaultdict(weakref.WeakSet)
+        self.pending_set_replies = {}
+        self.stored_data_traffic = collections.Counter()
+        self.tagged_clients = collections.defaultdict(weakref.WeakSet)
         self.read_data = {}
         self.spheres = []
 
@@ -335,37 +434,51 @@ class Context:
         import worlds
         self.gamespackage = worlds.network_data_package["games"]
 
-        self.item_name_groups = {world_name: world.item_name_groups for world_name, world in
-                                 worlds.AutoWorldRegister.world_types.items()}
-        self.location_name_groups = {world_name: world.location_name_groups for world_name, world in
-                                     worlds.AutoWorldRegister.world_types.items()}
-        for world_name, world in worlds.AutoWorldRegister.world_types.items():
-            self.non_hintable_names[world_name] = world.hint_blacklist
+        # taken from the world index, so the server does not need to import any world
+        self.item_name_groups = {world_name: {group: frozenset(names) for group, names in
+                                              info["data_package"]["item_name_groups"].items()}
+                                 for world_name, info in worlds.world_info.items()}
+        self.location_name_groups = {world_name: {group: frozenset(names) for group, names in
+                                                  info["data_package"]["location_name_groups"].items()}
+                                     for world_name, info in worlds.world_info.items()}
+        for world_name, info in worlds.world_info.items():
+            self.non_hintable_names[world_name] = frozenset(info["hint_blacklist"])
 
         for game_package in self.gamespackage.values():
-            # remove groups from data sent to clients
-            del game_package["item_name_groups"]
-            del game_package["location_name_groups"]
+            # remove groups from data sent to clients, the package is shared by all contexts of the process
+            game_package.pop("item_name_groups", None)
+            game_package.pop("location_name_groups", None)
 
     def _init_game_data(self):
         for game_name, game_package in self.gamespackage.items():
             if "checksum" in game_package:
                 self.checksums[game_name] = game_package["checksum"]
-            for item_name, item_id in game_package["item_name_to_id"].items():
+            self._init_game_names(game_name, game_package)
+
+    def _init_game_names(self, game_name: str, game_package: typing.Dict[str, typing.Any]):
+        """Builds the id to name lookups and the name sets of a game."""
+        for item_name, item_id in game_package["item_name_to_id"].items():
+            self.item_names[game_name][item_id] = item_name
+        for location_name, location_id in game_package["location_name_to_id"].items():
+            self.location_names[game_name][location_id] = location_name
+        self.all_item_and_group_names[game_name] = \
+            set(game_package["item_name_to_id"]) | set(self.item_name_groups[game_name])
+        self.all_location_and_group_names[game_name] = \
+            set(game_package["location_name_to_id"]) | set(self.location_name_groups.get(game_name, []))
+
+        if game_name != "Archipelago" and "Archipelago" in self.gamespackage:
+            # Add Archipelago items and locations to each data package.
+            archipelago_package = self.gamespackage["Archipelago"]
+            for item_name, item_id in archipelago_package["item_name_to_id"].items():
                 self.item_names[game_name][item_id] = item_name
-            for location_name, location_id in game_package["location_name_to_id"].items():
+            for location_name, location_id in archipelago_package["location_name_to_id"].items():
                 self.location_names[game_name][location_id] = location_name
-            self.all_item_and_group_names[game_name] = \
-                set(game_package["item_name_to_id"]) | set(self.item_name_groups[game_name])
-            self.all_location_and_group_names[game_name] = \
-                set(game_package["location_name_to_id"]) | set(self.location_name_groups.get(game_name, []))
-
-        archipelago_item_names = self.item_names["Archipelago"]
-        archipelago_location_names = self.location_names["Archipelago"]
-        for game in [game_name for game_name in self.gamespackage if game_name != "Archipelago"]:
-            # Add Archipelago items and locations to each data package.
-            self.item_names[game].update(archipelago_item_names)
-            self.location_names[game].update(archipelago_location_names)
+
+    def get_data_package_reply(self, games: typing.Iterable[str]) -> str:
+        """Encoded DataPackage reply for games, put together from the encoded data package of each game."""
+        encoded_games = ",".join(f"{self.dumper(game)}:{encoded_data_packages.get(self.gamespackage[game], self.dumper)}"
+                                 for game in games)
+        return f'[{{"cmd":"DataPackage","data":{{"games":{{{encoded_games}}}}}}}]'
 
     def item_names_for_game(self, game: str) -> typing.Optional[typing.Dict[str, int]]:
         return self.gamespackage[game]["item_name_to_id"] if game in self.gamespackage else None
@@ -403,6 +516,40 @@ class Context:
                 self.logger.info(f"Outgoing message: {msg}")
             return True
 
+    async def send_data_package(self, endpoint: Endpoint, games: typing.List[str]) -> bool:
+        """
+        Send the DataPackage reply for games. On connections compressed with permessage-deflate only, the cached
+        compressed reply is sent as is, instead of compressing the whole reply again for every client.
+        """
+        socket = endpoint.socket
+        checksums = tuple(self.gamespackage[game].get("checksum") for game in games)
+        if not socket or not socket.open or len(socket.extensions) != 1 or None in checksums \
+                or not isinstance(socket.extensions[0], PerMessageDeflate):
+            return await self.send_encoded_msgs(endpoint, self.get_data_package_reply(games))
+        deflate: PerMessageDeflate = socket.extensions[0]
+        data, window = encoded_data_packages.get_deflated(checksums, deflate.local_max_window_bits,
+                                                          lambda: self.get_data_package_reply(games))
+        try:
+            await socket.ensure_open()
+            # The reply was compressed on its own, so the compressor of the connection has to continue from the
+            # window the client decompressed it into. Nothing may be sent in between, so neither of these can await.
+            # serialize only allows RSV1, marking the message as compressed, when the extension compresses it
+            frame = bytearray(Frame(Opcode.TEXT, data).serialize(mask=False))
+            frame[0] |= 0b01000000
+            socket.transport.write(frame)
+            if not deflate.local_no_context_takeover:
+                deflate.encoder = zlib.compressobj(wbits=-deflate.local_max_window_bits, zdict=window,
+                                                   **deflate.compress_settings)
+            await socket.drain()
+        except websockets.ConnectionClosed:
+            self.logger.exception("Exception during send_data_package")
+            await self.disconnect(endpoint)
+            return False
+        else:
+            if self.log_network:
+                self.logger.info(f"Outgoing message: {self.get_data_package_reply(games)}")
+            return True
+
     async def broadcast_send_encoded_msgs(self, endpoints: typing.Iterable[Endpoint], msg: str) -> bool:
         sockets = []
         for endpoint in endpoints:
@@ -451,8 +598,91 @@ class Context:
             self.endpoints.remove(endpoint)
         if endpoint.slot and endpoint in self.clients[endpoint.team][endpoint.slot]:
             self.clients[endpoint.team][endpoint.slot].remove(endpoint)
+            self.discard_client_tags(endpoint)
         await on_client_disconnected(self, endpoint)
 
+    def send_set_reply(self, reply: typing.Dict[str, typing.Any], requester: typing.Optional[Client] = None) -> None:
+        """
+        Sends a SetReply to the clients notified of its key and to requester.
+        Clients that asked for coalesced notifications of the key instead get it merged with the other SetReplies of
+        the key in the current event loop tick, replies to requester are never merged.
+        """
+        key: str = reply["key"]
+        targets: typing.Set[Client] = set(self.stored_data_notification_clients[key])
+        coalesced_clients = self.stored_data_coalesced_clients.get(key)
+        if coalesced_clients:
+            coalesced_targets = targets.intersection(coalesced_clients)
+            coalesced_targets.discard(requester)
+            if coalesced_targets:
+                targets -= coalesced_targets
+                self._queue_set_reply(coalesced_targets, key, reply)
+        if requester is not None:
+            targets.add(requester)
+        if targets:
+            self.flush_set_replies(targets)  # keep the order of replies to clients that also have coalesced ones
+            data = self.dumper([reply])
+            self.stored_data_traffic[key] += len(data) * len(targets)
+            async_start(self.broadcast_send_encoded_msgs(targets, data))
+
+    def _queue_set_reply(self, clients: typing.Iterable[Client], key: str, reply: typing.Dict[str, typing.Any]) -> None:
+        if not self.pending_set_replies:
+            asyncio.get_running_loop().call_soon(self.flush_set_replies)
+        for client in clients:
+            pending = self.pending_set_replies.setdefault(client, {})
+            previous = pending.pop(key, None)  # merged reply goes where the last change of the key happened
+            if previous is not None and "original_value" in previous:
+                pending[key] = {**reply, "original_value": previous["original_value"]}
+            else:
+                pending[key] = reply
+
+    def flush_set_replies(self, clients: typing.Optional[typing.Iterable[Client]] = None) -> None:
+        """Sends the coalesced SetReplies waiting for clients, or for all clients."""
+        if clients is None:
+            pending_replies = self.pending_set_replies
+            self.pending_set_replies = {}
+        else:
+            pending_replies = {client: self.pending_set_replies.pop(client) for client in clients
+                               if client in self.pending_set_replies}
+        encoded_replies: typing.Dict[int, str] = {}  # unmerged replies are shared by their clients
+        for client, replies in pending_replies.items():
+            encoded = []
+            for key, reply in replies.items():
+                data = encoded_replies.get(id(reply))
+                if data is None:
+                    data = encoded_replies[id(reply)] = self.dumper(reply)
+                self.stored_data_traffic[key] += len(data)
+                encoded.append(data)
+            # broadcast writes without yielding to the event loop, so the replies stay in order with later ones
+            async_start(self.broadcast_send_encoded_msgs((client,), f"[{','.join(encoded)}]"))
+
+    def discard_client_tags(self, client: Client) -> None:
+        """Removes client from tagged_clients, before it disconnects or changes team."""
+        for tag in client.tags:
+            tagged = self.tagged_clients.get((client.team, tag))
+            if tagged is not None:
+                tagged.discard(client)
+
+    def set_client_tags(self, client: Client, tags: typing.List[str]) -> None:
+        """Sets the tags of a connected client, keeping tagged_clients up to date."""
+        self.discard_client_tags(client)
+        client.tags = tags
+        for tag in tags:
+            self.tagged_clients[client.team, tag].add(client)
+
+    def get_bounce_targets(self, team: int, games: typing.Set[str], slots: typing.Set[int],
+                           tags: typing.Set[str]) -> typing.Set[Client]:
+        """Connected clients of team that play one of games, are connected to one of slots or have one of tags."""
+        team_clients = self.clients[team]
+        targets: typing.Set[Client] = set()
+        for game in games:
+            for slot in self.game_slots.get(game, ()):
+                targets.update(team_clients.get(slot, ()))
+        for slot in slots:
+            targets.update(team_clients.get(slot, ()))
+        for tag in tags:
+            targets.update(self.tagged_clients.get((team, tag), ()))
+        return targets
+
     def notify_client(self, client: Client, text: str, additional_arguments: dict = {}):
         if not client.auth or client.no_text:
             return
@@ -485,10 +715,12 @@ class Context:
         self.data_filename = multidatapath
 
     @staticmethod
-    def decompress(data: bytes) -> dict:
+    def decompress(data: bytes) -> typing.MutableMapping[str, typing.Any]:
         format_version = data[0]
-        if format_version > 3:
+        if format_version > NetUtils.multidata_sections_format_version:
             raise Utils.VersionException("Incompatible multidata.")
+        if format_version == NetUtils.multidata_sections_format_version:
+            return NetUtils.MultiDataSections.from_bytes(data)
         return restricted_loads(zlib.decompress(data[1:]))
 
     def _load(self, decoded_obj: MultiData, game_data_packages: typing.Dict[str, typing.Any],
@@ -513,6 +745,9 @@ class Context:
 
         self.slot_info = decoded_obj["slot_info"]
         self.games = {slot: slot_info.game for slot, slot_info in self.slot_info.items()}
+        self.game_slots = {}
+        for slot, game in self.games.items():
+            self.game_slots.setdefault(game, []).append(slot)
         self.groups = {slot: set(slot_info.group_members) for slot, slot_info in self.slot_info.items()
                        if slot_info.type == SlotType.group}
 
@@ -535,8 +770,9 @@ class Context:
         self.connect_names = decoded_obj['connect_names']
         self.locations = LocationStore(decoded_obj.pop("locations"))  # pre-emptively free memory
         self.slot_data = decoded_obj['slot_data']
-        for slot, data in self.slot_data.items():
-            self.read_data[f"slot_data_{slot}"] = lambda data=data: data
+        for slot in self.slot_data:
+            # looked up when read, to only decode the slot data of slots that are used
+            self.read_data[f"slot_data_{slot}"] = lambda slot=slot: self.slot_data[slot]
         self.er_hint_data = {int(player): {int(address): name for address, name in loc_data.items()}
                              for player, loc_data in decoded_obj["er_hint_data"].items()}
 
@@ -546,6 +782,7 @@ class Context:
 
         for slot, hints in decoded_obj["precollected_hints"].items():
             self.hints[0, slot].update(hints)
+            self.index_hints(0, hints)
 
         # declare slots that aren't players as done
         for slot, slot_info in self.slot_info.items():
@@ -590,18 +827,76 @@ class Context:
 
         return False
 
+    @property
+    def journal_filename(self) -> str:
+        return self.save_filename + ".journal"
+
     def _save(self, exit_save: bool = False) -> bool:
+        """
+        Appends the changes since the last save to the save journal,
+        or writes a new snapshot and starts a new journal once the journal grew larger than the snapshot.
+        """
         try:
-            # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
-            encoded_save = pickle.dumps(self.get_save())
-            with open(self.save_filename, "wb") as f:
-                f.write(zlib.compress(encoded_save))
+            if self.journal_size is None or self.journal_size > self.snapshot_size:
+                self._save_snapshot()
+            else:
+                # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
+                self._append_journal(self.get_save_delta())
         except Exception as e:
             self.logger.exception(e)
+            self.journal_size = None  # the journal may be incomplete now, so rely on a new snapshot
             return False
         else:
             return True
 
+    def _save_snapshot(self):
+        self.journal_generation += 1
+        # changes made while the snapshot is taken also end up in the next journal record, replaying them is harmless
+        self.reset_save_baseline()
+        savedata = self.get_save()
+        savedata["journal_generation"] = self.journal_generation
+        encoded_save = zlib.compress(pickle.dumps(savedata))
+        with open(self.save_filename, "wb") as f:
+            f.write(encoded_save)
+        self.snapshot_size = len(encoded_save)
+        # a journal of an older generation is ignored on load, in case the snapshot is written but this isn't
+        self.journal_size = 0
+        self._append_journal({"journal_generation": self.journal_generation}, new_journal=True)
+
+    def _append_journal(self, record: typing.Dict[str, typing.Any], new_journal: bool = False):
+        encoded_record = zlib.compress(pickle.dumps(record))
+        with open(self.journal_filename, "wb" if new_journal else "ab") as f:
+            f.write(journal_record_header.pack(len(encoded_record)) + encoded_record)
+        self.journal_size += journal_record_header.size + len(encoded_record)
+
+    def _load_journal(self, savedata: typing.Dict[str, typing.Any]) -> int:
+        """Applies the records of the save journal that belongs to savedata, returns how many were applied."""
+        try:
+            with open(self.journal_filename, "rb") as f:
+                journal = f.read()
+        except FileNotFoundError:
+            return 0
+        position = 0
+        records: typing.List[typing.Dict[str, typing.Any]] = []
+        while position + journal_record_header.size <= len(journal):
+            size, = journal_record_header.unpack_from(journal, position)
+            position += journal_record_header.size
+            if position + size > len(journal):
+                self.logger.warning("Ignoring incomplete last record of save journal.")
+                break
+            try:
+                records.append(restricted_loads(zlib.decompress(journal[position:position + size])))
+            except Exception as e:
+                # later records may depend on this one, so none of them can be applied
+                self.logger.warning(f"Ignoring corrupt save journal from record {len(records)} on: {e}")
+                break
+            position += size
+        if not records or records[0].get("journal_generation") != savedata.get("journal_generation", None):
+            return 0
+        for delta in records[1:]:
+            apply_save_delta(savedata, delta)
+        return len(records) - 1
+
     def init_save(self, enabled: bool = True):
         self.saving = enabled
         if self.saving:
@@ -613,7 +908,10 @@ class Context:
             try:
                 with open(self.save_filename, 'rb') as f:
                     save_data = restricted_loads(zlib.decompress(f.read()))
-                    self.set_save(save_data)
+                if self._load_journal(save_data):
+                    self.logger.info(f"Replayed save journal {self.journal_filename}.")
+                self.journal_generation = save_data.get("journal_generation", 0)
+                self.set_save(save_data)
             except FileNotFoundError:
                 self.logger.error('No save data found, starting a new game')
             except Exception as e:
@@ -652,23 +950,30 @@ class Context:
                 atexit.register(self._save, True)  # make sure we save on exit too
 
     def get_save(self) -> dict:
-        self.recheck_hints()
-        d = {
-            "version": self.save_version,
-            "connect_names": self.connect_names,
+        # hints are kept up to date by mark_hints_found, and rechecked once when a save gets loaded
+        d = self._get_save_state()
+        d.update({
             "received_items": self.received_items,
-            "hints_used": dict(self.hints_used),
             "hints": dict(self.hints),
             "location_checks": dict(self.location_checks),
+            "random_state": self.random.getstate(),
+            "stored_data": self.stored_data,
+        })
+        return d
+
+    def _get_save_state(self) -> dict:
+        """Returns the parts of get_save that every journal record contains in full."""
+        return {
+            "version": self.save_version,
+            "connect_names": self.connect_names,
+            "hints_used": dict(self.hints_used),
             "name_aliases": self.name_aliases,
             "client_game_state": dict(self.client_game_state),
             "client_activity_timers": tuple(
                 (key, value.timestamp()) for key, value in self.client_activity_timers.items()),
             "client_connection_timers": tuple(
                 (key, value.timestamp()) for key, value in self.client_connection_timers.items()),
-            "random_state": self.random.getstate(),
             "group_collected": dict(self.group_collected),
-            "stored_data": self.stored_data,
             "game_options": {"hint_cost": self.hint_cost, "location_check_points": self.location_check_points,
                              "server_password": self.server_password, "password": self.password,
                              "release_mode": self.release_mode,
@@ -678,8 +983,54 @@ class Context:
 
         }
 
+    def get_save_delta(self) -> dict:
+        """
+        Returns get_save, but with received_items, location_checks, hints and stored_data only containing what changed
+        since the last call or reset_save_baseline, as tracked by unsaved_slots and stored_data_changes.
+        See apply_save_delta.
+        """
+        d = self._get_save_state()
+        random_state = self.random.getstate()
+        if random_state != self._saved_random_state:  # large and rarely used
+            d["random_state"] = self._saved_random_state = random_state
+        unsaved_slots, self.unsaved_slots = self.unsaved_slots, set()
+        received_items: typing.Dict[typing.Tuple[int, int, bool], typing.Tuple[int, typing.List[NetworkItem]]] = {}
+        location_checks: typing.Dict[team_slot, typing.Set[int]] = {}
+        hints: typing.Dict[team_slot, typing.FrozenSet[Hint]] = {}
+        for team, slot in unsaved_slots:
+            for key in ((team, slot, False), (team, slot, True)):
+                items = self.received_items.get(key, ())
+                saved_count = self._saved_item_counts.get(key, 0)
+                if len(items) != saved_count:
+                    received_items[key] = saved_count, items[saved_count:]
+                    self._saved_item_counts[key] = len(items)
+
+            checks = self.location_checks.get((team, slot), set())
+            saved_checks = self._saved_location_checks.setdefault((team, slot), set())
+            if len(checks) != len(saved_checks):
+                location_checks[team, slot] = checks - saved_checks
+                saved_checks |= location_checks[team, slot]
+
+            slot_hints = self.hints.get((team, slot), set())
+            if self._saved_hints.get((team, slot), frozenset()) != slot_hints:
+                hints[team, slot] = self._saved_hints[team, slot] = frozenset(slot_hints)
+        d["received_items"] = received_items
+        d["location_checks"] = location_checks
+        d["hints"] = hints
+
+        d["stored_data"] = {key: self.stored_data[key] for key in self.stored_data_changes if key in self.stored_data}
+        self.stored_data_changes.clear()
         return d
 
+    def reset_save_baseline(self):
+        """Sets the state that the next get_save_delta is relative to to the current state."""
+        self._saved_item_counts = {key: len(items) for key, items in self.received_items.items()}
+        self._saved_location_checks = {key: set(checks) for key, checks in self.location_checks.items()}
+        self._saved_hints = {key: frozenset(hints) for key, hints in self.hints.items()}
+        self._saved_random_state = self.random.getstate()
+        self.stored_data_changes.clear()
+        self.unsaved_slots.clear()
+
     def set_save(self, savedata: dict):
         if self.connect_names != savedata["connect_names"]:
             raise Exception("This savegame does not appear to match the loaded multiworld.")
@@ -699,6 +1050,10 @@ class Context:
              in savedata["client_activity_timers"]})
         self.location_checks.update(savedata["location_checks"])
         self.random.setstate(savedata["random_state"])
+        self.recheck_hints()
+        self.hint_index.clear()
+        for (team, _), hints in self.hints.items():
+            self.index_hints(team, hints)
 
         if "game_options" in savedata:
             self.hint_cost = savedata["game_options"]["hint_cost"]
@@ -746,6 +1101,7 @@ class Context:
                 new_hints.add(new_hint)
                 if hint == new_hint:
                     continue
+                self.unsaved_slots.add((hint_team, hint_slot))
                 for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
                     if changed is not None:
                         changed.add((hint_team,player))
@@ -754,9 +1110,32 @@ class Context:
             self.hints[hint_team, hint_slot] = new_hints
 
     def get_rechecked_hints(self, team: int, slot: int):
-        self.recheck_hints(team, slot)
+        # found hints get replaced as their locations get checked, see mark_hints_found
         return self.hints[team, slot]
 
+    def index_hints(self, team: int, hints: typing.Iterable[Hint]) -> None:
+        """Adds hints to hint_index, so that mark_hints_found can find them."""
+        for hint in hints:
+            if not hint.found:
+                self.hint_index[team, hint.finding_player, hint.location].add(hint)
+
+    def mark_hints_found(self, team: int, slot: int, locations: typing.Iterable[int],
+                         changed: typing.Optional[typing.Set[team_slot]] = None) -> None:
+        """Replaces the remembered hints for the newly checked locations of a slot with found ones.
+        If a set is passed for 'changed', each (team,slot) pair that has at least one hint modified will be added.
+        """
+        for location in locations:
+            hints = self.hint_index.pop((team, slot, location), None)
+            if not hints:
+                continue
+            for hint in hints:
+                new_hint = hint.re_check(self, team)
+                for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
+                    if hint in self.hints[team, player]:
+                        self.replace_hint(team, player, hint, new_hint)
+                        if changed is not None:
+                            changed.add((team, player))
+
     def get_sphere(self, player: int, location_id: int) -> int:
         """Get sphere of a location, -1 if spheres are not available."""
         if self.spheres:
@@ -827,8 +1206,10 @@ class Context:
                     for player in self.slot_set(hint.receiving_player):
                         self.hints[team, player].add(hint)
                         new_hint_events.add(player)
+                    self.index_hints(team, (hint,))
 
             self.logger.info("Notice (Team #%d): %s" % (team + 1, format_hint(self, team, hint)))
+        self.unsaved_slots.update((team, slot) for slot in new_hint_events)
         for slot in new_hint_events:
             self.on_new_hint(team, slot)
         for slot, hint_data in concerns.items():
@@ -850,6 +1231,8 @@ class Context:
         if old_hint in self.hints[team, slot]:
             self.hints[team, slot].remove(old_hint)
             self.hints[team, slot].add(new_hint)
+            self.unsaved_slots.add((team, slot))
+            self.index_hints(team, (new_hint,))
     
     # "events"
 
@@ -872,15 +1255,13 @@ class Context:
 
     def on_changed_hints(self, team: int, slot: int):
         key: str = f"_read_hints_{team}_{slot}"
-        targets: typing.Set[Client] = set(self.stored_data_notification_clients[key])
-        if targets:
-            self.broadcast(targets, [{"cmd": "SetReply", "key": key, "value": self.hints[team, slot]}])
+        if self.stored_data_notification_clients[key]:
+            self.send_set_reply({"cmd": "SetReply", "key": key, "value": self.hints[team, slot]})
 
     def on_client_status_change(self, team: int, slot: int):
         key: str = f"_read_client_status_{team}_{slot}"
-        targets: typing.Set[Client] = set(self.stored_data_notification_clients[key])
-        if targets:
-            self.broadcast(targets, [{"cmd": "SetReply", "key": key, "value": self.client_game_state[team, slot]}])
+        if self.stored_data_notification_clients[key]:
+            self.send_set_reply({"cmd": "SetReply", "key": key, "value": self.client_game_state[team, slot]})
 
 
 def update_aliases(ctx: Context, team: int):
@@ -905,7 +1286,7 @@ async def server(websocket: "ServerConnection", path: str = "/", ctx: Context =
         async for data in websocket:
             if ctx.log_network:
                 ctx.logger.info(f"Incoming message: {data}")
-            for msg in decode(data):
+            for msg in ctx.loader(data):
                 await process_client_cmd(ctx, client, msg)
     except Exception as e:
         if not isinstance(e, websockets.WebSocketException):
@@ -1072,20 +1453,25 @@ def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool)
 
 
 def send_new_items(ctx: Context):
-    for team, clients in ctx.clients.items():
-        for slot, clients in clients.items():
-            for client in clients:
-                if client.no_items:
-                    continue
-                start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
-                items = get_received_items(ctx, team, slot, client.remote_items)
-                if len(start_inventory) + len(items) > client.send_index:
-                    first_new_item = max(0, client.send_index - len(start_inventory))
-                    async_start(ctx.send_msgs(client, [{
-                        "cmd": "ReceivedItems",
-                        "index": client.send_index,
-                        "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
-                    client.send_index = len(start_inventory) + len(items)
+    """Sends ReceivedItems to the clients of slots that received items since the last call."""
+    pending_item_slots, ctx.pending_item_slots = ctx.pending_item_slots, set()
+    for team, slot in pending_item_slots:
+        for client in ctx.clients[team].get(slot, ()):
+            if client.no_items:
+                continue
+            start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
+            items = get_received_items(ctx, team, slot, client.remote_items)
+            if len(start_inventory) + len(items) > client.send_index:
+                if client.send_index < len(start_inventory):
+                    new_items = list(itertools.chain(
+                        itertools.islice(start_inventory, client.send_index, None), items))
+                else:
+                    new_items = items[client.send_index - len(start_inventory):]
+                async_start(ctx.send_msgs(client, [{
+                    "cmd": "ReceivedItems",
+                    "index": client.send_index,
+                    "items": new_items}]))
+                client.send_index = len(start_inventory) + len(items)
 
 
 def update_checked_locations(ctx: Context, team: int, slot: int):
@@ -1133,6 +1519,8 @@ def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem
             if item.player != target_slot:
                 get_received_items(ctx, team, target, False).append(item)
             get_received_items(ctx, team, target, True).append(item)
+        ctx.pending_item_slots.add((team, target))
+        ctx.unsaved_slots.add((team, target))
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
@@ -1170,6 +1558,7 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
         del sortable
 
         ctx.location_checks[team, slot] |= new_locations
+        ctx.unsaved_slots.add((team, slot))
         send_new_items(ctx)
         ctx.broadcast(ctx.clients[team][slot], [{
             "cmd": "RoomUpdate",
@@ -1177,7 +1566,7 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
             "checked_locations": new_locations,  # send back new checks only
         }])
         updated_slots: typing.Set[tuple[int, int]] = set()
-        ctx.recheck_hints(team, slot, updated_slots)
+        ctx.mark_hints_found(team, slot, new_locations, updated_slots)
         for hint_team, hint_slot in updated_slots:
             ctx.on_changed_hints(hint_team, hint_slot)
         ctx.save()
@@ -1669,6 +2058,8 @@ class ClientMessageProcessor(CommonCommandProcessor):
                 new_item = NetworkItem(names[item_name], -1, self.client.slot)
                 get_received_items(self.ctx, self.client.team, self.client.slot, False).append(new_item)
                 get_received_items(self.ctx, self.client.team, self.client.slot, True).append(new_item)
+                self.ctx.pending_item_slots.add((self.client.team, self.client.slot))
+                self.ctx.unsaved_slots.add((self.client.team, self.client.slot))
                 self.ctx.broadcast_text_all(
                     'Cheat console: sending "' + item_name + '" to ' + self.ctx.get_aliased_name(self.client.team,
                                                                                                  self.client.slot),
@@ -1689,6 +2080,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
             hints = {hint.re_check(self.ctx, self.client.team) for hint in
                      self.ctx.hints[self.client.team, self.client.slot]}
             self.ctx.hints[self.client.team, self.client.slot] = hints
+            self.ctx.unsaved_slots.add((self.client.team, self.client.slot))
             self.ctx.notify_hints(self.client.team, list(hints), recipients=(self.client.slot,))
             self.output(f"A hint costs {self.ctx.get_hint_cost(self.client.slot)} points. "
                         f"You have {points_available} points.")
@@ -1899,6 +2291,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             team, slot = ctx.connect_names[args['name']]
             if client.auth and client.team is not None and client.slot in ctx.clients[client.team]:
                 ctx.clients[team][slot].remove(client)  # re-auth, remove old entry
+                ctx.discard_client_tags(client)
                 if client.team != team or client.slot != slot:
                     client.auth = False  # swapping Team/Slot
             client.team = team
@@ -1907,7 +2300,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             ctx.client_ids[client.team, client.slot] = args["uuid"]
             ctx.clients[team][slot].append(client)
             client.version = args['version']
-            client.tags = args['tags']
+            ctx.set_client_tags(client, args['tags'])
             client.no_locations = bool(client.tags & _non_game_messages.keys())
             # set NoText for old PopTracker clients that predate the tag to save traffic
             client.no_text = "NoText" in client.tags or ("PopTracker" in client.tags and client.version < (0, 5, 1))
@@ -1936,23 +2329,15 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
     elif cmd == "GetDataPackage":
         exclusions = args.get("exclusions", [])
         if "games" in args:
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name in set(args.get("games", []))}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": games}}])
+            requested_games = set(args.get("games", []))
+            games = [name for name in ctx.gamespackage if name in requested_games]
         # TODO: remove exclusions behaviour around 0.5.0
         elif exclusions:
             exclusions = set(exclusions)
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name not in exclusions}
-
-            package = {"games": games}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": package}])
-
+            games = [name for name in ctx.gamespackage if name not in exclusions]
         else:
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": ctx.gamespackage}}])
+            games = list(ctx.gamespackage)
+        await ctx.send_data_package(client, games)
 
     elif client.auth:
         if cmd == "ConnectUpdate":
@@ -1980,7 +2365,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
 
             if "tags" in args:
                 old_tags = client.tags
-                client.tags = args["tags"]
+                ctx.set_client_tags(client, args["tags"])
                 if set(old_tags) != set(client.tags):
                     client.no_locations = bool(client.tags & _non_game_messages.keys())
                     client.no_text = "NoText" in client.tags or (
@@ -2146,12 +2531,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             slots = set(args.get("slots", []))
             args["cmd"] = "Bounced"
             msg = ctx.dumper([args])
-
-            for bounceclient in ctx.endpoints:
-                if client.team == bounceclient.team and (ctx.games[bounceclient.slot] in games or
-                                                         set(bounceclient.tags) & tags or
-                                                         bounceclient.slot in slots):
-                    await ctx.send_encoded_msgs(bounceclient, msg)
+            await ctx.broadcast_send_encoded_msgs(ctx.get_bounce_targets(client.team, games, slots, tags), msg)
 
         elif cmd == "Get":
             if "keys" not in args or type(args["keys"]) != list:
@@ -2181,11 +2561,8 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 func = modify_functions[operation["operation"]]
                 value = func(value, operation["value"])
             ctx.stored_data[args["key"]] = args["value"] = value
-            targets = set(ctx.stored_data_notification_clients[args["key"]])
-            if args.get("want_reply", False):
-                targets.add(client)
-            if targets:
-                ctx.broadcast(targets, [args])
+            ctx.stored_data_changes.add(args["key"])
+            ctx.send_set_reply(args, client if args.get("want_reply", False) else None)
             ctx.save()
 
         elif cmd == "SetNotify":
@@ -2193,8 +2570,13 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                 await ctx.send_msgs(client, [{'cmd': 'InvalidPacket', "type": "arguments",
                                               "text": 'SetNotify', "original_cmd": cmd}])
                 return
+            coalesce = bool(args.get("coalesce", False))
             for key in args["keys"]:
                 ctx.stored_data_notification_clients[key].add(client)
+                if coalesce:
+                    ctx.stored_data_coalesced_clients[key].add(client)
+                elif key in ctx.stored_data_coalesced_clients:
+                    ctx.stored_data_coalesced_clients[key].discard(client)
 
 
 def update_client_status(ctx: Context, client: Client, new_status: ClientStatus):
@@ -2249,6 +2631,17 @@ class ServerCommandProcessor(CommonCommandProcessor):
             self.output(get_status_string(self.ctx, team, tag))
         return True
 
+    def _cmd_datastorage(self, count: str = "10") -> bool:
+        """List the data storage keys that sent the most data to clients, to spot oversized keys"""
+        try:
+            count = int(count)
+        except ValueError:
+            self.output(f"Could not parse {count} as a number.")
+            return False
+        for key, traffic in self.ctx.stored_data_traffic.most_common(count):
+            self.output(f"{key}: {Utils.format_SI_prefix(traffic)} characters sent")
+        return True
+
     def _cmd_exit(self) -> bool:
         """Shutdown the server"""
         try:
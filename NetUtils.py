@@ -3,13 +3,17 @@ from __future__ import annotations
 from collections.abc import Mapping, Sequence
 import typing
 import enum
+import heapq
+import pickle
+import struct
 import warnings
+import zlib
 from json import JSONEncoder, JSONDecoder
 
 if typing.TYPE_CHECKING:
     from websockets import WebSocketServerProtocol as ServerConnection
 
-from Utils import ByValue, Version
+from Utils import ByValue, Version, restricted_dumps, restricted_loads
 
 
 class HintStatus(ByValue, enum.IntEnum):
@@ -135,10 +139,6 @@ _encode = JSONEncoder(
 ).encode
 
 
-def encode(obj: typing.Any) -> str:
-    return _encode(_scan_for_TypedTuples(obj))
-
-
 def get_any_version(data: dict) -> Version:
     data = {key.lower(): value for key, value in data.items()}  # .NET version classes have capitalized keys
     return Version(int(data["major"]), int(data["minor"]), int(data["build"]))
@@ -170,7 +170,89 @@ def _object_hook(o: typing.Any) -> typing.Any:
     return o
 
 
-decode = JSONDecoder(object_hook=_object_hook).decode
+_decode = JSONDecoder(object_hook=_object_hook).decode
+
+
+def _apply_object_hook(obj: typing.Any) -> typing.Any:
+    """Apply _object_hook to all dicts in decoded data, inner ones first, like JSONDecoder's object_hook."""
+    if type(obj) is list:
+        for index, value in enumerate(obj):
+            value_type = type(value)
+            if value_type is dict or value_type is list:
+                obj[index] = _apply_object_hook(value)
+        return obj
+    for key, value in obj.items():
+        value_type = type(value)
+        if value_type is dict or value_type is list:
+            obj[key] = _apply_object_hook(value)
+    return _object_hook(obj) if "class" in obj else obj
+
+
+class WireCodec:
+    """Encodes and decodes messages of the network protocol using the json module."""
+    name: typing.ClassVar[str] = "json"
+
+    def encode(self, obj: typing.Any) -> str:
+        return _encode(_scan_for_TypedTuples(obj))
+
+    def decode(self, data: str) -> typing.Any:
+        return _decode(data)
+
+
+class ORJSONWireCodec(WireCodec):
+    """
+    Encodes and decodes messages of the network protocol using orjson, converting NamedTuples while encoding,
+    instead of in a separate pass over the message.
+    Output is the same as WireCodec's, except for floats, which get written in their shortest form (1e16 over 1e+16),
+    and non-finite floats, which get written as null instead of the non-standard NaN and Infinity.
+    Messages orjson can't handle, such as integers beyond 64 bit, are handled by WireCodec.
+    """
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+        self._option = orjson.OPT_NON_STR_KEYS
+        self._encode_error = orjson.JSONEncodeError
+        self._decode_error = orjson.JSONDecodeError
+
+    @staticmethod
+    def _default(obj: typing.Any) -> typing.Any:
+        fields = getattr(obj, "_fields", None)
+        if fields is not None and isinstance(obj, tuple):
+            data = dict(zip(fields, obj))
+            data["class"] = obj.__class__.__name__
+            return data
+        if isinstance(obj, (set, frozenset)):
+            return tuple(obj)
+        raise TypeError
+
+    def encode(self, obj: typing.Any) -> str:
+        try:
+            return self._dumps(obj, default=self._default, option=self._option).decode()
+        except self._encode_error:
+            return super().encode(obj)
+
+    def decode(self, data: str) -> typing.Any:
+        try:
+            obj = self._loads(data)
+        except self._decode_error:
+            return super().decode(data)
+        # _object_hook only acts on objects with a class, which most messages don't contain
+        return _apply_object_hook(obj) if "class" in data else obj
+
+
+def get_default_wire_codec() -> WireCodec:
+    try:
+        return ORJSONWireCodec()
+    except ImportError:
+        return WireCodec()
+
+
+wire_codec: WireCodec = get_default_wire_codec()
+encode = wire_codec.encode
+decode = wire_codec.decode
 
 
 class Endpoint:
@@ -415,6 +497,11 @@ class Hint(typing.NamedTuple):
 
 
 class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
+    _receiver_index: typing.Dict[int, typing.Dict[int, typing.Set[int]]]
+    """receiving player -> finding player -> location ids"""
+    _item_index: typing.Dict[typing.Tuple[int, int], typing.List[typing.Tuple[int, int, int, int, int]]]
+    """(receiving player, item id) -> find_item results"""
+
     def __init__(self, values: typing.MutableMapping[int, typing.Dict[int, typing.Tuple[int, int, int]]]):
         super().__init__(values)
 
@@ -427,21 +514,25 @@ class _LocationStore(dict, typing.MutableMapping[int, typing.Dict[int, typing.Tu
         if len(self.get(0, {})):
             raise ValueError("Invalid player id 0 for location")
 
+        self._receiver_index = {}
+        self._item_index = {}
+        for finding_player, check_data in sorted(self.items()):
+            for location_id, (item_id, receiving_player, item_flags) in sorted(check_data.items()):
+                self._receiver_index.setdefault(receiving_player, {}).setdefault(finding_player, set()).add(
+                    location_id)
+                self._item_index.setdefault((receiving_player, item_id), []).append(
+                    (finding_player, location_id, item_id, receiving_player, item_flags))
+
     def find_item(self, slots: typing.Set[int], seeked_item_id: int
                   ) -> typing.Generator[typing.Tuple[int, int, int, int, int], None, None]:
-        for finding_player, check_data in self.items():
-            for location_id, (item_id, receiving_player, item_flags) in check_data.items():
-                if receiving_player in slots and item_id == seeked_item_id:
-                    yield finding_player, location_id, item_id, receiving_player, item_flags
+        found = [self._item_index[receiving_player, seeked_item_id] for receiving_player in slots
+                 if (receiving_player, seeked_item_id) in self._item_index]
+        # each list is sorted by finding player and location, merge them to keep that order
+        yield from found[0] if len(found) == 1 else heapq.merge(*found)
 
     def get_for_player(self, slot: int) -> typing.Dict[int, typing.Set[int]]:
-        import collections
-        all_locations: typing.Dict[int, typing.Set[int]] = collections.defaultdict(set)
-        for source_slot, location_data in self.items():
-            for location_id, values in location_data.items():
-                if values[1] == slot:
-                    all_locations[source_slot].add(location_id)
-        return all_locations
+        return {source_slot: set(location_ids)
+                for source_slot, location_ids in self._receiver_index.get(slot, {}).items()}
 
     def get_checked(self, state: typing.Dict[typing.Tuple[int, int], typing.Set[int]], team: int, slot: int
                     ) -> typing.List[int]:
@@ -510,6 +601,106 @@ class MultiData(typing.TypedDict):
     race_mode: int
 
 
+# Format version 4 of .archipelago files: the version byte, the size of the index as uint32, the pickled index and then
+# the sections it points to. Each section is a zlib compressed pickle of one multidata key, except for the keys below,
+# which get a section per slot or game. The index maps each key to the (offset, size) of its section after the index,
+# or for the keys below to a dict of slot or game -> (offset, size).
+multidata_sections_format_version = 4
+multidata_sections_per_entry = ("slot_data", "datapackage")
+_multidata_index_size = struct.Struct("<I")
+
+
+class MultiDataSections(typing.MutableMapping[typing.Any, typing.Any]):
+    """
+    Multidata read from format version 4, which only decompresses and unpickles a section when it is first accessed.
+    Sections that were never accessed get copied as is when encoding it again.
+    """
+    _data: memoryview
+    _sections: dict[typing.Any, tuple[int, int] | MultiDataSections]
+    _decoded: dict[typing.Any, typing.Any]
+
+    def __init__(self, data: memoryview, index: dict[typing.Any, typing.Any]) -> None:
+        self._data = data
+        self._sections = {key: MultiDataSections(data, section) if isinstance(section, dict) else section
+                          for key, section in index.items()}
+        self._decoded = {}
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> MultiDataSections:
+        view = memoryview(data)
+        index_start = 1 + _multidata_index_size.size
+        index_end = index_start + _multidata_index_size.unpack_from(view, 1)[0]
+        return cls(view[index_end:], restricted_loads(view[index_start:index_end]))
+
+    def raw_section(self, key: typing.Any) -> memoryview | None:
+        """The compressed section of key, if it was not decoded, so it can be copied without decoding it."""
+        section = self._sections.get(key)
+        if isinstance(section, tuple) and key not in self._decoded:
+            offset, size = section
+            return self._data[offset:offset + size]
+        return None
+
+    def __getitem__(self, key: typing.Any) -> typing.Any:
+        if key not in self._decoded:
+            section = self._sections[key]
+            if isinstance(section, tuple):
+                offset, size = section
+                self._decoded[key] = restricted_loads(zlib.decompress(self._data[offset:offset + size]))
+            else:
+                self._decoded[key] = section
+        return self._decoded[key]
+
+    def __setitem__(self, key: typing.Any, value: typing.Any) -> None:
+        self._sections[key] = (0, 0)  # replaced by value, never read
+        self._decoded[key] = value
+
+    def __delitem__(self, key: typing.Any) -> None:
+        del self._sections[key]
+        self._decoded.pop(key, None)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._sections
+
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        return iter(self._sections)
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+
+def encode_multidata(multidata: Mapping[str, typing.Any],
+                     dumps: typing.Callable[[typing.Any], bytes] = restricted_dumps) -> bytes:
+    """
+    Encodes multidata in format version 4. Sections of a MultiDataSections that were never decoded are copied as is.
+
+    :param multidata: multidata to encode
+    :param dumps: used to pickle each section
+    """
+    sections: list[bytes | memoryview] = []
+    offset = 0
+
+    def add_section(data: Mapping[typing.Any, typing.Any], key: typing.Any) -> tuple[int, int]:
+        nonlocal offset
+        section = data.raw_section(key) if isinstance(data, MultiDataSections) else None
+        if section is None:
+            section = zlib.compress(dumps(data[key]), 9)
+        sections.append(section)
+        offset += len(section)
+        return offset - len(section), len(section)
+
+    index: dict[typing.Any, typing.Any] = {}
+    for key in multidata:
+        if key in multidata_sections_per_entry:
+            entries = multidata[key]
+            index[key] = {entry: add_section(entries, entry) for entry in entries}
+        else:
+            index[key] = add_section(multidata, key)
+
+    encoded_index = pickle.dumps(index)
+    return b"".join((bytes([multidata_sections_format_version]), _multidata_index_size.pack(len(encoded_index)),
+                     encoded_index, *sections))
+
+
 if typing.TYPE_CHECKING:  # type-check with pure python implementation until we have a typing stub
     LocationStore = _LocationStore
 else:
@@ -524,6 +524,120 @@ class KeyedDefaultDict(collections.defaultdict):
         return value
 
 
+class CopyOnAccessDict(dict):
+    """
+    dict of mutable values (that have a .copy() method), where copies share the values with each other until a key is
+    first accessed, at which point only that value is copied. Making a copy is O(number of keys) regardless of the
+    values' sizes, and only one of the dicts sharing a value has to copy it: the last one to access it takes it over.
+
+    Since values are handed out by reference, reading a key also copies its value. Iterating over the values or items
+    copies everything that is still shared.
+    """
+    __slots__ = ("_shared",)
+    _shared: typing.Dict[typing.Any, typing.List[typing.Any]]
+    """values shared with other copies, each as [value, number of dicts sharing it], not mutated while shared"""
+
+    def __init__(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._shared = {}
+
+    @staticmethod
+    def _take(shared_value: typing.List[typing.Any]) -> typing.Any:
+        shared_value[1] -= 1
+        return shared_value[0] if not shared_value[1] else shared_value[0].copy()
+
+    def __missing__(self, key: typing.Any) -> typing.Any:
+        self[key] = value = self._take(self._shared.pop(key))
+        return value
+
+    def copy(self) -> "CopyOnAccessDict":
+        shared = self._shared
+        # own values become shared as well, so they can't be mutated by self afterwards
+        for key, value in super().items():
+            shared[key] = [value, 1]
+        super().clear()
+        for shared_value in shared.values():
+            shared_value[1] += 1
+        ret = CopyOnAccessDict()
+        ret._shared = shared.copy()
+        return ret
+
+    def _materialize(self) -> None:
+        if self._shared:
+            for key, shared_value in self._shared.items():
+                if super().__contains__(key):
+                    shared_value[1] -= 1  # replaced without being accessed
+                else:
+                    self[key] = self._take(shared_value)
+            self._shared = {}
+
+    def __contains__(self, key: object) -> bool:
+        return super().__contains__(key) or key in self._shared
+
+    def __len__(self) -> int:
+        self._materialize()
+        return super().__len__()
+
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        self._materialize()
+        return super().__iter__()
+
+    def __delitem__(self, key: typing.Any) -> None:
+        self._materialize()
+        super().__delitem__(key)
+
+    def __eq__(self, other: object) -> bool:
+        self._materialize()
+        if isinstance(other, CopyOnAccessDict):
+            other._materialize()
+        return super().__eq__(other)
+
+    def __ne__(self, other: object) -> bool:
+        self._materialize()
+        if isinstance(other, CopyOnAccessDict):
+            other._materialize()
+        return super().__ne__(other)
+
+    def __repr__(self) -> str:
+        self._materialize()
+        return super().__repr__()
+
+    def __reduce__(self) -> typing.Tuple[typing.Any, ...]:
+        self._materialize()
+        return self.__class__, (dict(self),)
+
+    def get(self, key: typing.Any, default: typing.Any = None) -> typing.Any:
+        return self[key] if key in self else default
+
+    def keys(self):
+        self._materialize()
+        return super().keys()
+
+    def values(self):
+        self._materialize()
+        return super().values()
+
+    def items(self):
+        self._materialize()
+        return super().items()
+
+    def pop(self, *args: typing.Any) -> typing.Any:
+        self._materialize()
+        return super().pop(*args)
+
+    def popitem(self) -> typing.Tuple[typing.Any, typing.Any]:
+        self._materialize()
+        return super().popitem()
+
+    def setdefault(self, key: typing.Any, default: typing.Any = None) -> typing.Any:
+        self._materialize()
+        return super().setdefault(key, default)
+
+    def clear(self) -> None:
+        self._shared = {}
+        super().clear()
+
+
 def get_text_between(text: str, start: str, end: str) -> str:
     return text[text.index(start) + len(start): text.rindex(end)]
 
@@ -40,6 +40,10 @@ app.config["HOSTERS"] = 8  # maximum concurrent room hosters
 app.config["SELFLAUNCH"] = True  # application process is in charge of launching Rooms.
 app.config["SELFLAUNCHCERT"] = None  # can point to a SSL Certificate to encrypt Room websocket connections
 app.config["SELFLAUNCHKEY"] = None  # can point to a SSL Certificate Key to encrypt Room websocket connections
+# seconds between checks for Rooms with new activity that were not started through the web interface of this process
+app.config["ROOM_REFRESH_INTERVAL"] = 1
+# seconds between checks for commands sent to running Rooms, one query covers all Rooms of a hosting process
+app.config["ROOM_COMMAND_INTERVAL"] = 5
 app.config["SELFGEN"] = True  # application process is in charge of scheduling Generations.
 # at what amount of worlds should scheduling be used, instead of rolling in the web-thread
 app.config["JOB_THRESHOLD"] = 1
@@ -59,6 +63,9 @@ app.config["PONY"] = {
 }
 app.config["MAX_ROLL"] = 20
 app.config["CACHE_TYPE"] = "SimpleCache"
+# bytes of compressed multidata of seeds, and of pickled data packages, trackers keep parsed across requests
+app.config["TRACKER_SEED_CACHE_SIZE"] = 256 * 1024 * 1024
+app.config["TRACKER_GAME_CACHE_SIZE"] = 64 * 1024 * 1024
 app.config["HOST_ADDRESS"] = ""
 app.config["ASSET_RIGHTS"] = False
 
@@ -3,6 +3,8 @@ from __future__ import annotations
 import json
 import logging
 import multiprocessing
+import queue
+import time
 import typing
 from datetime import timedelta, datetime
 from threading import Event, Thread
@@ -11,10 +13,13 @@ from uuid import UUID
 
 from pony.orm import db_session, select, commit, PrimaryKey
 
-from Utils import restricted_loads
+from Utils import format_SI_prefix, restricted_loads
 from .locker import Locker, AlreadyRunningException
 
 _stop_event = Event()
+_room_start_requests: queue.SimpleQueue[UUID] = queue.SimpleQueue()
+generation_stats_logger = logging.getLogger("GenerationStats")
+"""logs wall time and peak memory of each generation from within the generator process"""
 
 
 def stop() -> None:
@@ -25,6 +30,11 @@ def stop() -> None:
     stop_event.set()
 
 
+def request_room_start(room_id: UUID) -> None:
+    """Have autohost (re-)check the room right away, instead of on its next refresh. Call after committing."""
+    _room_start_requests.put(room_id)
+
+
 def handle_generation_success(seed_id):
     logging.info(f"Generation finished for seed {seed_id}")
 
@@ -36,6 +46,26 @@ def handle_generation_failure(result: BaseException):
         logging.exception(e)
 
 
+def _reset_peak_rss() -> None:
+    """Reset the peak resident memory of this process, where supported (Linux), so it can be measured per job."""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def _get_peak_rss() -> int | None:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
 def _mp_gen_game(
     gen_options: dict,
     meta: dict[str, Any] | None = None,
@@ -46,12 +76,30 @@ def _mp_gen_game(
     from setproctitle import setproctitle
 
     setproctitle(f"Generator ({sid})")
+    _reset_peak_rss()
+    start = time.perf_counter()
     try:
         return gen_game(gen_options, meta=meta, owner=owner, sid=sid, timeout=timeout)
     finally:
+        peak_rss = _get_peak_rss()
+        generation_stats_logger.info(
+            f"Generation {sid} for {len(gen_options)} players took {time.perf_counter() - start:.2f} seconds, "
+            f"peak RSS {'unknown' if peak_rss is None else format_SI_prefix(peak_rss, 1024) + 'iB'}")
         setproctitle(f"Generator (idle)")
 
 
+def get_generator_context() -> multiprocessing.context.BaseContext:
+    """
+    Generators get forked from a forkserver that preloaded worlds and settings where possible,
+    so new generator processes neither import them again, nor keep their own copy in memory.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context()
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["WebHostLib.generator_template"])
+    return context
+
+
 def launch_generator(pool: multiprocessing.pool.Pool, generation: Generation, timeout: int|None) -> None:
     try:
         meta = json.loads(generation.meta)
@@ -81,6 +129,12 @@ def init_generator(config: dict[str, Any]) -> None:
     from setproctitle import setproctitle
 
     setproctitle("Generator (idle)")
+    if not generation_stats_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s"))
+        generation_stats_logger.addHandler(handler)
+        generation_stats_logger.setLevel(logging.INFO)
+        generation_stats_logger.propagate = False
 
     try:
         import resource
@@ -113,6 +167,45 @@ def cleanup():
         logging.info(f"{rooms} Rooms, {seeds} Seeds and {slots} Slots have been deleted.")
 
 
+class RoomIndex:
+    """Rooms that should be hosted, with the time they stop being active, kept up to date from last_activity changes."""
+    overlap: typing.ClassVar[timedelta] = timedelta(seconds=10)
+    """how far back a refresh looks before the previous one, for transactions that committed late"""
+    expiries: dict[UUID, datetime]
+    since: datetime | None
+
+    def __init__(self) -> None:
+        self.expiries = {}
+        self.since = None
+
+    def update(self, room: Room) -> None:
+        self.expiries[room.id] = room.last_activity + timedelta(seconds=room.timeout + 5)
+
+    def refresh(self) -> None:
+        """Update the rooms that had activity since the last refresh, or in the last 3 days on the first one."""
+        now = datetime.utcnow()
+        since = now - timedelta(days=3) if self.since is None else self.since
+        for room in select(room for room in Room if room.last_activity >= since):
+            self.update(room)
+        self.since = now - self.overlap
+
+    def refresh_rooms(self, room_ids: typing.Iterable[UUID]) -> None:
+        """Update specific rooms, which may have become active or inactive since they were last seen."""
+        for room_id in room_ids:
+            room = Room.get(id=room_id)
+            if room:
+                self.update(room)
+            else:
+                self.expiries.pop(room_id, None)
+
+    def active(self, now: datetime) -> list[UUID]:
+        """Drop the rooms that timed out and return the remaining ones."""
+        expired = [room_id for room_id, expiry in self.expiries.items() if expiry < now]
+        for room_id in expired:
+            del self.expiries[room_id]
+        return list(self.expiries)
+
+
 def autohost(config: dict):
     def keep_running():
         stop_event = _stop_event
@@ -125,15 +218,29 @@ def autohost(config: dict):
                     hosters.append(hoster)
                     hoster.start()
 
-                while not stop_event.wait(0.1):
-                    with db_session:
-                        rooms = select(
-                            room for room in Room if
-                            room.last_activity >= datetime.utcnow() - timedelta(days=3))
-                        for room in rooms:
-                            # we have to filter twice, as the per-room timeout can't currently be PonyORM transpiled.
-                            if room.last_activity >= datetime.utcnow() - timedelta(seconds=room.timeout + 5):
-                                hosters[room.id.int % len(hosters)].start_room(room.id)
+                refresh_interval = timedelta(seconds=config["ROOM_REFRESH_INTERVAL"])
+                rooms = RoomIndex()
+                next_refresh = datetime.utcnow()
+                while not stop_event.is_set():
+                    requested: set[UUID] = set()
+                    try:
+                        requested.add(_room_start_requests.get(timeout=0.1))
+                        while True:
+                            requested.add(_room_start_requests.get_nowait())
+                    except queue.Empty:
+                        pass
+                    # rooms that shut down moved their last_activity back, so they need to be read again
+                    for hoster in hosters:
+                        requested.update(hoster.collect_shut_down())
+                    now = datetime.utcnow()
+                    if requested or now >= next_refresh:
+                        with db_session:
+                            rooms.refresh_rooms(requested)
+                            if now >= next_refresh:
+                                rooms.refresh()
+                                next_refresh = now + refresh_interval
+                    for room_id in rooms.active(now):
+                        hosters[room_id.int % len(hosters)].start_room(room_id)
 
         except AlreadyRunningException:
             logging.info("Autohost reports as already running, not starting another.")
@@ -147,8 +254,8 @@ def autogen(config: dict):
         try:
             with Locker("autogen"):
 
-                with multiprocessing.Pool(config["GENERATORS"], initializer=init_generator,
-                                          initargs=(config,), maxtasksperchild=10) as generator_pool:
+                with get_generator_context().Pool(config["GENERATORS"], initializer=init_generator,
+                                                  initargs=(config,), maxtasksperchild=10) as generator_pool:
                     job_time = config["JOB_TIME"]
                     with db_session:
                         to_start = select(generation for generation in Generation if generation.state == STATE_STARTED)
@@ -187,6 +294,7 @@ class MultiworldInstance():
         self.cert = config["SELFLAUNCHCERT"]
         self.key = config["SELFLAUNCHKEY"]
         self.host = config["HOST_ADDRESS"]
+        self.command_interval = config["ROOM_COMMAND_INTERVAL"]
         self.rooms_to_start = multiprocessing.Queue()
         self.rooms_shutting_down = multiprocessing.Queue()
         self.name = f"MultiHoster{id}"
@@ -198,14 +306,22 @@ class MultiworldInstance():
         process = multiprocessing.Process(group=None, target=run_server_process,
                                           args=(self.name, self.ponyconfig, get_static_server_data(),
                                                 self.cert, self.key, self.host,
-                                                self.rooms_to_start, self.rooms_shutting_down),
+                                                self.rooms_to_start, self.rooms_shutting_down,
+                                                self.command_interval),
                                           name=self.name)
         process.start()
         self.process = process
 
-    def start_room(self, room_id):
+    def collect_shut_down(self) -> list[UUID]:
+        """Forget the rooms the hosting process reported as shut down, and return them."""
+        shut_down = []
         while not self.rooms_shutting_down.empty():
-            self.room_ids.remove(self.rooms_shutting_down.get(block=True, timeout=None))
+            room_id = self.rooms_shutting_down.get(block=True, timeout=None)
+            self.room_ids.discard(room_id)
+            shut_down.append(room_id)
+        return shut_down
+
+    def start_room(self, room_id):
         if room_id in self.room_ids:
             pass  # should already be hosted currently.
         else:
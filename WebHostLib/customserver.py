@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import collections
 import datetime
 import functools
 import logging
@@ -25,7 +24,8 @@ from MultiServer import (
 )
 from Utils import restricted_loads, cache_argsless
 from .locker import Locker
-from .models import Command, GameDataPackage, Room, db
+from .models import Command, GameDataPackage, Room, SaveJournalRecord, db, load_multisave
+from .static_data import StaticServerData
 
 
 class CustomClientMessageProcessor(ClientMessageProcessor):
@@ -60,17 +60,67 @@ class DBCommandProcessor(ServerCommandProcessor):
         self.ctx.logger.info(text)
 
 
+class DBCommandPoller(threading.Thread):
+    """Fetches the pending Commands of all rooms of this process in one query and hands them to their room's loop."""
+    interval: float
+    _rooms: typing.Dict[typing.Any, typing.Tuple[WebHostContext, DBCommandProcessor]]
+
+    def __init__(self, interval: float = 5):
+        super().__init__(name="DBCommandPoller", daemon=True)
+        self.interval = interval
+        self._rooms = {}
+        self._lock = threading.Lock()
+
+    def add_room(self, ctx: WebHostContext) -> None:
+        with self._lock:
+            self._rooms[ctx.room_id] = ctx, DBCommandProcessor(ctx)
+
+    def remove_room(self, ctx: WebHostContext) -> None:
+        with self._lock:
+            if self._rooms.get(ctx.room_id, (None,))[0] is ctx:
+                del self._rooms[ctx.room_id]
+
+    def poll(self) -> int:
+        """Dispatch the pending commands once, returns the number of dispatched commands."""
+        with self._lock:
+            rooms = {room_id: room for room_id, room in self._rooms.items() if not room[0].exit_event.is_set()}
+        if not rooms:
+            return 0
+        room_ids = list(rooms)
+        dispatched = 0
+        with db_session:
+            commands = select(command for command in Command if command.room.id in room_ids)
+            for command in commands:
+                ctx, cmdprocessor = rooms[command.room.id]
+                ctx.main_loop.call_soon_threadsafe(cmdprocessor, command.commandtext)
+                command.delete()
+                dispatched += 1
+            if dispatched:
+                commit()
+        return dispatched
+
+    def run(self) -> None:
+        while 1:
+            time.sleep(self.interval)
+            try:
+                self.poll()
+            except Exception as e:  # keep polling for the other rooms, the database may just be unavailable briefly
+                logging.exception(e)
+
+
 class WebHostContext(Context):
     room_id: int
+    static_games: typing.Set[str]
+    """games of this room that use the static data package, their lookup tables are shared with the other rooms"""
 
-    def __init__(self, static_server_data: dict, logger: logging.Logger):
+    def __init__(self, static_server_data: StaticServerData, logger: logging.Logger):
         # static server data is used during _load_game_data to load required data,
         # without needing to import worlds system, which takes quite a bit of memory
         self.static_server_data = static_server_data
+        self.static_games = set()
         super(WebHostContext, self).__init__("", 0, "", "", 1,
                                              40, True, "enabled", "enabled",
                                              "enabled", 0, 2, logger=logger)
-        del self.static_server_data
         self.main_loop = asyncio.get_running_loop()
         self.video = {}
         self.tags = ["AP", "WebHost"]
@@ -84,24 +134,19 @@ class WebHostContext(Context):
             self.logger.debug("Context destroyed")
 
     def _load_game_data(self):
-        for key, value in self.static_server_data.items():
-            # NOTE: attributes are mutable and shared, so they will have to be copied before being modified
-            setattr(self, key, value)
-        self.non_hintable_names = collections.defaultdict(frozenset, self.non_hintable_names)
-
-    def listen_to_db_commands(self):
-        cmdprocessor = DBCommandProcessor(self)
-
-        while not self.exit_event.is_set():
-            with db_session:
-                commands = select(command for command in Command if command.room.id == self.room_id)
-                if commands:
-                    for command in commands:
-                        self.main_loop.call_soon_threadsafe(cmdprocessor, command.commandtext)
-                        command.delete()
-                    commit()
-            del commands
-            time.sleep(5)
+        # NOTE: these are read-only views of the static data, load replaces them with the games of the room
+        self.gamespackage = self.static_server_data.get_section("gamespackage")
+        self.item_name_groups = self.static_server_data.get_section("item_name_groups")
+        self.location_name_groups = self.static_server_data.get_section("location_name_groups")
+        self.non_hintable_names = self.static_server_data.get_section("non_hintable_names", frozenset)
+
+    def _init_game_names(self, game_name: str, game_package: typing.Dict[str, typing.Any]):
+        if game_name in self.static_games and "Archipelago" in self.static_games:
+            (self.item_names[game_name], self.location_names[game_name],
+             self.all_item_and_group_names[game_name], self.all_location_and_group_names[game_name]) = \
+                self.static_server_data.get_names(game_name)
+        else:
+            super()._init_game_names(game_name, game_package)
 
     @db_session
     def load(self, room_id: int):
@@ -118,18 +163,20 @@ class WebHostContext(Context):
         static_gamespackage = self.gamespackage  # this is shared across all rooms
         static_item_name_groups = self.item_name_groups
         static_location_name_groups = self.location_name_groups
-        self.gamespackage = {"Archipelago": static_gamespackage.get("Archipelago", {})}  # this may be modified by _load
-        self.item_name_groups = {"Archipelago": static_item_name_groups.get("Archipelago", {})}
-        self.location_name_groups = {"Archipelago": static_location_name_groups.get("Archipelago", {})}
-        missing_checksum = False
-
-        for game in list(multidata.get("datapackage", {})):
-            game_data = multidata["datapackage"][game]
+        # only reference the static data of the games in this room, these may be modified by _load
+        self.gamespackage = {}
+        self.item_name_groups = {}
+        self.location_name_groups = {}
+        datapackage = multidata.get("datapackage", {})
+        games = {"Archipelago", *datapackage, *(slot_info.game for slot_info in multidata["slot_info"].values())}
+
+        for game in games:
+            game_data = datapackage.get(game, {})
             if "checksum" in game_data:
                 if static_gamespackage.get(game, {}).get("checksum") == game_data["checksum"]:
                     # non-custom. remove from multidata and use static data
                     # games package could be dropped from static data once all rooms embed data package
-                    del multidata["datapackage"][game]
+                    del datapackage[game]
                 else:
                     row = GameDataPackage.get(checksum=game_data["checksum"])
                     if row:  # None if rolled on >= 0.3.9 but uploaded to <= 0.3.8. multidata should be complete
@@ -137,41 +184,57 @@ class WebHostContext(Context):
                         continue
                     else:
                         self.logger.warning(f"Did not find game_data_package for {game}: {game_data['checksum']}")
-            else:
-                missing_checksum = True  # Game rolled on old AP and will load data package from multidata
+            elif game in datapackage:
+                pass  # Game rolled on old AP and will load data package from multidata
+            elif game not in static_gamespackage:
+                continue  # neither embedded nor installed
+            if game not in datapackage:
+                self.static_games.add(game)
             self.gamespackage[game] = static_gamespackage.get(game, {})
             self.item_name_groups[game] = static_item_name_groups.get(game, {})
             self.location_name_groups[game] = static_location_name_groups.get(game, {})
 
-        if not game_data_packages and not missing_checksum:
-            # all static -> use the static dicts directly
-            self.gamespackage = static_gamespackage
-            self.item_name_groups = static_item_name_groups
-            self.location_name_groups = static_location_name_groups
         return self._load(multidata, game_data_packages, True)
 
     def init_save(self, enabled: bool = True):
         self.saving = enabled
         if self.saving:
             with db_session:
-                savegame_data = Room.get(id=self.room_id).multisave
+                savegame_data = load_multisave(Room.get(id=self.room_id))
                 if savegame_data:
-                    self.set_save(restricted_loads(Room.get(id=self.room_id).multisave))
+                    self.set_save(savegame_data)
             self._start_async_saving(atexit_save=False)
-        threading.Thread(target=self.listen_to_db_commands, daemon=True).start()
 
-    @db_session
     def _save(self, exit_save: bool = False) -> bool:
-        room = Room.get(id=self.room_id)
-        # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
-        room.multisave = pickle.dumps(self.get_save())
-        # saving only occurs on activity, so we can "abuse" this information to mark this as last_activity
-        if not exit_save:  # we don't want to count a shutdown as activity, which would restart the server again
-            room.last_activity = datetime.datetime.utcnow()
+        """
+        Adds the changes since the last save to the Room's save journal,
+        or writes a new multisave and clears the journal once the journal grew larger than the multisave.
+        """
+        try:
+            with db_session:
+                room = Room.get(id=self.room_id)
+                if self.journal_size is None or self.journal_size > self.snapshot_size:
+                    self.reset_save_baseline()
+                    # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
+                    room.multisave = multisave = pickle.dumps(self.get_save())
+                    room.save_journal.select().delete(bulk=True)
+                    self.snapshot_size = len(multisave)
+                    self.journal_size = 0
+                else:
+                    record = pickle.dumps(self.get_save_delta())
+                    SaveJournalRecord(room=room, data=record)
+                    self.journal_size += len(record)
+                # saving only occurs on activity, so we can "abuse" this information to mark this as last_activity
+                if not exit_save:  # we don't want to count a shutdown as activity, which would restart the server again
+                    room.last_activity = datetime.datetime.utcnow()
+        except Exception as e:
+            self.logger.exception(e)
+            self.journal_size = None  # the changes of this save are lost, so rely on a new multisave
+            return False
         return True
 
-    def get_save(self) -> dict:
-        d = super(WebHostContext, self).get_save()
+    def _get_save_state(self) -> dict:
+        d = super(WebHostContext, self)._get_save_state()
         d["video"] = [(tuple(playerslot), videodata) for playerslot, videodata in self.video.items()]
         return d
 
@@ -181,32 +244,9 @@ def get_random_port():
 
 
 @cache_argsless
-def get_static_server_data() -> dict:
-    import worlds
-    data = {
-        "non_hintable_names": {
-            world_name: world.hint_blacklist
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
-        },
-        "gamespackage": {
-            world_name: {
-                key: value
-                for key, value in game_package.items()
-                if key not in ("item_name_groups", "location_name_groups")
-            }
-            for world_name, game_package in worlds.network_data_package["games"].items()
-        },
-        "item_name_groups": {
-            world_name: world.item_name_groups
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
-        },
-        "location_name_groups": {
-            world_name: world.location_name_groups
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
-        },
-    }
-
-    return data
+def get_static_server_data() -> StaticServerData:
+    from .static_data import write_static_server_data
+    return write_static_server_data()
 
 
 def set_up_logging(room_id) -> logging.Logger:
@@ -229,9 +269,10 @@ def set_up_logging(room_id) -> logging.Logger:
     return logger
 
 
-def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
+def run_server_process(name: str, ponyconfig: dict, static_server_data: StaticServerData,
                        cert_file: typing.Optional[str], cert_key_file: typing.Optional[str],
-                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue):
+                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue,
+                       command_interval: float = 5):
     from setproctitle import setproctitle
 
     setproctitle(name)
@@ -275,6 +316,9 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     gc.collect()  # free intermediate objects used during setup
 
     loop = asyncio.get_event_loop()
+    # one poller for all rooms of this process, instead of one thread and query per room
+    command_poller = DBCommandPoller(command_interval)
+    command_poller.start()
 
     async def start_room(room_id):
         with Locker(f"RoomLocker {room_id}"):
@@ -283,6 +327,7 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                 ctx = WebHostContext(static_server_data, logger)
                 ctx.load(room_id)
                 ctx.init_save()
+                command_poller.add_room(ctx)
                 assert ctx.server is None
                 try:
                     ctx.server = websockets.serve(
@@ -342,6 +387,7 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                 try:
                     ctx.save_dirty = False  # make sure the saving thread does not write to DB after final wakeup
                     ctx.exit_event.set()  # make sure the saving thread stops at some point
+                    command_poller.remove_room(ctx)
                     # NOTE: async saving should probably be an async task and could be merged with shutdown_task
                     with db_session:
                         # ensure the Room does not spin up again on its own, minute of safety buffer
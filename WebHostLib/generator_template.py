@@ -0,0 +1,10 @@
+"""
+Preloaded by the forkserver that generator processes get forked from.
+Everything imported here is imported once, and its memory is shared copy-on-write between the generators.
+"""
+import settings
+import worlds
+from WebHostLib import autolauncher  # noqa: F401 # provides the functions run by the generator pool
+
+worlds.load_all_worlds()
+settings.get_settings()
@@ -11,6 +11,7 @@ from werkzeug.utils import secure_filename
 
 from worlds.AutoWorld import AutoWorldRegister, World
 from . import app, cache
+from .autolauncher import request_room_start
 from .markdown import render_markdown
 from .models import Seed, Room, Command, UUID, uuid4
 from Utils import title_sorted
@@ -237,6 +238,10 @@ def host_room(room: UUID):
         # we only set last_activity if needed, otherwise parallel access on /room will cause an internal server error
         # due to "pony.orm.core.OptimisticCheckError: Object Room was updated outside of current transaction"
         room.last_activity = now  # will trigger a spinup, if it's not already running
+        commit()
+        request_room_start(room.id)
+    elif should_refresh:
+        request_room_start(room.id)  # not assigned a port yet, make sure autohost knows of the new room
 
     browser_tokens = "Mozilla", "Chrome", "Safari"
     automated = ("update" in request.args
@@ -26,6 +26,7 @@ class Room(db.Entity):
     commands = Set('Command')
     seed = Required('Seed', index=True)
     multisave = Optional(buffer, lazy=True)
+    save_journal = Set('SaveJournalRecord')
     show_spoiler = Required(int, default=0)  # 0 -> never, 1 -> after completion, -> 2 always
     timeout = Required(int, default=lambda: 2 * 60 * 60)  # seconds since last activity to shutdown
     tracker = Optional(UUID, index=True)
@@ -33,6 +34,13 @@ class Room(db.Entity):
     last_port = Optional(int, default=lambda: 0)
 
 
+class SaveJournalRecord(db.Entity):
+    """A change to a Room's multisave, made after it was written. See load_multisave."""
+    id = PrimaryKey(int, auto=True)
+    room = Required(Room, index=True)
+    data = Required(buffer, lazy=True)
+
+
 class Seed(db.Entity):
     id = PrimaryKey(UUID, default=uuid4)
     rooms = Set(Room)
@@ -61,3 +69,15 @@ class Generation(db.Entity):
 class GameDataPackage(db.Entity):
     checksum = PrimaryKey(str)
     data = Required(bytes)
+
+
+def load_multisave(room: Room) -> dict | None:
+    """Loads a Room's multisave with the changes of its save journal applied, or None if it wasn't saved yet."""
+    if not room.multisave:
+        return None
+    from MultiServer import apply_save_delta
+    from Utils import restricted_loads
+    multisave = restricted_loads(room.multisave)
+    for record in room.save_journal.order_by(SaveJournalRecord.id):
+        apply_save_delta(multisave, restricted_loads(record.data))
+    return multisave
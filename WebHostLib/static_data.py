@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import collections.abc
+import mmap
+import os
+import pickle
+import struct
+import typing
+
+import Utils
+
+index_header = struct.Struct("<Q")
+
+
+class GameNames(typing.NamedTuple):
+    """Lookup tables of a game with its static data package, including the Archipelago item and location names."""
+    item_names: typing.Mapping[int, str]
+    location_names: typing.Mapping[int, str]
+    all_item_and_group_names: typing.FrozenSet[str]
+    all_location_and_group_names: typing.FrozenSet[str]
+
+
+class NameLookup(collections.abc.Mapping):
+    """Read-only id -> name mapping that names unknown ids without adding them, so it can be shared between rooms."""
+    __slots__ = ("names", "unknown")
+
+    def __init__(self, names: typing.Dict[int, str], unknown: str) -> None:
+        self.names = names
+        self.unknown = unknown
+
+    def __getitem__(self, code: int) -> str:
+        name = self.names.get(code)
+        if name is None:
+            return self.unknown.format(code)
+        return name
+
+    def __contains__(self, code: object) -> bool:
+        return code in self.names
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class StaticServerData:
+    """
+    Static game data of the installed worlds, written once per WebHost into a file that each room process maps into
+    memory. Every section is stored per game and only decoded when a room of the process first uses that game,
+    after which the decoded data is shared by all rooms of the process.
+
+    Only the path is pickled, so handing this to a room process does not copy the data.
+    """
+    path: str
+    _index: typing.Optional[typing.Dict[str, typing.Dict[str, typing.Tuple[int, int]]]]
+    _data: typing.Optional[mmap.mmap]
+    _data_start: int
+    _cache: typing.Dict[typing.Tuple[str, str], typing.Any]
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._index = None
+        self._data = None
+        self._data_start = 0
+        self._cache = {}
+
+    def __getstate__(self) -> typing.Dict[str, typing.Any]:
+        return {"path": self.path}
+
+    def __setstate__(self, state: typing.Dict[str, typing.Any]) -> None:
+        self.__init__(state["path"])
+
+    @classmethod
+    def write(cls, path: str, sections: typing.Mapping[str, typing.Mapping[str, typing.Any]]) -> StaticServerData:
+        """Writes sections, which map each game to its data, to path."""
+        index: typing.Dict[str, typing.Dict[str, typing.Tuple[int, int]]] = {}
+        encoded_values: typing.List[bytes] = []
+        offset = 0
+        for section, games in sections.items():
+            section_index = index[section] = {}
+            for game, value in games.items():
+                encoded_value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+                section_index[game] = offset, len(encoded_value)
+                encoded_values.append(encoded_value)
+                offset += len(encoded_value)
+        encoded_index = pickle.dumps(index, pickle.HIGHEST_PROTOCOL)
+        with open(path, "wb") as f:
+            f.write(index_header.pack(len(encoded_index)))
+            f.write(encoded_index)
+            f.writelines(encoded_values)
+        return cls(path)
+
+    @property
+    def index(self) -> typing.Dict[str, typing.Dict[str, typing.Tuple[int, int]]]:
+        if self._index is None:
+            with open(self.path, "rb") as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            index_size, = index_header.unpack_from(self._data)
+            self._data_start = index_header.size + index_size
+            self._index = pickle.loads(self._data[index_header.size:self._data_start])
+        return self._index
+
+    def load(self, section: str, game: str) -> typing.Any:
+        """Returns the data of game in section, raises KeyError if there is none."""
+        key = section, game
+        if key in self._cache:
+            return self._cache[key]
+        offset, size = self.index[section][game]
+        start = self._data_start + offset
+        value = self._cache[key] = pickle.loads(self._data[start:start + size])
+        return value
+
+    def get_section(self, section: str, default: typing.Optional[typing.Callable[[], typing.Any]] = None
+                    ) -> StaticGameData:
+        return StaticGameData(self, section, default)
+
+    def get_names(self, game: str) -> GameNames:
+        """Returns the lookup tables of game, these are shared and must not be modified."""
+        key = "names", game
+        if key not in self._cache:
+            item_names, location_names, all_item_and_group_names, all_location_and_group_names = \
+                self.load("names", game)
+            self._cache[key] = GameNames(
+                NameLookup(item_names, "Unknown item (ID:{})"),
+                NameLookup(location_names, "Unknown location (ID:{})"),
+                all_item_and_group_names,
+                all_location_and_group_names,
+            )
+        return self._cache[key]
+
+
+class StaticGameData(collections.abc.Mapping):
+    """Read-only game -> data mapping of a StaticServerData section, decoding each game on first access."""
+
+    def __init__(self, data: StaticServerData, section: str,
+                 default: typing.Optional[typing.Callable[[], typing.Any]] = None) -> None:
+        self.data = data
+        self.section = section
+        self.default = default
+
+    def __getitem__(self, game: str) -> typing.Any:
+        if game not in self.data.index[self.section] and self.default:
+            return self.default()
+        return self.data.load(self.section, game)
+
+    def __contains__(self, game: object) -> bool:
+        return game in self.data.index[self.section]
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.data.index[self.section])
+
+    def __len__(self) -> int:
+        return len(self.data.index[self.section])
+
+
+def _process_exists(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # running as another user
+    return True
+
+
+def remove_stale_files(directory: str) -> None:
+    """Removes the files that runs which did not exit cleanly left in directory, files are named after their pid."""
+    for entry in os.scandir(directory):
+        pid, ext = os.path.splitext(entry.name)
+        # on Windows, files of running processes can't be removed while mapped, and os.kill would end the process
+        if os.name != "nt" and ext == ".bin" and pid.isdigit() and _process_exists(int(pid)):
+            continue  # still used by the room processes of a running WebHost
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass  # still mapped by a running process
+
+
+def write_static_server_data() -> StaticServerData:
+    """
+    Collects the static data of all installed worlds and writes it to a file of this process.
+    Files of previous runs are removed first, as a crashed run cannot remove its own.
+    """
+    import atexit
+    import worlds
+
+    gamespackage = worlds.network_data_package["games"]
+    world_types = worlds.AutoWorldRegister.world_types
+    archipelago_package = gamespackage.get("Archipelago", {"item_name_to_id": {}, "location_name_to_id": {}})
+    names: typing.Dict[str, GameNames] = {}
+    for game, game_package in gamespackage.items():
+        item_names = {item_id: item_name for item_name, item_id in game_package["item_name_to_id"].items()}
+        location_names = {location_id: location_name
+                          for location_name, location_id in game_package["location_name_to_id"].items()}
+        if game != "Archipelago":
+            item_names.update((item_id, item_name)
+                              for item_name, item_id in archipelago_package["item_name_to_id"].items())
+            location_names.update((location_id, location_name)
+                                  for location_name, location_id in archipelago_package["location_name_to_id"].items())
+        world = world_types.get(game)
+        names[game] = GameNames(
+            item_names,
+            location_names,
+            frozenset(game_package["item_name_to_id"]) | frozenset(world.item_name_groups if world else ()),
+            frozenset(game_package["location_name_to_id"]) | frozenset(world.location_name_groups if world else ()),
+        )
+
+    directory = Utils.cache_path("webhost", "static_server_data")
+    os.makedirs(directory, exist_ok=True)
+    remove_stale_files(directory)
+    path = os.path.join(directory, f"{os.getpid()}.bin")
+    static_server_data = StaticServerData.write(path, {
+        "non_hintable_names": {game: world.hint_blacklist for game, world in world_types.items()},
+        "gamespackage": {
+            game: {key: value for key, value in game_package.items()
+                   if key not in ("item_name_groups", "location_name_groups")}
+            for game, game_package in gamespackage.items()
+        },
+        "item_name_groups": {game: world.item_name_groups for game, world in world_types.items()},
+        "location_name_groups": {game: world.location_name_groups for game, world in world_types.items()},
+        "names": names,
+    })
+    atexit.register(os.remove, path)
+    return static_server_data
@@ -1,7 +1,8 @@
 import datetime
 import collections
+import threading
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, NamedTuple, Counter
+from typing import Any, Callable, Dict, List, MutableMapping, Optional, Set, Tuple, NamedTuple, Counter
 from uuid import UUID
 from email.utils import parsedate_to_datetime
 
@@ -12,7 +13,7 @@ from MultiServer import Context, get_saving_second
 from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
 from Utils import restricted_loads, KeyedDefaultDict
 from . import app, cache
-from .models import GameDataPackage, Room
+from .models import GameDataPackage, Room, load_multisave
 
 # Multisave is currently updated, at most, every minute.
 TRACKER_CACHE_TIMEOUT_IN_SECONDS = 60
@@ -40,6 +41,85 @@ def _cache_results(func: Callable) -> Callable:
     return method_wrapper
 
 
+class _GameLookups(NamedTuple):
+    item_id_to_name: Dict[int, str]
+    location_id_to_name: Dict[int, str]
+    item_name_to_id: Dict[str, int]
+    location_name_to_id: Dict[str, int]
+
+
+class TrackerCache:
+    """Least recently used cache shared by the trackers of all requests of this process, bounded by the summed size of
+    its entries, as set by the app config entry of size_config."""
+    size_config: str
+    size: int
+    hits: int
+    misses: int
+    _entries: "collections.OrderedDict[Any, Tuple[Any, int]]"
+    _lock: threading.Lock
+
+    def __init__(self, size_config: str):
+        self.size_config = size_config
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, create: Callable[[], Tuple[Any, int]]) -> Any:
+        """Returns the cached value of key, or creates it, from create returning the value and its size."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value, size = create()
+        max_size = app.config[self.size_config]
+        with self._lock:
+            if key not in self._entries and size <= max_size:
+                self._entries[key] = value, size
+                self.size += size
+                while self.size > max_size:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self.size -= evicted_size
+        return value
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "size": self.size, "hits": self.hits, "misses": self.misses}
+
+
+# parsed static multidata by seed id, sized by its compressed multidata
+seed_cache = TrackerCache("TRACKER_SEED_CACHE_SIZE")
+# id <-> name lookups by data package checksum, sized by the pickled data package
+game_cache = TrackerCache("TRACKER_GAME_CACHE_SIZE")
+
+
+def get_tracker_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Entries, size, hits and misses of the caches of parsed static data shared by trackers."""
+    return {"seeds": seed_cache.get_stats(), "games": game_cache.get_stats()}
+
+
+def _load_multidata(room: Room) -> Tuple[MutableMapping[str, Any], int]:
+    multidata: bytes = room.seed.multidata
+    return Context.decompress(multidata), len(multidata)
+
+
+def _load_game_lookups(checksum: str) -> Tuple[_GameLookups, int]:
+    data: bytes = GameDataPackage.get(checksum=checksum).data
+    game_package = restricted_loads(data)
+    return _GameLookups(
+        KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})",
+                         {id: name for name, id in game_package["item_name_to_id"].items()}),
+        KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})",
+                         {id: name for name, id in game_package["location_name_to_id"].items()}),
+        game_package["item_name_to_id"],
+        game_package["location_name_to_id"],
+    ), len(data)
+
+
 @dataclass
 class TrackerData:
     """A helper dataclass that is instantiated each time an HTTP request comes in for tracker data.
@@ -48,15 +128,16 @@ class TrackerData:
     subsequent helper method calls do not need to recompute results during the lifetime of this instance.
     """
     room: Room
-    _multidata: Dict[str, Any]
+    _multidata: MutableMapping[str, Any]
     _multisave: Dict[str, Any]
     _tracker_cache: Dict[str, Any]
 
     def __init__(self, room: Room):
         """Initialize a new RoomMultidata object for the current room."""
         self.room = room
-        self._multidata = Context.decompress(room.seed.multidata)
-        self._multisave = restricted_loads(room.multisave) if room.multisave else {}
+        # static seed data and name lookups are shared between requests, only the multisave changes
+        self._multidata = seed_cache.get(room.seed.id, lambda: _load_multidata(room))
+        self._multisave = load_multisave(room) or {}
         self._tracker_cache = {}
 
         self.item_name_to_id: Dict[str, Dict[str, int]] = {}
@@ -70,15 +151,14 @@ class TrackerData:
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Location (ID: {code})")
         })
         for game, game_package in self._multidata["datapackage"].items():
-            game_package = restricted_loads(GameDataPackage.get(checksum=game_package["checksum"]).data)
-            self.item_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
-                id: name for name, id in game_package["item_name_to_id"].items()})
-            self.location_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
-                id: name for name, id in game_package["location_name_to_id"].items()})
+            checksum = game_package["checksum"]
+            lookups: _GameLookups = game_cache.get(checksum, lambda: _load_game_lookups(checksum))
+            self.item_id_to_name[game] = lookups.item_id_to_name
+            self.location_id_to_name[game] = lookups.location_id_to_name
 
             # Normal lookup tables as well.
-            self.item_name_to_id[game] = game_package["item_name_to_id"]
-            self.location_name_to_id[game] = game_package["location_name_to_id"]
+            self.item_name_to_id[game] = lookups.item_name_to_id
+            self.location_name_to_id[game] = lookups.location_name_to_id
 
     def get_seed_name(self) -> str:
         """Retrieves the seed name."""
@@ -24,24 +24,22 @@ __all__ = [
 
 no_gui = False
 skip_autosave = False
-_world_settings_name_cache: dict[str, str] = {}  # TODO: cache on disk and update when worlds change
+_world_settings_name_cache: dict[str, str] = {}  # cached on disk as part of the world index
 _world_settings_name_cache_updated = False
 _lock = Lock()
 
 
 def _update_cache() -> None:
-    """Load all worlds and update world_settings_name_cache"""
+    """Update world_settings_name_cache from the info of all worlds, which does not import them"""
     global _world_settings_name_cache_updated
     if _world_settings_name_cache_updated:
         return
 
     try:
-        from worlds.AutoWorld import AutoWorldRegister
-        for world in AutoWorldRegister.world_types.values():
-            annotation = world.__annotations__.get("settings", None)
-            if annotation is None or annotation == "ClassVar[Optional['Group']]":
-                continue
-            _world_settings_name_cache[world.settings_key] = f"{world.__module__}.{world.__name__}"
+        from worlds import world_info
+        for info in world_info.values():
+            if info["settings"]:
+                _world_settings_name_cache[info["settings_key"]] = info["settings"]
     finally:
         _world_settings_name_cache_updated = True
 
@@ -687,6 +685,28 @@ class GeneratorOptions(Group):
         start_inventory -> Move remaining items to start_inventory, generate additional filler items to fill locations.
         """
 
+    class WorldStageThreads(int):
+        """
+        Number of threads to run generate_early, create_regions, create_items and set_rules in,
+        for worlds that support it.
+        0 -> run all worlds one after another. (Default)
+        """
+
+    class OutputProcesses(int):
+        """
+        Number of worker processes to run each world's output generation (rom patching, compression) in.
+        0 -> run all output in threads of the generating process. (Default)
+        Only used on platforms that can fork. Workers are forked before any output thread is started.
+        Worlds that declare thread_only_output (currently Ocarina of Time and EarthBound) always use a thread.
+        """
+
+    class YamlProcesses(int):
+        """
+        Number of worker processes to read player files and roll their options in.
+        0 -> read and roll all player files in the generating process. (Default)
+        Only used on platforms that can fork. Rolled options for a seed are the same for any number of processes.
+        """
+
     enemizer_path: EnemizerPath = EnemizerPath("EnemizerCLI/EnemizerCLI.Core")  # + ".exe" is implied on Windows
     player_files_path: PlayerFilesPath = PlayerFilesPath("Players")
     players: Players = Players(0)
@@ -696,6 +716,9 @@ class GeneratorOptions(Group):
     race: Race = Race(0)
     plando_options: PlandoOptions = PlandoOptions("bosses, connections, texts")
     panic_method: PanicMethod = PanicMethod("swap")
+    world_stage_threads: WorldStageThreads = WorldStageThreads(0)
+    output_processes: OutputProcesses = OutputProcesses(0)
+    yaml_processes: YamlProcesses = YamlProcesses(0)
     loglevel: str = "info"
     logtime: bool = False
 
@@ -768,7 +791,7 @@ class Settings(Group):
             world_mod, world_cls_name = _world_settings_name_cache[key].rsplit(".", 1)
             try:
                 world = cast(type, getattr(__import__(world_mod, fromlist=[world_cls_name]), world_cls_name))
-            except AttributeError:
+            except (AttributeError, ImportError):
                 import warnings
                 warnings.warn(f"World {world_cls_name} failed to initialize properly.")
                 return super().__getattribute__(key)
@@ -57,10 +57,14 @@ if __name__ == "__main__":
     import ModuleUpdate
     ModuleUpdate.update(yes="--yes" in sys.argv or "-y" in sys.argv)
 
+from worlds import load_all_worlds
 from worlds.LauncherComponents import components, icon_paths
 from Utils import version_tuple, is_windows, is_linux
 from Cython.Build import cythonize
 
+# worlds register their components when imported
+load_all_worlds()
+
 
 non_apworlds: set[str] = {
     "A Link to the Past",
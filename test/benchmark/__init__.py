@@ -5,3 +5,7 @@ if __name__ == "__main__":
     load_worlds.run_load_worlds_benchmark()
     import locations
     locations.run_locations_benchmark()
+    import location_store
+    location_store.run_location_store_benchmark()
+    import wire_codec
+    wire_codec.run_wire_codec_benchmark()
@@ -0,0 +1,71 @@
+def run_fill_benchmark(game: str = "A Link to the Past", players: int = 10, batches: int = 20) -> None:
+    """
+    Run a benchmark of building the maximum exploration state of fill_restrictive from scratch for every batch,
+    against keeping a state of the item pool up to date and only sweeping a copy of it, and of a full progression fill.
+    Both still sweep all filled locations every batch, only collecting the item pool is saved.
+
+    :param game: Game of all players in the generated multiworld
+    :param players: Number of players in the generated multiworld
+    :param batches: Number of fill batches, of one item per player each, to simulate
+    """
+    import argparse
+    import logging
+    import typing
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from BaseClasses import CollectionState, Item, MultiWorld
+    from worlds import AutoWorld
+    from worlds.AutoWorld import call_all
+    from Fill import fill_restrictive, sweep_from_pool
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    gen_steps = ("generate_early", "create_regions", "create_items", "set_rules", "connect_entrances",
+                 "generate_basic", "pre_fill")
+
+    def setup() -> typing.Tuple[MultiWorld, typing.List[Item]]:
+        multiworld = MultiWorld(players)
+        multiworld.game = {player: game for player in multiworld.player_ids}
+        multiworld.player_name = {player: f"Tester{player}" for player in multiworld.player_ids}
+        multiworld.set_seed(0)
+        args = argparse.Namespace()
+        for name, option in AutoWorld.AutoWorldRegister.world_types[game].options_dataclass.type_hints.items():
+            setattr(args, name, {player: option.from_any(option.default) for player in multiworld.player_ids})
+        multiworld.set_options(args)
+        multiworld.state = CollectionState(multiworld)
+        for step in gen_steps:
+            call_all(multiworld, step)
+        return multiworld, [item for item in multiworld.itempool if item.advancement]
+
+    multiworld, progression = setup()
+    item_pool = progression[:]
+    with TimeIt(f"{game} {players} players, {batches} batches collecting the item pool and sweeping", logger):
+        for _ in range(batches):
+            del item_pool[-players:]
+            sweep_from_pool(multiworld.state, item_pool)
+
+    item_pool = progression[:]
+    with TimeIt(f"{game} {players} players, {batches} batches sweeping a copy of the kept pool state", logger):
+        pool_state = sweep_from_pool(multiworld.state, item_pool, [])
+        for _ in range(batches):
+            for item in item_pool[-players:]:
+                pool_state.remove(item)
+            del item_pool[-players:]
+            sweep_from_pool(pool_state)
+
+    multiworld, progression = setup()
+    for item in progression:
+        multiworld.itempool.remove(item)
+    locations = multiworld.get_unfilled_locations()
+    multiworld.random.shuffle(locations)
+    with TimeIt(f"{game} {players} players, fill_restrictive of {len(progression)} progression items", logger):
+        fill_restrictive(multiworld, multiworld.state, locations, progression, allow_partial=True, name="Benchmark")
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_fill_benchmark()
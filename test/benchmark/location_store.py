@@ -0,0 +1,62 @@
+def run_location_store_benchmark(players: int = 200, locations_per_player: int = 500) -> None:
+    """
+    Run a benchmark of the LocationStore queries used by hints, collect and remaining,
+    for the pure python and, if available, the cython implementation.
+
+    :param players: Number of players in the generated location data
+    :param locations_per_player: Number of locations and distinct items per player
+    """
+    import logging
+    import random
+    import typing
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from NetUtils import LocationStore, _LocationStore
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    rand = random.Random(0)
+    location_data = {
+        player: {
+            location: (rand.randrange(locations_per_player), rand.randint(1, players), 0)
+            for location in range(locations_per_player)
+        }
+        for player in range(1, players + 1)
+    }
+    state = {(0, player): set(rand.sample(range(locations_per_player), locations_per_player // 2))
+             for player in location_data}
+    queries = 1_000
+
+    store_types: typing.List[type] = [_LocationStore]
+    if LocationStore is not _LocationStore:
+        store_types.append(LocationStore)
+    else:
+        logger.info("_speedups not available, only benchmarking pure python LocationStore.")
+
+    for store_type in store_types:
+        name = f"{store_type.__module__}.{store_type.__name__}"
+        with TimeIt(f"{name} construction", logger):
+            store = store_type(location_data)
+        with TimeIt(f"{name} {queries} find_item", logger):
+            for n in range(queries):
+                for _ in store.find_item({n % players + 1}, n % locations_per_player):
+                    pass
+        with TimeIt(f"{name} {queries} find_item for 10 slots", logger):
+            for n in range(queries):
+                for _ in store.find_item({(n + i) % players + 1 for i in range(10)}, n % locations_per_player):
+                    pass
+        with TimeIt(f"{name} {queries} get_for_player", logger):
+            for n in range(queries):
+                store.get_for_player(n % players + 1)
+        with TimeIt(f"{name} {queries} get_remaining", logger):
+            for n in range(queries):
+                store.get_remaining(state, 0, n % players + 1)
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_location_store_benchmark()
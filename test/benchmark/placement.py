@@ -0,0 +1,73 @@
+def run_placement_benchmark(game: str = "A Link to the Past", players: int = 10) -> None:
+    """
+    Run a benchmark of finding a location for every item of the item pool with PlacementIndex, once checking the
+    item rules of locations without one once per kind of item and once checking them for every item,
+    against checking Location.can_fill of every location in order.
+
+    :param game: Game of all players in the generated multiworld
+    :param players: Number of players in the generated multiworld
+    """
+    import argparse
+    import logging
+    import typing
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from BaseClasses import CollectionState, Item, Location, MultiWorld
+    from worlds import AutoWorld
+    from worlds.AutoWorld import call_all
+    from Fill import PlacementIndex
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    gen_steps = ("generate_early", "create_regions", "create_items", "set_rules", "connect_entrances",
+                 "generate_basic", "pre_fill")
+
+    multiworld = MultiWorld(players)
+    multiworld.game = {player: game for player in multiworld.player_ids}
+    multiworld.player_name = {player: f"Tester{player}" for player in multiworld.player_ids}
+    multiworld.set_seed(0)
+    args = argparse.Namespace()
+    for name, option in AutoWorld.AutoWorldRegister.world_types[game].options_dataclass.type_hints.items():
+        setattr(args, name, {player: option.from_any(option.default) for player in multiworld.player_ids})
+    multiworld.set_options(args)
+    multiworld.state = CollectionState(multiworld)
+    for step in gen_steps:
+        call_all(multiworld, step)
+
+    locations = multiworld.get_unfilled_locations()
+    multiworld.random.shuffle(locations)
+    items: typing.List[Item] = multiworld.itempool[:len(locations)]
+    default_rules = sum(location.item_rule is Location.item_rule for location in locations)
+    logger.info(f"{default_rules} of {len(locations)} locations have no item rule.")
+    for location in locations:  # fill the reachability caches of the state, so they don't count towards the first run
+        location.can_reach(multiworld.state)
+
+    def place_all(placement_index: PlacementIndex) -> int:
+        return sum(placement_index.pop(multiworld.state, item) is not None for item in items)
+
+    with TimeIt(f"{game} {players} players, {len(items)} items, default item rules checked once per kind", logger):
+        placement_index = PlacementIndex(multiworld, locations[:])
+        placed = place_all(placement_index)
+
+    with TimeIt(f"{game} {players} players, {len(items)} items, default item rules checked for every item", logger):
+        placement_index = PlacementIndex(multiworld, locations[:])
+        placement_index.rule_check.update(location for location in locations
+                                          if location not in placement_index.full_check)
+        assert place_all(placement_index) == placed
+
+    with TimeIt(f"{game} {players} players, {len(items)} items, can_fill of every location", logger):
+        unfilled = locations[:]
+        for item in items:
+            for index, location in enumerate(unfilled):
+                if location.can_fill(multiworld.state, item):
+                    del unfilled[index]
+                    break
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_placement_benchmark()
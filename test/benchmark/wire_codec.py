@@ -0,0 +1,53 @@
+def run_wire_codec_benchmark(items: int = 10_000, games: int = 20, names_per_game: int = 2_000) -> None:
+    """
+    Run a benchmark of encoding and decoding large messages of the network protocol,
+    for the json and, if available, the orjson WireCodec.
+
+    :param items: Number of NetworkItems in the ReceivedItems message
+    :param games: Number of games in the DataPackage message
+    :param names_per_game: Number of items and locations of each game in the DataPackage message
+    """
+    import logging
+    import typing
+
+    from time_it import TimeIt
+
+    from Utils import init_logging
+    from NetUtils import NetworkItem, ORJSONWireCodec, WireCodec
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    messages = {
+        "ReceivedItems": [{"cmd": "ReceivedItems", "index": 0,
+                           "items": [NetworkItem(n, n * 7, n % 50 + 1, n % 8) for n in range(items)]}],
+        "DataPackage": [{"cmd": "DataPackage", "data": {"games": {
+            f"Game {game}": {
+                "item_name_to_id": {f"Item {n}": n for n in range(names_per_game)},
+                "location_name_to_id": {f"Location {n}": n for n in range(names_per_game)},
+                "checksum": f"{game:040x}",
+            } for game in range(games)
+        }}}],
+    }
+    repeat = 10
+
+    codecs: typing.List[WireCodec] = [WireCodec()]
+    try:
+        codecs.append(ORJSONWireCodec())
+    except ImportError:
+        logger.info("orjson not available, only benchmarking json WireCodec.")
+
+    for codec in codecs:
+        for cmd, message in messages.items():
+            with TimeIt(f"{codec.name} {repeat} encode {cmd}", logger):
+                for _ in range(repeat):
+                    data = codec.encode(message)
+            with TimeIt(f"{codec.name} {repeat} decode {cmd}", logger):
+                for _ in range(repeat):
+                    codec.decode(data)
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_wire_codec_benchmark()
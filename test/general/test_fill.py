@@ -4,7 +4,7 @@ import unittest
 from Options import Accessibility
 from test.general import generate_items, generate_locations, generate_test_multiworld
 from Fill import FillError, balance_multiworld_progression, fill_restrictive, \
-    distribute_early_items, distribute_items_restrictive
+    distribute_early_items, distribute_items_restrictive, PlacementIndex
 from BaseClasses import Entrance, LocationProgressType, MultiWorld, Region, Item, Location, \
     ItemClassification
 from worlds.generic.Rules import CollectionRule, add_item_rule, locality_rules, set_rule
@@ -433,6 +433,65 @@ class TestFillRestrictive(unittest.TestCase):
         self.assertTrue(sphere1_loc1.item.name == one_to_two1 or
                         sphere1_loc2.item.name == one_to_two1, "Wrong item in Sphere 1")
 
+    def test_item_rule_with_always_allow(self):
+        """Test that always_allow is checked per item even when the item rule forbids the item's signature"""
+        multiworld = generate_test_multiworld(1)
+        player1 = generate_player_data(multiworld, 1, 2, 2)
+        items = player1.prog_items[:]  # copy required
+        items[1].name = items[0].name
+        allowed_item = items[0]
+        restricted_loc = player1.locations[0]
+        add_item_rule(restricted_loc, lambda item_to_place: False)
+        restricted_loc.always_allow = lambda state, item_to_place: item_to_place is allowed_item
+
+        fill_restrictive(multiworld, multiworld.state, player1.locations, player1.prog_items)
+
+        self.assertIs(restricted_loc.item, allowed_item)
+
+    def test_item_rule_checked_per_item(self):
+        """Test that item rules are checked for every item unless the world declares them static"""
+        multiworld = generate_test_multiworld(1)
+        player1 = generate_player_data(multiworld, 1, 2, 2)
+        items = player1.prog_items[:]  # copy required
+        items[1].name = items[0].name
+        allowed_item = items[0]
+        restricted_loc = player1.locations[0]
+        add_item_rule(restricted_loc, lambda item_to_place: item_to_place is allowed_item)
+
+        fill_restrictive(multiworld, multiworld.state, player1.locations, player1.prog_items)
+
+        self.assertIs(restricted_loc.item, allowed_item)
+        self.assertEqual(player1.locations, [])
+
+    def test_static_item_rules(self):
+        """Test that the item rules of worlds with static_item_rules are checked once per kind of item"""
+        multiworld = generate_test_multiworld(1)
+        multiworld.worlds[1].static_item_rules = True
+        player1 = generate_player_data(multiworld, 1, 3, 3)
+        for item in player1.prog_items[1:]:
+            item.name = player1.prog_items[0].name
+        checked_items = []
+        restricted_loc = player1.locations[2]
+        restricted_loc.item_rule = lambda item_to_place: checked_items.append(item_to_place) is None
+
+        fill_restrictive(multiworld, multiworld.state, player1.locations, player1.prog_items)
+
+        self.assertEqual(len(checked_items), 1)
+        self.assertIsNotNone(restricted_loc.item)
+        self.assertEqual([], player1.prog_items)
+
+    def test_default_item_rules(self):
+        """Test that locations without an item rule don't need it checked for every item"""
+        multiworld = generate_test_multiworld(1)
+        player1 = generate_player_data(multiworld, 1, 3, 3)
+        restricted_loc = player1.locations[0]
+        add_item_rule(restricted_loc, lambda item_to_place: True)
+
+        placement_index = PlacementIndex(multiworld, player1.locations)
+
+        self.assertEqual(placement_index.rule_check, {restricted_loc})
+        self.assertEqual(placement_index.full_check, set())
+
     def test_double_sweep(self):
         """Test that sweep doesn't duplicate Event items when sweeping"""
         # test for PR1114
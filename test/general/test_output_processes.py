@@ -0,0 +1,50 @@
+import concurrent.futures
+import functools
+import multiprocessing
+import threading
+import types
+import unittest
+
+import Main
+from . import generate_test_multiworld
+
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "output processes require fork")
+class TestOutputProcesses(unittest.TestCase):
+    def run_output(self, generate_output) -> concurrent.futures.Future:
+        multiworld = generate_test_multiworld()
+        world = multiworld.worlds[1]
+        world.output_attributes = ("rom_name",)
+        world.output_events = ("rom_name_available_event",)
+        world.rom_name_available_event = threading.Event()
+        world.generate_output = types.MethodType(generate_output, world)
+        Main._output_multiworld = multiworld
+        try:
+            with concurrent.futures.ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("fork")) as pool:
+                future = pool.submit(Main._generate_output_in_process, 1, "")
+                future.add_done_callback(functools.partial(Main._apply_process_output, world))
+                concurrent.futures.wait((future,))
+        finally:
+            Main._clear_output_multiworld()
+        self.assertTrue(world.rom_name_available_event.is_set())
+        self.world = world
+        return future
+
+    def test_attributes_sent_back(self) -> None:
+        """Test that output_attributes set in the worker are applied to the world of the generating process."""
+        def generate_output(world, output_directory: str) -> None:
+            world.rom_name = bytearray(b"AP_1")
+            world.multiworld.spoiler.hashes[world.player] = "hash"
+
+        self.run_output(generate_output).result()
+        self.assertEqual(self.world.rom_name, b"AP_1")
+        self.assertEqual(self.world.multiworld.spoiler.hashes[1], "hash")
+
+    def test_events_set_on_error(self) -> None:
+        """Test that output_events are set if generate_output fails, so stages waiting for them don't hang."""
+        def generate_output(world, output_directory: str) -> None:
+            raise ValueError("patching failed")
+
+        with self.assertRaises(ValueError):
+            self.run_output(generate_output).result()
+        self.assertFalse(hasattr(self.world, "rom_name"))
@@ -0,0 +1,92 @@
+import unittest
+
+from BaseClasses import CollectionState, Entrance, Item, ItemClassification, Location, Region
+from worlds.generic.Rules import FALSE, TRUE, And, Constant, Has, HasAll, Opaque, Or, add_rule, set_rule
+from . import generate_test_multiworld
+
+
+class TestRuleCombination(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        self.menu = self.multiworld.get_region("Menu", 1)
+        self.location = Location(1, "Location", None, self.menu)
+        self.menu.locations.append(self.location)
+
+    def collect(self, state: CollectionState, name: str) -> None:
+        state.collect(Item(name, ItemClassification.progression, None, 1), True)
+
+    def test_flatten(self) -> None:
+        """Ensure nested combinations are flattened and constants folded."""
+        opaque = lambda state: True
+        self.assertEqual(And(Has("A", 1), And(Has("B", 1), opaque)).rules[2].function, opaque)
+        self.assertEqual(len(Or(Has("A", 1), Or(Has("B", 1), Has("C", 1))).rules), 3)
+        self.assertIs(And(Has("A", 1), FALSE), FALSE)
+        self.assertIs(Or(Has("A", 1), TRUE), TRUE)
+        self.assertIs(And(TRUE, Location.access_rule), TRUE)
+        self.assertIsInstance(And(Has("A", 1), TRUE), Has)
+        self.assertIs(And(Has("A", 1), Constant(False)), FALSE)
+        self.assertIs(Or(Has("A", 1), Constant(True)), TRUE)
+        self.assertIsInstance(Or(Has("A", 1), Constant(False)), Has)
+
+    def test_add_rule(self) -> None:
+        """Ensure add_rule builds a single compiled rule that still evaluates like the nested lambdas did."""
+        add_rule(self.location, lambda state: state.has("A", 1))
+        add_rule(self.location, Has("B", 1))
+        add_rule(self.location, HasAll(("C", "D"), 1))
+        add_rule(self.location, lambda state: state.has("E", 1), "or")
+        rule = self.location.access_rule.rule
+        self.assertIsNone(rule._compiled)
+        self.assertIsInstance(rule, Or)
+        self.assertIsInstance(rule.rules[1], And)
+        self.assertIsInstance(rule.rules[1].rules[2], Opaque)
+
+        state = CollectionState(self.multiworld)
+        for name in ("A", "B", "C"):
+            self.collect(state, name)
+            self.assertFalse(self.location.can_reach(state))
+        self.collect(state, "D")
+        self.assertTrue(self.location.can_reach(state))
+        self.assertIs(self.location.access_rule, rule._compiled)
+        other_state = CollectionState(self.multiworld)
+        self.collect(other_state, "E")
+        self.assertTrue(self.location.can_reach(other_state))
+
+    def test_set_rule(self) -> None:
+        """Ensure Rule objects can be set directly and folding to TRUE restores the default rule."""
+        entrance = self.menu.create_exit("Exit")
+        set_rule(entrance, And(Has("A", 1), TRUE))
+        self.assertEqual(self.multiworld.entrance_dependencies.analyse(entrance.access_rule, 1), {"A"})
+        set_rule(entrance, Or(Has("A", 1), TRUE))
+        self.assertIs(entrance.access_rule, Entrance.access_rule)
+        region = Region("Other", 1, self.multiworld)
+        self.multiworld.regions.append(region)
+        entrance.connect(region)
+        self.assertTrue(region.can_reach(CollectionState(self.multiworld)))
+
+    def test_copied_rule(self) -> None:
+        """Ensure evaluating a rule copied to another spot doesn't overwrite the rule set on the original spot since."""
+        other_location = Location(1, "Other Location", None, self.menu)
+        self.menu.locations.append(other_location)
+        set_rule(self.location, Has("A", 1))
+        other_location.access_rule = self.location.access_rule
+        set_rule(self.location, Has("B", 1))
+
+        state = CollectionState(self.multiworld)
+        self.collect(state, "A")
+        self.assertTrue(other_location.can_reach(state))
+        self.assertFalse(self.location.can_reach(state))
+        self.assertEqual(self.location.access_rule.rule.item, "B")
+
+    def test_compiled_rule_unchanged(self) -> None:
+        """Ensure compiling a rule on first use doesn't count as a changed rule for reachability caching."""
+        entrance = self.menu.create_exit("Exit")
+        entrance.connect(Region("Other", 1, self.multiworld))
+        set_rule(entrance, Has("A", 1))
+        dependencies = self.multiworld.entrance_dependencies
+        self.assertEqual(dependencies.get(entrance), {"A"})
+        epoch = dependencies.epoch
+        stub = entrance.access_rule
+        entrance.access_rule(CollectionState(self.multiworld))
+        self.assertIsNot(entrance.access_rule, stub)
+        self.assertEqual(dependencies.get(entrance), {"A"})
+        self.assertEqual(dependencies.epoch, epoch)
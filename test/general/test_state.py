@@ -1,7 +1,9 @@
 import unittest
+from unittest import mock
 
+from BaseClasses import CollectionState, Item, ItemClassification, Region, SphereWalk
 from worlds.AutoWorld import AutoWorldRegister, call_all
-from . import setup_solo_multiworld
+from . import generate_test_multiworld, setup_solo_multiworld
 
 
 class TestBase(unittest.TestCase):
@@ -27,3 +29,117 @@ class TestBase(unittest.TestCase):
                     with self.subTest("Step", step=step):
                         call_all(multiworld, step)
                         self.assertTrue(multiworld.get_all_state(False, allow_partial_entrances=True))
+
+
+class TestIncrementalReachability(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        self.menu = self.multiworld.get_region("Menu", 1)
+        self.first = Region("First", 1, self.multiworld)
+        self.second = Region("Second", 1, self.multiworld)
+        self.multiworld.regions += [self.first, self.second]
+        self.menu.connect(self.first, "To First", lambda state: state.has("Key", 1))
+        self.first.connect(self.second, "To Second", lambda state: state.has_all(("Key", "Lamp"), 1))
+
+    def test_analyse_rules(self) -> None:
+        """Ensure only rules that purely query their own player's items get dependencies."""
+        dependencies = self.multiworld.entrance_dependencies
+        player = 1
+        self.assertEqual(dependencies.get(self.multiworld.get_entrance("To Second", 1)), {"Key", "Lamp"})
+        self.assertEqual(dependencies.analyse(lambda state: state.has("Key", player), 1), {"Key"})
+        self.assertIsNone(dependencies.analyse(lambda state: state.can_reach("First", "Region", player), 1))
+        self.assertIsNone(dependencies.analyse(lambda state: state.has(self.first.name, 1), 1))
+        level = 1
+        self.assertIsNone(dependencies.analyse(lambda state: state.has(f"Level {level} Key", player), 1))
+        names = ["Key"]
+        self.assertIsNone(dependencies.analyse(lambda state: state.has_all(names, player), 1))
+        self.assertIsNone(dependencies.analyse(lambda state: state.has("Key", 2), 1))
+
+    def test_incremental_update(self) -> None:
+        """Ensure collecting items and changing rules after a region update unblocks the correct regions."""
+        state = CollectionState(self.multiworld)
+        self.assertFalse(self.first.can_reach(state))
+        state.collect(Item("Lamp", ItemClassification.progression, None, 1), True)
+        self.assertFalse(self.first.can_reach(state))
+        copy = state.copy()
+        state.collect(Item("Key", ItemClassification.progression, None, 1), True)
+        self.assertTrue(self.second.can_reach(state))
+        self.assertFalse(self.first.can_reach(copy))
+
+        self.multiworld.get_entrance("To First", 1).access_rule = lambda state: True
+        copy.stale[1] = True
+        self.assertTrue(self.first.can_reach(copy))
+        self.assertFalse(self.second.can_reach(copy))
+
+
+class TestSphereWalk(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld()
+        menu = self.multiworld.get_region("Menu", 1)
+        first = Region("First", 1, self.multiworld)
+        self.multiworld.regions.append(first)
+        menu.connect(first, "To First", lambda state: state.has("Key", 1))
+        menu.add_locations({"Key Spot": 1, "Locked": 4})
+        first.add_locations({"Lamp Spot": 2, "Chest": 3})
+        self.key, self.locked, self.lamp, self.chest = (self.multiworld.get_location(name, 1)
+                                                        for name in ("Key Spot", "Locked", "Lamp Spot", "Chest"))
+        self.chest.access_rule = lambda state: state.has("Lamp", 1)
+        self.locked.access_rule = lambda state: state.has("Missing", 1)
+        for location, name in ((self.key, "Key"), (self.lamp, "Lamp"), (self.chest, "Chest Item"),
+                               (self.locked, "Locked Item")):
+            location.place_locked_item(Item(name, ItemClassification.progression, None, 1))
+
+    def test_spheres(self) -> None:
+        """Ensure locations are only reached once their region and access rule allow it."""
+        self.assertEqual(list(self.multiworld.get_spheres()),
+                         [{self.key}, {self.lamp}, {self.chest}, set(), {self.locked}])
+
+    def test_cache(self) -> None:
+        """Ensure the sphere walk is reused until the placement changes."""
+        sphere_walk = self.multiworld.get_sphere_walk()
+        self.assertIs(self.multiworld.get_sphere_walk(), sphere_walk)
+        self.chest.item = None
+        self.chest.place_locked_item(Item("Missing", ItemClassification.progression, None, 1))
+        self.assertIsNot(self.multiworld.get_sphere_walk(), sphere_walk)
+        self.assertEqual(list(self.multiworld.get_spheres()), [{self.key}, {self.lamp}, {self.chest}, {self.locked}])
+
+    def test_sendable_spheres(self) -> None:
+        """Ensure events are collected as soon as they are reachable, without forming spheres of their own."""
+        for location in (self.lamp, self.chest, self.locked):
+            location.item.code = location.address
+        self.assertEqual(list(self.multiworld.get_sendable_spheres()), [{self.lamp}, {self.chest}, set(), {self.locked}])
+
+    def test_shared_walk(self) -> None:
+        """Ensure every sphere consumer reads from the same walk, which is only regrouped for sendable spheres."""
+        self.locked.access_rule = lambda state: state.has("Chest Item", 1)
+        walks = []
+        original_init = SphereWalk.__init__
+
+        def init(sphere_walk: SphereWalk, *args, **kwargs) -> None:
+            walks.append(sphere_walk)
+            original_init(sphere_walk, *args, **kwargs)
+
+        with mock.patch.object(SphereWalk, "__init__", init):
+            spheres = list(self.multiworld.get_spheres())
+            list(self.multiworld.get_sendable_spheres())
+            list(self.multiworld.get_sendable_spheres())
+            self.assertTrue(self.multiworld.fulfills_accessibility())
+            self.multiworld.spoiler.create_playthrough(create_paths=False)
+        # the shared walk, its regrouping into sendable spheres, and the playthrough's walk of required locations
+        self.assertEqual(len(walks), 3)
+        self.assertEqual(spheres, [{self.key}, {self.lamp}, {self.chest}, {self.locked}])
+
+    def test_step(self) -> None:
+        """Ensure a walk can be stepped through and forked, with each fork collecting independently."""
+        sphere_walk = SphereWalk(self.multiworld, self.multiworld.get_locations(), walk=False)
+        self.assertEqual(sphere_walk.find_reachable(), {self.key})
+        sphere_walk.collect({self.key})
+        fork = sphere_walk.copy()
+        self.assertEqual(fork.find_reachable({self.chest}), set())
+        self.assertEqual(fork.find_reachable(), {self.lamp})
+        fork.collect({self.lamp})
+        self.assertEqual(fork.find_reachable(), {self.chest})
+        self.assertEqual(fork.remaining, {self.locked})
+        self.assertFalse(sphere_walk.state.has("Lamp", 1))
+        self.assertEqual(sphere_walk.remaining, {self.lamp, self.chest, self.locked})
+        self.assertEqual(sphere_walk.find_reachable(), {self.lamp})
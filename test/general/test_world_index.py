@@ -0,0 +1,78 @@
+import unittest
+
+import worlds
+from Utils import Version
+from worlds.AutoWorld import AutoWorldRegister, World, WorldTypes
+
+
+class TestWorldIndex(unittest.TestCase):
+    def test_world_info(self) -> None:
+        """Ensure the info of each world, which may come from the world index, matches the imported world."""
+        for game, world_type in AutoWorldRegister.world_types.items():
+            if game not in worlds.world_info:
+                continue  # registered after startup, like test worlds
+            with self.subTest(game=game):
+                info = worlds.world_info[game]
+                self.assertEqual(info, worlds.get_world_info(world_type))
+                # the checksum also depends on the order of the names, which some worlds change per run
+                self.assertEqual(list(info["data_package"]["item_name_to_id"]), list(world_type.item_name_to_id))
+                self.assertEqual(worlds.network_data_package["games"][game]["checksum"],
+                                 info["data_package"]["checksum"])
+
+    def test_pending(self) -> None:
+        """Ensure pending games are listed without importing them, and get imported once when looked up."""
+        world_types = WorldTypes()
+        loads = []
+
+        class LazyWorld(World):
+            game = "Lazy Game"
+            item_name_to_id = {}
+            location_name_to_id = {}
+
+        AutoWorldRegister.world_types.pop(LazyWorld.game)
+
+        def load() -> None:
+            loads.append(LazyWorld.game)
+            world_types[LazyWorld.game] = LazyWorld
+
+        world_types.add_pending({LazyWorld.game: Version(1, 2, 3), "Missing Game": Version(0, 0, 0)}, load)
+        self.assertIn(LazyWorld.game, world_types)
+        self.assertEqual(list(world_types), [LazyWorld.game, "Missing Game"])
+        self.assertEqual(loads, [])
+
+        self.assertIs(world_types[LazyWorld.game], LazyWorld)
+        self.assertEqual(LazyWorld.world_version, Version(1, 2, 3))
+        self.assertEqual(loads, [LazyWorld.game])
+        # the same import was supposed to register the missing game
+        self.assertNotIn("Missing Game", world_types)
+        self.assertIsNone(world_types.get("Missing Game"))
+        self.assertEqual(dict(world_types), {LazyWorld.game: LazyWorld})
+        self.assertEqual(loads, [LazyWorld.game])
+
+    def test_direct_import(self) -> None:
+        """Ensure a pending game that registers without being looked up is no longer pending and gets reported."""
+        world_types = WorldTypes()
+        imported = []
+        world_types.on_import = lambda game, world: imported.append((game, world))
+
+        class DirectWorld(World):
+            game = "Direct Game"
+            item_name_to_id = {}
+            location_name_to_id = {}
+
+        AutoWorldRegister.world_types.pop(DirectWorld.game)
+
+        def load() -> None:
+            self.fail("the world was already imported")
+
+        world_types.add_pending({DirectWorld.game: Version(1, 2, 3)}, load)
+        world_types[DirectWorld.game] = DirectWorld
+        self.assertEqual(imported, [(DirectWorld.game, DirectWorld)])
+        self.assertEqual(DirectWorld.world_version, Version(1, 2, 3))
+        self.assertEqual(dict(world_types), {DirectWorld.game: DirectWorld})
+        self.assertIs(world_types[DirectWorld.game], DirectWorld)
+
+    def test_used_worlds(self) -> None:
+        """Ensure the worlds a world imports from are found, so changes to them invalidate its index entry."""
+        AutoWorldRegister.world_types["Meritous"]  # imports the world if it is pending
+        self.assertIn("worlds.generic", worlds.get_used_worlds(worlds.WorldSource("meritous")))
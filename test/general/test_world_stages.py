@@ -0,0 +1,74 @@
+import time
+import unittest
+from unittest import mock
+
+from Fill import distribute_items_restrictive
+from settings import get_settings
+from worlds.AutoWorld import AutoWorldRegister
+from . import setup_multiworld
+
+
+class TestParallelWorldStages(unittest.TestCase):
+    def test_parallel_matches_serial(self) -> None:
+        """Tests that running world stages in threads creates the same multiworld as running them serially."""
+        world_type = AutoWorldRegister.world_types["ChecksFinder"]
+        serial, parallel = self.generate([world_type] * 4)
+        self.assert_same(serial, parallel)
+
+    def test_mixed_matches_serial(self) -> None:
+        """Tests that worlds running their stages in threads keep their place among worlds that don't."""
+        world_type = AutoWorldRegister.world_types["ChecksFinder"]
+        serial_world_type = AutoWorldRegister.world_types["Meritous"]
+        self.assertFalse(serial_world_type.parallel_stages)
+        serial, parallel = self.generate([serial_world_type, world_type, serial_world_type, world_type])
+        self.assertEqual([item.player for item in parallel.itempool],
+                         sorted(item.player for item in parallel.itempool))
+        self.assert_same(serial, parallel)
+
+    def test_removed_items_match_serial(self) -> None:
+        """Tests that worlds removing their own items from the pool in threads leave it in the serial order."""
+        world_type = AutoWorldRegister.world_types["ChecksFinder"]
+
+        def replace_item(world) -> None:
+            world.multiworld.itempool.remove(world.create_item("Map Bombs"))
+            world.multiworld.itempool.append(world.create_item("Map Bombs"))
+
+        def create_items(world) -> None:
+            # have later players finish first, so threads add their items in reverse order
+            time.sleep(0.05 * (world.multiworld.players - world.player))
+            original_create_items(world)
+            replace_item(world)
+
+        def set_rules(world) -> None:
+            original_set_rules(world)
+            replace_item(world)
+
+        original_create_items, original_set_rules = world_type.create_items, world_type.set_rules
+        with mock.patch.object(world_type, "create_items", create_items), \
+                mock.patch.object(world_type, "set_rules", set_rules):
+            serial, parallel = self.generate([world_type] * 4)
+        self.assert_same(serial, parallel)
+
+    def generate(self, world_types: list) -> tuple:
+        generator_settings = get_settings().generator
+        old_threads = generator_settings.world_stage_threads
+        try:
+            generator_settings.world_stage_threads = 0
+            serial = setup_multiworld(world_types, seed=1)
+            generator_settings.world_stage_threads = 4
+            parallel = setup_multiworld(world_types, seed=1)
+        finally:
+            generator_settings.world_stage_threads = old_threads
+        for multiworld in (serial, parallel):
+            distribute_items_restrictive(multiworld)
+        return serial, parallel
+
+    def assert_same(self, serial, parallel) -> None:
+        self.assertEqual([(item.name, item.player) for item in serial.itempool],
+                         [(item.name, item.player) for item in parallel.itempool])
+        self.assertEqual([(location.name, location.player, location.item.name, location.item.player)
+                          for location in serial.get_locations()],
+                         [(location.name, location.player, location.item.name, location.item.player)
+                          for location in parallel.get_locations()])
+        for player in parallel.player_ids:
+            self.assertIn(player, parallel.stage_times["create_items"])
@@ -0,0 +1,43 @@
+# Tests for the sectioned multidata format
+import unittest
+import zlib
+
+from MultiServer import Context
+from NetUtils import MultiDataSections, NetworkSlot, SlotType, encode_multidata
+from Utils import restricted_dumps
+
+sample_multidata = {
+    "slot_data": {1: {"goal": 1}, 2: {"goal": 2}},
+    "slot_info": {1: NetworkSlot("Player1", "Game", SlotType.player), 2: NetworkSlot("Player2", "Game", SlotType.player)},
+    "locations": {1: {11: (21, 2, 0)}, 2: {21: (11, 1, 0)}},
+    "seed_name": "12345",
+    "spheres": [{1: {11}, 2: {21}}],
+    "datapackage": {"Game": {"item_name_to_id": {"Item": 1}, "checksum": "abc"}},
+}
+
+
+class TestMultiDataSections(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        """Ensure the sectioned format reads back the same data, and the old format stays readable."""
+        data = Context.decompress(encode_multidata(sample_multidata))
+        self.assertIsInstance(data, MultiDataSections)
+        self.assertEqual(data, sample_multidata)
+        self.assertEqual(Context.decompress(bytes([3]) + zlib.compress(restricted_dumps(sample_multidata))),
+                         sample_multidata)
+
+    def test_lazy_sections(self) -> None:
+        """Ensure only accessed sections get decoded, and untouched sections get copied when encoding again."""
+        data = MultiDataSections.from_bytes(encode_multidata(sample_multidata))
+        self.assertIn("spheres", data)
+        self.assertEqual(data["slot_data"][2], {"goal": 2})
+        self.assertEqual(set(data["slot_data"]._decoded), {2})
+        self.assertEqual(set(data._decoded), {"slot_data"})
+        self.assertIsNotNone(data["slot_data"].raw_section(1))
+        self.assertIsNone(data["slot_data"].raw_section(2))
+
+        del data["datapackage"]["Game"]
+        data["seed_name"] = "67890"
+        reencoded = Context.decompress(encode_multidata(data))
+        self.assertEqual(reencoded, {**sample_multidata, "seed_name": "67890", "datapackage": {}})
+        self.assertEqual(data.pop("locations"), sample_multidata["locations"])
+        self.assertNotIn("locations", data)
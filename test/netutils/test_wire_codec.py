@@ -0,0 +1,43 @@
+# Tests for the WireCodec implementations of the network protocol
+import unittest
+
+from NetUtils import (HintStatus, NetworkItem, NetworkPlayer, NetworkSlot, ORJSONWireCodec, SlotType, WireCodec,
+                      get_default_wire_codec)
+from Utils import Version
+
+sample_messages = [
+    [{"cmd": "ReceivedItems", "index": 0, "items": [NetworkItem(1, 2, 3, 4), NetworkItem(5, 6, 7)]}],
+    [{"cmd": "Connected", "team": 0, "slot": 1, "players": [NetworkPlayer(0, 1, "Alias", "Name")],
+      "missing_locations": {3, 2, 1}, "checked_locations": frozenset(), "hint_points": 0,
+      "slot_info": {1: NetworkSlot("Name", "Game", SlotType.player), 2: NetworkSlot("Group", "Game", SlotType.group,
+                                                                                       (1,))}}],
+    [{"cmd": "PrintJSON", "data": [{"text": "ä \"quoted\" \\ \x00\x1f"}], "status": HintStatus.HINT_FOUND}],
+    [{"cmd": "SetReply", "key": "big", "value": 2 ** 70, "original_value": None, "slot": 1, "flag": True}],
+    [{"cmd": "DataPackage", "data": {"games": {"Game": {"item_name_to_id": {"Item": 1}, "checksum": "abc"}}}}],
+]
+
+
+class TestWireCodec(unittest.TestCase):
+    def test_same_output(self) -> None:
+        """Ensure the orjson codec writes the same messages as the json one and reads them back the same way."""
+        try:
+            codec = ORJSONWireCodec()
+        except ImportError:
+            self.skipTest("orjson not installed")
+        reference = WireCodec()
+        for message in sample_messages:
+            with self.subTest(cmd=message[0]["cmd"]):
+                data = reference.encode(message)
+                self.assertEqual(codec.encode(message), data)
+                self.assertEqual(codec.decode(data), reference.decode(data))
+
+    def test_decode_classes(self) -> None:
+        """Ensure allowlisted classes and custom hooks get applied to nested objects, and other classes get ignored."""
+        codec = get_default_wire_codec()
+        data = codec.encode([{"cmd": "Connect", "version": {"major": 0, "minor": 6, "build": 1, "class": "Version"},
+                              "nested": [[NetworkItem(1, 2, 3)]], "unknown": {"class": "Unknown"}}])
+        message = codec.decode(data)[0]
+        self.assertEqual(message["version"], Version(0, 6, 1))
+        self.assertIsInstance(message["nested"][0][0], NetworkItem)
+        self.assertEqual(message["nested"][0][0], NetworkItem(1, 2, 3))
+        self.assertEqual(message["unknown"], {"class": "Unknown"})
@@ -126,8 +126,8 @@ class TestGenerateWeights(TestGenerateMain):
 
         # there's likely a better way to do this, but hardcode the results from seed 1 to ensure they're always this
         expected_results = {
-            "accessibility": [0, 2, 0, 2, 2],
-            "progression_balancing": [0, 50, 99, 0, 50],
+            "accessibility": [0, 0, 0, 2, 2],
+            "progression_balancing": [0, 99, 0, 99, 0],
         }
 
         self.assertEqual(seed, 1)
@@ -137,3 +137,26 @@ class TestGenerateWeights(TestGenerateMain):
                     result, getattr(namespace, option_name)[player].value,
                     "Generated results from weights file did not match expected value."
                 )
+
+    def test_yaml_processes(self):
+        """Ensure rolling in worker processes gives the same results as rolling in this process."""
+        from settings import get_settings
+        from Utils import user_path, local_path
+        settings = get_settings()
+        settings.generator.player_files_path = settings.generator.PlayerFilesPath(self.yaml_input_dir)
+        settings.generator.players = 5
+        settings._filename = None
+        user_path_backup = user_path.cached_path
+        user_path.cached_path = local_path()
+        namespaces = {}
+        try:
+            for processes in (0, 1, 3):
+                sys.argv = [sys.argv[0], "--seed", "1", "--yaml_processes", str(processes)]
+                namespaces[processes], _ = Generate.main()
+        finally:
+            user_path.cached_path = user_path_backup
+
+        for processes in (1, 3):
+            for option_name in ("accessibility", "progression_balancing"):
+                with self.subTest(processes=processes, option_name=option_name):
+                    self.assertEqual(getattr(namespaces[0], option_name), getattr(namespaces[processes], option_name))
@@ -1,5 +1,12 @@
+import os
+import tempfile
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+import zlib
+from unittest import mock
+
+from MultiServer import Client, Context, ServerCommandProcessor, send_items_to
+from NetUtils import Hint, HintStatus, NetworkItem
+from Utils import restricted_loads
 
 
 class TestResolvePlayerName(unittest.TestCase):
@@ -38,3 +45,242 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class TestDataPackageReply(unittest.TestCase):
+    def test_reply(self) -> None:
+        """Ensure replies put together from encoded data packages match encoding the whole reply."""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.gamespackage = {
+            "Game Ä": {"item_name_to_id": {"Item \"1\"": 1}, "location_name_to_id": {"Location": 2},
+                       "checksum": "test_multi_server_a"},
+            "No Checksum": {"item_name_to_id": {}, "location_name_to_id": {}},
+        }
+        for games in ([], ["Game Ä"], list(ctx.gamespackage)):
+            with self.subTest(games=games):
+                expected = ctx.dumper([{"cmd": "DataPackage",
+                                        "data": {"games": {game: ctx.gamespackage[game] for game in games}}}])
+                self.assertEqual(ctx.get_data_package_reply(games), expected)
+                self.assertEqual(ctx.get_data_package_reply(games), expected)
+
+
+class TestDataPackageFrame(unittest.IsolatedAsyncioTestCase):
+    async def test_compressed_reply(self) -> None:
+        """Ensure cached compressed replies and the messages compressed after them decode to what was sent."""
+        import websockets
+        from MultiServer import server_per_message_deflate_factory
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.gamespackage = {
+            "Game A": {"item_name_to_id": {f"Item {i}": i for i in range(1000)}, "location_name_to_id": {},
+                       "checksum": "test_multi_server_frame_a"},
+            "Game B": {"item_name_to_id": {}, "location_name_to_id": {"Location": 1},
+                       "checksum": "test_multi_server_frame_b"},
+        }
+        messages = [[{"cmd": "Print", "text": "Item 999"}], [{"cmd": "Print", "text": "Item 998"}]]
+
+        async def handler(socket) -> None:
+            client = Client(socket, ctx)
+            for _ in range(2):
+                self.assertTrue(await ctx.send_data_package(client, list(ctx.gamespackage)))
+                for message in messages:
+                    self.assertTrue(await ctx.send_msgs(client, message))
+
+        async with websockets.serve(handler, "localhost", 0, extensions=[server_per_message_deflate_factory]) as server:
+            port = server.sockets[0].getsockname()[1]
+            async with websockets.connect(f"ws://localhost:{port}") as socket:
+                for _ in range(2):
+                    self.assertEqual(await socket.recv(), ctx.get_data_package_reply(list(ctx.gamespackage)))
+                    for message in messages:
+                        self.assertEqual(ctx.loader(await socket.recv()), message)
+
+
+class TestBounceTargets(unittest.TestCase):
+    def test_targets(self) -> None:
+        """Ensure Bounce reaches the clients of the same team by game, slot and tag, following tag changes."""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.clients = {0: {1: [], 2: []}, 1: {1: []}}
+        ctx.game_slots = {"Game A": [1], "Game B": [2]}
+
+        def connect(team: int, slot: int, tags: list) -> Client:
+            client = Client(None, ctx)
+            client.team, client.slot = team, slot
+            ctx.clients[team][slot].append(client)
+            ctx.set_client_tags(client, tags)
+            return client
+
+        a = connect(0, 1, ["AP", "DeathLink"])
+        b = connect(0, 2, ["AP"])
+        other_team = connect(1, 1, ["DeathLink"])
+        self.assertEqual(ctx.get_bounce_targets(0, {"Game A"}, set(), set()), {a})
+        self.assertEqual(ctx.get_bounce_targets(0, set(), {2, 3}, set()), {b})
+        self.assertEqual(ctx.get_bounce_targets(0, {"Game A"}, set(), {"DeathLink"}), {a})
+        self.assertEqual(ctx.get_bounce_targets(1, set(), set(), {"DeathLink"}), {other_team})
+
+        ctx.set_client_tags(b, ["DeathLink"])
+        ctx.set_client_tags(a, ["AP"])
+        self.assertEqual(ctx.get_bounce_targets(0, set(), set(), {"DeathLink"}), {b})
+        ctx.clients[0][2].remove(b)
+        ctx.discard_client_tags(b)
+        self.assertEqual(ctx.get_bounce_targets(0, {"Game B"}, set(), {"DeathLink"}), set())
+        self.assertEqual(b.tags, ["DeathLink"])
+
+
+class TestSetReplyCoalescing(unittest.IsolatedAsyncioTestCase):
+    async def test_coalescing(self) -> None:
+        """Ensure coalescing clients get one merged SetReply per key and tick, in order, while others get each one."""
+        import asyncio
+        ctx = Context("", 0, "", "", 0, 0, False)
+        sent: list = []
+
+        async def broadcast_send_encoded_msgs(endpoints, msg: str) -> bool:
+            sent.extend((endpoint, ctx.loader(msg)) for endpoint in endpoints)
+            return True
+
+        ctx.broadcast_send_encoded_msgs = broadcast_send_encoded_msgs  # type: ignore
+        coalescing, immediate = Client(None, ctx), Client(None, ctx)
+        for key in ("a", "b"):
+            ctx.stored_data_notification_clients[key].update((coalescing, immediate))
+            ctx.stored_data_coalesced_clients[key].add(coalescing)
+
+        for key, original_value, value in (("a", 0, 1), ("b", 0, 5), ("a", 1, 2)):
+            ctx.send_set_reply({"cmd": "SetReply", "key": key, "value": value, "original_value": original_value})
+        ctx.send_set_reply({"cmd": "SetReply", "key": "a", "value": 3, "original_value": 2}, coalescing)
+        ctx.send_set_reply({"cmd": "SetReply", "key": "b", "value": 6, "original_value": 5})
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        self.assertEqual([(message["key"], message["original_value"], message["value"])
+                          for endpoint, messages in sent if endpoint is coalescing for message in messages],
+                         [("b", 0, 5), ("a", 0, 2), ("a", 2, 3), ("b", 5, 6)])
+        self.assertEqual([[(message["key"], message["value"]) for message in messages]
+                          for endpoint, messages in sent if endpoint is immediate],
+                         [[("a", 1)], [("b", 5)], [("a", 2)], [("a", 3)], [("b", 6)]])
+        self.assertGreater(ctx.stored_data_traffic["a"], ctx.stored_data_traffic["b"])
+
+
+class TestHintIndex(unittest.TestCase):
+    def test_mark_found(self) -> None:
+        """Ensure checking locations marks exactly their hints found, for every slot remembering them."""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.groups = {3: {2, 4}}
+        to_slot = Hint(2, 1, 10, 100, False)
+        to_group = Hint(3, 1, 11, 101, False)
+        unchecked = Hint(2, 1, 12, 102, False)
+        other_finder = Hint(1, 2, 10, 103, False)
+        for hint in (to_slot, to_group, unchecked, other_finder):
+            for slot in ctx.slot_set(hint.receiving_player) | {hint.finding_player}:
+                ctx.hints[0, slot].add(hint)
+            ctx.index_hints(0, (hint,))
+        prioritized = to_group.re_prioritize(ctx, HintStatus.HINT_PRIORITY)
+        for slot in (1, 2, 4):
+            ctx.replace_hint(0, slot, to_group, prioritized)
+
+        changed = set()
+        ctx.location_checks[0, 1] |= {10, 11}
+        ctx.mark_hints_found(0, 1, {10, 11}, changed)
+        found_to_slot = to_slot._replace(found=True, status=HintStatus.HINT_FOUND)
+        found_to_group = prioritized._replace(found=True, status=HintStatus.HINT_FOUND)
+        self.assertEqual(changed, {(0, 1), (0, 2), (0, 4)})
+        self.assertEqual(ctx.get_rechecked_hints(0, 1), {found_to_slot, found_to_group, unchecked, other_finder})
+        self.assertEqual(ctx.get_rechecked_hints(0, 2), {found_to_slot, found_to_group, unchecked, other_finder})
+        self.assertEqual(ctx.get_rechecked_hints(0, 4), {found_to_group})
+        self.assertEqual(set(ctx.hint_index), {(0, 1, 12), (0, 2, 10)})
+
+    def test_save(self) -> None:
+        """Ensure saving stores the hints as they are, without rechecking all of them."""
+        ctx = Context("", 0, "", "", 0, 0, False)
+        hint = Hint(2, 1, 10, 100, False)
+        ctx.hints[0, 1].add(hint)
+        ctx.index_hints(0, (hint,))
+        with mock.patch.object(Hint, "re_check", side_effect=AssertionError("hint was rechecked")):
+            self.assertEqual(ctx.get_save()["hints"], {(0, 1): {hint}})
+
+
+class TestSaveJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.save_filename = os.path.join(directory.name, "test.apsave")
+        self.ctx = self.load()
+
+    def load(self) -> Context:
+        ctx = Context("", 0, "", "", 0, 0, False)
+        ctx.save_filename = self.save_filename
+        with mock.patch.object(Context, "_start_async_saving"):
+            ctx.init_save()
+        return ctx
+
+    def change(self, value: int) -> None:
+        send_items_to(self.ctx, 0, 1, NetworkItem(value, value, 2, 0))
+        self.ctx.location_checks[0, 2].add(value)
+        self.ctx.unsaved_slots.add((0, 2))
+        self.ctx.hints[0, 1].add(Hint(1, 2, value + 100, value, False))
+        self.ctx.unsaved_slots.add((0, 1))
+        self.ctx.stored_data["key"] = value
+        self.ctx.stored_data_changes.add("key")
+        self.ctx.random.random()
+
+    def save(self) -> None:
+        self.assertTrue(self.ctx._save())
+        # these snapshots are tiny, don't let them get replaced by a new one as soon as the journal outgrows them
+        self.ctx.snapshot_size = 1 << 20
+
+    def assert_loaded(self, ctx: Context, value: int) -> None:
+        self.assertEqual(ctx.received_items[0, 1, True], [NetworkItem(item, item, 2, 0) for item in range(1, value + 1)])
+        self.assertEqual(ctx.location_checks[0, 2], set(range(1, value + 1)))
+        self.assertEqual(ctx.hints[0, 1], {Hint(1, 2, item + 100, item, False) for item in range(1, value + 1)})
+        self.assertEqual(ctx.stored_data["key"], value)
+        self.assertEqual(ctx.random.getstate(), self.ctx.random.getstate())
+
+    def journal_records(self) -> int:
+        with mock.patch("MultiServer.apply_save_delta") as apply_save_delta, open(self.save_filename, "rb") as f:
+            self.ctx._load_journal(restricted_loads(zlib.decompress(f.read())))
+        return apply_save_delta.call_count
+
+    def test_round_trip(self) -> None:
+        """Ensure a snapshot with journal records loads into the same state, with records only holding changes."""
+        for value in range(1, 5):
+            self.change(value)
+            self.save()
+        self.assertEqual(self.journal_records(), 3)
+        delta = self.ctx.get_save_delta()
+        self.assertEqual((delta["received_items"], delta["location_checks"], delta["hints"], delta["stored_data"]),
+                         ({}, {}, {}, {}))
+        self.assertNotIn("random_state", delta)
+        self.assert_loaded(self.load(), 4)
+
+    def test_generation_mismatch(self) -> None:
+        """Ensure a journal left over from before the current snapshot is not replayed on top of it."""
+        self.change(1)
+        self.save()
+        self.change(2)
+        self.save()
+        with open(self.ctx.journal_filename, "rb") as f:
+            old_journal = f.read()
+        self.change(3)
+        self.ctx.journal_size = None
+        self.save()
+        with open(self.ctx.journal_filename, "wb") as f:
+            f.write(old_journal)
+        self.assertEqual(self.journal_records(), 0)
+        self.assert_loaded(self.load(), 3)
+
+    def test_damaged_journal(self) -> None:
+        """Ensure an incomplete or corrupt last record is skipped, while the records before it are replayed."""
+        for value in range(1, 4):
+            self.change(value)
+            self.save()
+        with open(self.ctx.journal_filename, "rb") as f:
+            journal = f.read()
+        random_state = self.ctx.random.getstate()
+        self.change(4)
+        self.save()
+        with open(self.ctx.journal_filename, "rb") as f:
+            last_record = f.read()[len(journal):]
+
+        self.ctx.random.setstate(random_state)
+        for damaged_record in (last_record[:-5], last_record[:4] + bytes(len(last_record) - 4)):
+            with self.subTest(damaged_record=damaged_record[:8]):
+                with open(self.ctx.journal_filename, "wb") as f:
+                    f.write(journal + damaged_record)
+                self.assert_loaded(self.load(), 3)
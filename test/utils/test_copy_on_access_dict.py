@@ -0,0 +1,51 @@
+import unittest
+from collections import Counter
+
+from Utils import CopyOnAccessDict
+
+
+class TestCopyOnAccessDict(unittest.TestCase):
+    def test_copies_are_independent(self) -> None:
+        original = CopyOnAccessDict({1: Counter({"Item": 1}), 2: Counter()})
+        copy = original.copy()
+        copy[1]["Item"] += 1
+        original[2]["Other"] += 1
+        self.assertEqual(original[1]["Item"], 1)
+        self.assertEqual(copy[1]["Item"], 2)
+        self.assertEqual(copy[2]["Other"], 0)
+
+        second_copy = copy.copy()
+        second_copy[1]["Item"] += 1
+        self.assertEqual(copy[1]["Item"], 2)
+        self.assertEqual(second_copy[1]["Item"], 3)
+
+    def test_mapping_interface(self) -> None:
+        original = CopyOnAccessDict({1: {"a"}, 2: {"b"}})
+        copy = original.copy()
+        self.assertIn(1, copy)
+        self.assertNotIn(3, copy)
+        self.assertEqual(len(copy), 2)
+        self.assertEqual(dict(copy.items()), {1: {"a"}, 2: {"b"}})
+        self.assertIsNot(copy[1], original[1])
+        self.assertEqual(copy.get(3, set()), set())
+        with self.assertRaises(KeyError):
+            copy[3]
+
+    def test_copied_once(self) -> None:
+        """Ensure a shared value is only copied by the first dict accessing it, the last one takes it over."""
+        value = Counter({"Item": 1})
+        original = CopyOnAccessDict({1: value})
+        copy = original.copy()
+        copy[1]["Item"] += 1
+        self.assertIsNot(copy[1], value)
+        self.assertIs(original[1], value)
+        self.assertEqual(original[1]["Item"], 1)
+
+    def test_equality(self) -> None:
+        original = CopyOnAccessDict({1: {"a"}})
+        copy = original.copy()
+        self.assertEqual(original, copy)
+        self.assertFalse(original != copy)
+        copy[1].add("b")
+        self.assertNotEqual(original, copy)
+        self.assertTrue(original != copy)
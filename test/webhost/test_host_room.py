@@ -176,6 +176,102 @@ class TestHostFakeRoom(TestBase):
             commands = select(command for command in Command if command.room.id == self.room_id)  # type: ignore
             self.assertIn("/help", (command.commandtext for command in commands))
 
+    def test_command_poller(self) -> None:
+        """Verify the poller hands the queued commands of its rooms to their loop and removes them."""
+        import threading
+        from types import SimpleNamespace
+        from pony.orm import db_session, select
+        from WebHostLib.customserver import DBCommandPoller
+        from WebHostLib.models import Command, Room
+
+        dispatched = []
+        ctx = SimpleNamespace(room_id=self.room_id, exit_event=threading.Event(), main_loop=SimpleNamespace(
+            call_soon_threadsafe=lambda processor, text: dispatched.append(text)))
+        poller = DBCommandPoller()
+        self.assertEqual(poller.poll(), 0)
+        poller.add_room(ctx)  # type: ignore
+        with db_session:
+            Command(room=Room.get(id=self.room_id), commandtext="/help")
+            Command(room=Room.get(id=self.room_id), commandtext="/players")
+        self.assertEqual(poller.poll(), 2)
+        self.assertEqual(sorted(dispatched), ["/help", "/players"])
+        with db_session:
+            self.assertFalse(select(command for command in Command if command.room.id == self.room_id)[:])
+            Command(room=Room.get(id=self.room_id), commandtext="/exit")
+        poller.remove_room(ctx)  # type: ignore
+        self.assertEqual(poller.poll(), 0)
+        self.assertEqual(len(dispatched), 2)
+
+    def test_room_index(self) -> None:
+        """Verify autohost's room index picks up activity incrementally and forgets rooms that went inactive."""
+        import datetime
+        from pony.orm import db_session
+        from WebHostLib.autolauncher import RoomIndex
+        from WebHostLib.models import Room
+
+        rooms = RoomIndex()
+        with db_session:
+            rooms.refresh()
+        now = datetime.datetime.utcnow()
+        self.assertIn(self.room_id, rooms.active(now))
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            room.last_activity = now - datetime.timedelta(minutes=1, seconds=room.timeout)
+        with db_session:
+            rooms.refresh()  # moving last_activity back is not seen as new activity
+        self.assertIn(self.room_id, rooms.active(now))
+        with db_session:
+            rooms.refresh_rooms([self.room_id])
+        self.assertNotIn(self.room_id, rooms.active(now))
+
+        with db_session:
+            Room.get(id=self.room_id).last_activity = now
+        with db_session:
+            rooms.refresh()
+        self.assertIn(self.room_id, rooms.active(now))
+
+    def test_save_journal(self) -> None:
+        """Verify saves add journal records until the journal outgrows the multisave, and load into the same state."""
+        import asyncio
+        import logging
+        import tempfile
+        from unittest import mock
+        from pony.orm import db_session
+        from MultiServer import send_items_to
+        from NetUtils import NetworkItem
+        from WebHostLib.customserver import WebHostContext
+        from WebHostLib.models import Room, load_multisave
+        from WebHostLib.static_data import StaticServerData
+
+        async def create_context() -> WebHostContext:
+            ctx = WebHostContext(static_server_data, logging.getLogger("test"))
+            ctx.room_id = self.room_id
+            with mock.patch.object(WebHostContext, "_start_async_saving"):
+                ctx.init_save()
+            return ctx
+
+        with tempfile.TemporaryDirectory() as directory:
+            static_server_data = StaticServerData.write(os.path.join(directory, "static_server_data"), {})
+            ctx = asyncio.run(create_context())
+            for value in range(1, 4):
+                send_items_to(ctx, 0, 1, NetworkItem(value, value, 2, 0))
+                ctx.video[0, 1] = "platform", f"user{value}"
+                self.assertTrue(ctx._save())
+            with db_session:
+                room = Room.get(id=self.room_id)
+                self.assertEqual(room.save_journal.count(), 2)
+                self.assertEqual(load_multisave(room)["video"], [((0, 1), ("platform", "user3"))])
+            loaded = asyncio.run(create_context())
+            self.assertEqual(loaded.received_items[0, 1, True], ctx.received_items[0, 1, True])
+            self.assertEqual(len(loaded.received_items[0, 1, True]), 3)
+
+            ctx.snapshot_size = 0
+            self.assertTrue(ctx._save())
+            with db_session:
+                self.assertEqual(Room.get(id=self.room_id).save_journal.count(), 0)
+            del static_server_data, ctx, loaded
+
     def test_host_room_other_post(self) -> None:
         """Verify command from non-owner does not get queued for the server."""
         from pony.orm import db_session, select
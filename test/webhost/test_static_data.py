@@ -0,0 +1,71 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+
+class TestStaticServerData(unittest.TestCase):
+    def setUp(self) -> None:
+        from WebHostLib.static_data import StaticServerData
+
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.data = StaticServerData.write(self.path, {
+            "item_name_groups": {"Game": {"Group": {"Item"}}, "Other Game": {}},
+            "non_hintable_names": {"Game": frozenset({"Item"})},
+            "names": {"Game": ({1: "Item"}, {2: "Location"}, frozenset({"Item", "Group"}), frozenset({"Location"}))},
+        })
+
+    def tearDown(self) -> None:
+        del self.data
+        os.remove(self.path)
+
+    def test_sections(self) -> None:
+        """Ensure sections are mapped lazily, by game, and survive being sent to another process."""
+        data = pickle.loads(pickle.dumps(self.data))
+        self.assertEqual(data.path, self.path)
+        groups = data.get_section("item_name_groups")
+        self.assertEqual(len(groups), 2)
+        self.assertIn("Game", groups)
+        self.assertNotIn("Missing Game", groups)
+        self.assertEqual(groups["Game"], {"Group": {"Item"}})
+        self.assertIs(groups["Game"], groups["Game"])
+        self.assertEqual(groups.get("Missing Game", {}), {})
+        with self.assertRaises(KeyError):
+            _ = groups["Missing Game"]
+
+        non_hintable_names = data.get_section("non_hintable_names", frozenset)
+        self.assertEqual(non_hintable_names["Game"], {"Item"})
+        self.assertEqual(non_hintable_names["Missing Game"], frozenset())
+
+    def test_names(self) -> None:
+        """Ensure the shared lookup tables name unknown ids like the ones built per room."""
+        names = self.data.get_names("Game")
+        self.assertIs(self.data.get_names("Game"), names)
+        self.assertEqual(names.item_names[1], "Item")
+        self.assertEqual(names.item_names[3], "Unknown item (ID:3)")
+        self.assertEqual(names.location_names[3], "Unknown location (ID:3)")
+        self.assertEqual(names.all_item_and_group_names, {"Item", "Group"})
+        self.assertNotIn(3, names.item_names)
+        self.assertEqual(len(names.item_names), 1)
+        with self.assertRaises(TypeError):
+            names.item_names[3] = "Item"  # type: ignore[index]
+
+    def test_remove_stale_files(self) -> None:
+        """Ensure files of previous runs are removed when the data is written again, but not the ones still in use."""
+        import subprocess
+        import sys
+        from WebHostLib.static_data import remove_stale_files
+
+        exited = subprocess.Popen([sys.executable, "-c", ""])
+        exited.wait()
+        with tempfile.TemporaryDirectory() as directory:
+            stale_path = os.path.join(directory, f"{exited.pid}.bin")
+            live_path = os.path.join(directory, f"{os.getpid()}.bin")
+            for path in (stale_path, live_path):
+                with open(path, "wb"):
+                    pass
+            remove_stale_files(directory)
+            self.assertFalse(os.path.exists(stale_path))
+            if os.name != "nt":
+                self.assertTrue(os.path.exists(live_path))
@@ -103,3 +103,21 @@ class TestTracker(TestBase):
                 self.assertEqual(response.status_code, 200)
             with self.client.open(url_for("api.tracker_slot_data", tracker=self.tracker_uuid)) as response:
                 self.assertEqual(response.status_code, 200)
+
+    def test_shared_static_data(self) -> None:
+        """Verify that trackers of the same room share the parsed seed and game data between requests."""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData, get_tracker_cache_stats
+
+        with self.app.app_context(), db_session:
+            room = Room.get(id=self.room_id)
+            first = TrackerData(room)
+            stats = get_tracker_cache_stats()
+            second = TrackerData(room)
+            self.assertIs(first._multidata, second._multidata)
+            for game, item_id_to_name in first.item_id_to_name.items():
+                self.assertIs(second.item_id_to_name[game], item_id_to_name)
+            self.assertEqual(get_tracker_cache_stats()["seeds"]["hits"], stats["seeds"]["hits"] + 1)
+            self.assertEqual(get_tracker_cache_stats()["games"]["hits"],
+                             stats["games"]["hits"] + len(first.item_id_to_name))
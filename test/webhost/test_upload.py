@@ -0,0 +1,49 @@
+import io
+import zlib
+from pathlib import Path
+from uuid import uuid4
+
+from flask import url_for
+
+from . import TestBase
+
+
+class TestUpload(TestBase):
+    def upload(self, data: bytes) -> bytes:
+        """Uploads data as a .archipelago file and returns the multidata stored for the seed."""
+        from pony.orm import db_session
+        from WebHostLib import to_python
+        from WebHostLib.models import Seed
+
+        with self.client.session_transaction() as session:
+            session["_id"] = uuid4()
+        with self.app.app_context(), self.app.test_request_context():
+            response = self.client.post(url_for("uploads"),
+                                        data={"file": (io.BytesIO(data), "test.archipelago")})
+        self.assertEqual(response.status_code, 302)
+        seed_id = response.location.rsplit("/", 1)[-1]
+        with db_session:
+            seed = Seed.get(id=to_python(seed_id))
+            multidata = seed.multidata
+            seed.slots.clear()
+            seed.delete()
+        return multidata
+
+    def test_format_kept(self) -> None:
+        """Ensure uploaded multidata is stored in the format it was uploaded in."""
+        from MultiServer import Context as MultiServerContext
+        from NetUtils import encode_multidata, multidata_sections_format_version
+        from Utils import restricted_loads
+
+        with (Path(__file__).parent / "data" / "One_Archipelago.archipelago").open("rb") as f:
+            data = f.read()
+        slots = MultiServerContext.decompress(data)["slot_info"].keys()
+
+        stored_data = self.upload(data)
+        self.assertEqual(stored_data[0], data[0])
+        # readable by servers that don't know the sectioned format
+        self.assertEqual(restricted_loads(zlib.decompress(stored_data[1:]))["slot_info"].keys(), slots)
+
+        stored_data = self.upload(encode_multidata(MultiServerContext.decompress(data)))
+        self.assertEqual(stored_data[0], multidata_sections_format_version)
+        self.assertEqual(MultiServerContext.decompress(stored_data)["slot_info"].keys(), slots)
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
+import concurrent.futures
 import hashlib
 import logging
 import pathlib
 import sys
+import threading
 import time
 from random import Random
 from dataclasses import make_dataclass
-from typing import (Any, Callable, ClassVar, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, TextIO, Tuple,
-                    TYPE_CHECKING, Type, Union)
+from typing import (Any, Callable, ClassVar, Dict, FrozenSet, ItemsView, Iterable, Iterator, List, Mapping, Optional,
+                    Set, TextIO, Tuple, TYPE_CHECKING, Type, Union, ValuesView)
 
 from Options import item_and_loc_options, ItemsAccessibility, OptionGroup, PerGameCommonOptions
 from BaseClasses import CollectionState
@@ -26,8 +28,98 @@ class InvalidItemError(KeyError):
     pass
 
 
+class WorldTypes(Dict[str, Type["World"]]):
+    """
+    Maps game names to their World class. Games can be added before their world is imported, in which case the world
+    is only imported when its class is first looked up. Checking for or listing game names does not import anything,
+    iterating over the classes imports all pending worlds.
+    """
+    _pending: Dict[str, Tuple[Callable[[], Any], Version]]
+    _loading: Set[Callable[[], Any]]
+    _lock: threading.RLock
+    on_import: Optional[Callable[[str, Type[World]], None]]
+    """called with each pending game and its world once the world got imported"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._pending = {}
+        self._loading = set()
+        self._lock = threading.RLock()
+        self.on_import = None
+
+    def add_pending(self, games: Mapping[str, Version], load: Callable[[], Any]) -> None:
+        """Add games whose world gets imported by calling load, with the world_version to apply to its class."""
+        for game, version in games.items():
+            super().__setitem__(game, None)  # type: ignore[assignment]
+            self._pending[game] = (load, version)
+
+    def load_all(self) -> None:
+        """Import all pending worlds."""
+        while self._pending:
+            self._load(next(iter(self._pending)))
+
+    def _load(self, game: str) -> None:
+        with self._lock:
+            if game not in self._pending:
+                return  # imported by another thread in the meantime
+            load = self._pending[game][0]
+            if load in self._loading:
+                return  # a pending import of this game is still running further up in this thread
+            pending_games = [pending_game for pending_game, (pending_load, _) in self._pending.items()
+                             if pending_load is load]
+            self._loading.add(load)
+            try:
+                load()
+            finally:
+                self._loading.discard(load)
+                for pending_game in pending_games:
+                    if self._pending.pop(pending_game, None):
+                        # world failed to import or no longer registers this game
+                        super().__delitem__(pending_game)
+
+    def __setitem__(self, game: str, world: Type[World]) -> None:
+        # also reached when a pending world gets imported directly instead of through a lookup
+        pending = self._pending.pop(game, None)
+        if pending:
+            world.world_version = pending[1]
+        super().__setitem__(game, world)
+        if pending and self.on_import:
+            self.on_import(game, world)
+
+    def __getitem__(self, game: str) -> Type[World]:
+        world = super().__getitem__(game)
+        if world is None:
+            self._load(game)
+            world = super().__getitem__(game)
+            if world is None:
+                # a pending import of this game is still running further up in this thread
+                raise KeyError(game)
+        return world
+
+    def __iter__(self) -> Iterator[str]:
+        # also prevents dict(world_types) from copying pending entries without importing them
+        return iter(self.keys())
+
+    def get(self, game: str, default: Any = None) -> Any:
+        try:
+            return self[game]
+        except KeyError:
+            return default
+
+    def values(self) -> ValuesView[Type[World]]:  # type: ignore[override]
+        self.load_all()
+        return super().values()
+
+    def items(self) -> ItemsView[str, Type[World]]:  # type: ignore[override]
+        self.load_all()
+        return super().items()
+
+    def copy(self) -> Dict[str, Type[World]]:
+        return dict(self.items())
+
+
 class AutoWorldRegister(type):
-    world_types: Dict[str, Type[World]] = {}
+    world_types: Dict[str, Type[World]] = WorldTypes()
     __file__: str
     zip_path: Optional[str]
     settings_key: str
@@ -88,9 +180,11 @@ class AutoWorldRegister(type):
         new_class = super().__new__(mcs, name, bases, dct)
         new_class.__file__ = sys.modules[new_class.__module__].__file__
         if "game" in dct:
-            if dct["game"] in AutoWorldRegister.world_types:
+            # look past pending games, which are only placeholders until their world gets imported
+            registered = dict.get(AutoWorldRegister.world_types, dct["game"])
+            if registered:
                 raise RuntimeError(f"""Game {dct["game"]} already registered in 
-                {AutoWorldRegister.world_types[dct["game"]].__file__} when attempting to register from
+                {registered.__file__} when attempting to register from
                 {new_class.__file__}.""")
             AutoWorldRegister.world_types[dct["game"]] = new_class
         if ".apworld" in new_class.__file__:
@@ -162,11 +256,20 @@ class WebWorldRegister(type):
         return super().__new__(mcs, name, bases, dct)
 
 
+parallel_stages: FrozenSet[str] = frozenset({"generate_early", "create_regions", "create_items", "set_rules"})
+"""Stages that may run in multiple threads for worlds with parallel_stages, see generator.world_stage_threads."""
+
+
 def _timed_call(method: Callable[..., Any], *args: Any,
                 multiworld: Optional["MultiWorld"] = None, player: Optional[int] = None) -> Any:
     start = time.perf_counter()
     ret = method(*args)
     taken = time.perf_counter() - start
+    if multiworld:
+        stage = method.__name__.removeprefix("stage_")
+        key = player if player else getattr(getattr(method, "__self__", None), "game", method.__qualname__)
+        stage_times = multiworld.stage_times.setdefault(stage, {})
+        stage_times[key] = stage_times.get(key, 0.0) + taken
     if taken > 1.0:
         if player and multiworld:
             perf_logger.info(f"Took {taken:.4f} seconds in {method.__qualname__} for player {player}, "
@@ -191,29 +294,95 @@ def call_single(multiworld: "MultiWorld", method_name: str, player: int, *args:
         return ret
 
 
+def _check_new_items(multiworld: "MultiWorld", player: int, new_items: List["Item"]) -> None:
+    for i, item in enumerate(new_items):
+        for other in new_items[i+1:]:
+            assert item is not other, (
+                f"Duplicate item reference of \"{item.name}\" in \"{multiworld.worlds[player].game}\" "
+                f"of player \"{multiworld.player_name[player]}\". Please make a copy instead.")
+
+
+def _get_parallel_players(multiworld: "MultiWorld", method_name: str) -> List[int]:
+    if method_name not in parallel_stages:
+        return []
+    from settings import get_settings
+    if get_settings().generator.world_stage_threads <= 0:
+        return []
+    players = [player for player in multiworld.player_ids if multiworld.worlds[player].parallel_stages]
+    return players if len(players) > 1 else []
+
+
+def _call_parallel(multiworld: "MultiWorld", method_name: str, players: List[int], *args: Any) -> None:
+    from settings import get_settings
+    threads = min(get_settings().generator.world_stage_threads, len(players))
+    start = time.perf_counter()
+    prev_items = set(map(id, multiworld.itempool)) if __debug__ else set()
+    with concurrent.futures.ThreadPoolExecutor(threads, thread_name_prefix=method_name) as pool:
+        futures = [pool.submit(call_single, multiworld, method_name, player, *args) for player in players]
+        for future in futures:
+            future.result()
+    if __debug__:
+        new_items = [item for item in multiworld.itempool if id(item) not in prev_items]
+        for player in players:
+            _check_new_items(multiworld, player, [item for item in new_items if item.player == player])
+    taken = time.perf_counter() - start
+    world_time = sum(multiworld.stage_times[method_name][player] for player in players)
+    perf_logger.info(f"Took {taken:.4f} seconds in {method_name} for {len(players)} worlds in {threads} threads, "
+                     f"{world_time:.4f} seconds summed over worlds.")
+
+
 def call_all(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
     world_types: Set[AutoWorldRegister] = set()
+    parallel_players = _get_parallel_players(multiworld, method_name)
+    stage_items = list(multiworld.itempool) if parallel_players else []
+    if parallel_players:
+        _call_parallel(multiworld, method_name, parallel_players, *args)
     for player in multiworld.player_ids:
-        prev_item_count = len(multiworld.itempool)
         world_types.add(multiworld.worlds[player].__class__)
+        if player in parallel_players:
+            continue
+        prev_item_count = len(multiworld.itempool)
         call_single(multiworld, method_name, player, *args)
         if __debug__:
-            new_items = multiworld.itempool[prev_item_count:]
-            for i, item in enumerate(new_items):
-                for other in new_items[i+1:]:
-                    assert item is not other, (
-                        f"Duplicate item reference of \"{item.name}\" in \"{multiworld.worlds[player].game}\" "
-                        f"of player \"{multiworld.player_name[player]}\". Please make a copy instead.")
+            _check_new_items(multiworld, player, multiworld.itempool[prev_item_count:])
+    if parallel_players:
+        _restore_serial_item_order(multiworld, stage_items)
 
     call_stage(multiworld, method_name, *args)
 
 
+def _restore_serial_item_order(multiworld: "MultiWorld", stage_items: List["Item"]) -> None:
+    """Puts the item pool in the order a serial run of all players would have left it in: the items that were in the
+    pool before the stage and weren't removed keep their place, followed by the items added in the stage by player.
+    Threads add and remove items as they go, but as each world only touches its own items, each player's items are in
+    the same order as in a serial run."""
+    item_pool = multiworld.itempool
+    remaining = set(map(id, item_pool))
+    ordered_items = [item for item in stage_items if id(item) in remaining]
+    previous = set(map(id, stage_items))
+    new_items: Dict[int, List["Item"]] = {}
+    for item in item_pool:
+        if id(item) not in previous:
+            new_items.setdefault(item.player, []).append(item)
+    item_pool[:] = ordered_items + [item for player in sorted(new_items) for item in new_items[player]]
+
+
 def call_stage(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
     world_types = {multiworld.worlds[player].__class__ for player in multiworld.player_ids}
     for world_type in sorted(world_types, key=lambda world: world.__name__):
         stage_callable = getattr(world_type, f"stage_{method_name}", None)
         if stage_callable:
-            _timed_call(stage_callable, multiworld, *args)
+            _timed_call(stage_callable, multiworld, *args, multiworld=multiworld)
+
+
+def log_stage_times(multiworld: "MultiWorld", worlds_per_stage: int = 3) -> None:
+    """Logs the time spent in each stage so far, along with the slowest worlds of that stage."""
+    for stage, stage_times in multiworld.stage_times.items():
+        slowest = sorted(stage_times.items(), key=lambda entry: entry[1], reverse=True)[:worlds_per_stage]
+        perf_logger.info(f"{stage}: {sum(stage_times.values()):.4f} seconds in {len(stage_times)} worlds, "
+                         f"slowest: " + ", ".join(
+                             f"{multiworld.player_name[key] if isinstance(key, int) else key} {taken:.4f}"
+                             for key, taken in slowest))
 
 
 class WebWorld(metaclass=WebWorldRegister):
@@ -318,6 +487,30 @@ class World(metaclass=AutoWorldRegister):
     If False, everything is rechecked at every step, which is slower computationally, 
     but may be desirable in complex/dynamic worlds."""
 
+    thread_only_output: ClassVar[bool] = False
+    """If True, generate_output always runs in a thread of the generating process, even if output processes are
+    enabled in host.yaml. Required if generate_output changes anything that later stages or the spoiler use, other
+    than what output_attributes and output_events describe.
+    Output processes are forked after stage_generate_output ran, so waiting for data it sets is fine."""
+
+    output_attributes: ClassVar[Tuple[str, ...]] = ()
+    """Names of picklable attributes generate_output sets on the world, which are sent back to the generating
+    process if it runs in an output process, such as the rom_name that modify_multidata reads."""
+
+    output_events: ClassVar[Tuple[str, ...]] = ()
+    """Names of threading.Event attributes generate_output sets. If it runs in an output process, the generating
+    process sets them once output_attributes were sent back, or it failed."""
+
+    parallel_stages: ClassVar[bool] = False
+    """If True, generate_early, create_regions, create_items and set_rules may run in a thread alongside other worlds
+    when generator.world_stage_threads is set in host.yaml. These stages then may only use self.random, only create
+    regions, locations and items for their own player, only add and remove their own items in the item pool and must
+    not read other worlds' data."""
+
+    static_item_rules: ClassVar[bool] = False
+    """If True, the item rules of this world's locations only depend on the type, player, name and classification of
+    an item, and not on anything that changes during generation, so fill may reuse their result for similar items."""
+
     multiworld: "MultiWorld"
     """autoset on creation. The MultiWorld object for the currently generating multiworld."""
     player: int
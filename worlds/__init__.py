@@ -6,12 +6,16 @@ import sys
 import warnings
 import zipimport
 import time
+import types
 import dataclasses
 import json
-from typing import List
+from typing import Any, Dict, List, Optional, Set, Tuple, Type, TypedDict, TYPE_CHECKING
 
-from NetUtils import DataPackage
-from Utils import local_path, user_path, Version, version_tuple, tuplize_version
+from NetUtils import DataPackage, GamesPackage
+from Utils import __version__, cache_path, local_path, user_path, Version, version_tuple, tuplize_version
+
+if TYPE_CHECKING:
+    from .AutoWorld import World
 
 local_folder = os.path.dirname(__file__)
 user_folder = user_path("worlds") if user_path() != local_path() else user_path("custom_worlds")
@@ -27,6 +31,8 @@ __all__ = {
     "local_folder",
     "user_folder",
     "failed_world_loads",
+    "world_info",
+    "load_all_worlds",
 }
 
 
@@ -50,6 +56,10 @@ class WorldSource:
             return os.path.join(local_folder, self.path)
         return self.path
 
+    @property
+    def module_name(self) -> str:
+        return f"worlds.{os.path.basename(self.path).rsplit('.', 1)[0] if self.is_zip else os.path.basename(self.path)}"
+
     def load(self) -> bool:
         try:
             start = time.perf_counter()
@@ -102,34 +112,167 @@ for folder in (folder for folder in (user_folder, local_folder) if folder):
             elif entry.is_file() and entry.name.endswith(".apworld"):
                 world_sources.append(WorldSource(file_name, is_zip=True, relative=relative))
 
-# import all submodules to trigger AutoWorldRegister
+
+class WorldInfo(TypedDict):
+    """What is known about a registered world without importing it, as cached in the world index."""
+    world_version: str
+    hidden: bool
+    settings_key: str
+    settings: Optional[str]  # module.Class of a world that defines a settings group
+    hint_blacklist: List[str]
+    data_package: GamesPackage
+
+
+def get_world_info(world: Type["World"]) -> WorldInfo:
+    annotation = world.__annotations__.get("settings", None)
+    has_settings = annotation is not None and annotation != "ClassVar[Optional['Group']]"
+    return {
+        "world_version": world.world_version.as_simple_string(),
+        "hidden": world.hidden,
+        "settings_key": world.settings_key,
+        "settings": f"{world.__module__}.{world.__name__}" if has_settings else None,
+        "hint_blacklist": sorted(world.hint_blacklist),
+        "data_package": world.get_data_package_data(),
+    }
+
+
+def get_source_stamp(world_source: WorldSource) -> List[int]:
+    """Number, total size and latest modification of the files of a world, to detect changes to it."""
+    if world_source.is_zip:
+        stat = os.stat(world_source.resolved_path)
+        return [1, stat.st_size, stat.st_mtime_ns]
+    files = size = modified = 0
+    for dirpath, dirnames, filenames in os.walk(world_source.resolved_path):
+        dirnames[:] = [dirname for dirname in dirnames if dirname != "__pycache__"]
+        for file in filenames:
+            stat = os.stat(os.path.join(dirpath, file))
+            files += 1
+            size += stat.st_size
+            modified = max(modified, stat.st_mtime_ns)
+    return [files, size, modified]
+
+
+def get_core_stamp() -> List[int]:
+    """Like get_source_stamp, for the core modules all worlds build on, the ones in this folder and the one above."""
+    files = size = modified = 0
+    for folder in (local_folder, os.path.dirname(local_folder)):
+        for entry in os.scandir(folder):
+            if entry.is_file() and entry.name.endswith(".py"):
+                stat = entry.stat()
+                files += 1
+                size += stat.st_size
+                modified = max(modified, stat.st_mtime_ns)
+    return [files, size, modified]
+
+
+def get_used_worlds(world_source: WorldSource) -> Set[str]:
+    """Module names of the other worlds the imported modules of world_source hold modules or objects of."""
+    package = world_source.module_name
+    used_worlds: Set[str] = set()
+    for name, module in list(sys.modules.items()):
+        if module is None or (name != package and not name.startswith(f"{package}.")):
+            continue
+        for value in list(vars(module).values()):
+            used = value.__name__ if isinstance(value, types.ModuleType) else getattr(value, "__module__", None)
+            if isinstance(used, str) and used.startswith("worlds."):
+                used_worlds.add(".".join(used.split(".", 2)[:2]))
+    used_worlds.discard(package)
+    return used_worlds
+
+
+# The world index caches the WorldInfo of each world folder, so unchanged worlds only get imported once they are used.
+world_index_path = cache_path("world_index.json")
+
+
+def read_world_index(core_stamp: List[int]) -> Dict[str, Any]:
+    try:
+        with open(world_index_path, encoding="utf-8") as index_file:
+            index = json.load(index_file)
+        if index["version"] == __version__ and index["core"] == core_stamp:
+            return index["sources"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return {}
+
+
+def write_world_index(core_stamp: List[int], sources: Dict[str, Any]) -> None:
+    temp_path = f"{world_index_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(world_index_path), exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as index_file:
+            json.dump({"version": __version__, "core": core_stamp, "sources": sources}, index_file)
+        os.replace(temp_path, world_index_path)
+    except OSError as e:
+        logging.debug(f"Could not write world index: {e}")
+
+
+from .AutoWorld import AutoWorldRegister
+
+# lets load_all_worlds reach pending worlds even if world_types gets replaced by a filtered dict, like WebHost does
+_world_types = AutoWorldRegister.world_types
+
+# game -> WorldInfo of every world found at startup, whether it got imported or not
+world_info: Dict[str, WorldInfo] = {}
+
+# the data package of each game, filled in once all worlds are found
+network_data_package: DataPackage = {"games": {}}
+
+
+def update_imported_world_info(game: str, world: Type["World"]) -> None:
+    """
+    Replaces the data package from the world index with the one of the imported world. Some worlds order their names
+    differently per run, which changes the checksum, so only the imported world's checksum matches its data package.
+    """
+    if game in world_info:
+        world_info[game]["data_package"] = world.get_data_package_data()
+    if game in network_data_package["games"]:
+        network_data_package["games"][game] = dict(world_info[game]["data_package"])
+
+
+_world_types.on_import = update_imported_world_info
+
+# import all submodules to trigger AutoWorldRegister, unless they and the worlds they use are unchanged since they
+# were indexed
 world_sources.sort()
 apworlds: list[WorldSource] = []
+core_stamp = get_core_stamp()
+cached_sources = read_world_index(core_stamp)
+source_stamps = {world_source.resolved_path: get_source_stamp(world_source) for world_source in world_sources}
+indexed_sources: Dict[str, Any] = {}
+imported_sources: List[Tuple[WorldSource, List[int]]] = []
 for world_source in world_sources:
     # load all loose files first:
     if world_source.is_zip:
         apworlds.append(world_source)
-    else:
-        world_source.load()
+        continue
+    stamp = source_stamps[world_source.resolved_path]
+    cached_source = cached_sources.get(world_source.resolved_path)
+    # worlds without a game are only imported for their side effects, and worlds registering an already known game
+    # have to fail the way they always did
+    if cached_source and cached_source["stamp"] == stamp and cached_source["worlds"] and \
+            all(source_stamps.get(path) == used_stamp for path, used_stamp in cached_source["uses"].items()) and \
+            not any(game in _world_types for game in cached_source["worlds"]):
+        _world_types.add_pending({game: tuplize_version(info["world_version"])
+                                  for game, info in cached_source["worlds"].items()}, world_source.load)
+        world_info.update(cached_source["worlds"])
+        indexed_sources[world_source.resolved_path] = cached_source
+    elif world_source.load():
+        imported_sources.append((world_source, stamp))
 
-
-from .AutoWorld import AutoWorldRegister
-
-for world_source in world_sources:
-    if not world_source.is_zip:
-        # look for manifest
-        manifest = {}
-        for dirpath, dirnames, filenames in os.walk(world_source.resolved_path):
-            for file in filenames:
-                if file.endswith("archipelago.json"):
-                    with open(os.path.join(dirpath, file), mode="r", encoding="utf-8") as manifest_file:
-                        manifest = json.load(manifest_file)
-                    break
-            if manifest:
+for world_source, _ in imported_sources:
+    # look for manifest
+    manifest = {}
+    for dirpath, dirnames, filenames in os.walk(world_source.resolved_path):
+        for file in filenames:
+            if file.endswith("archipelago.json"):
+                with open(os.path.join(dirpath, file), mode="r", encoding="utf-8") as manifest_file:
+                    manifest = json.load(manifest_file)
                 break
-        game = manifest.get("game")
-        if game in AutoWorldRegister.world_types:
-            AutoWorldRegister.world_types[game].world_version = tuplize_version(manifest.get("world_version", "0.0.0"))
+        if manifest:
+            break
+    game = manifest.get("game")
+    if game in AutoWorldRegister.world_types:
+        AutoWorldRegister.world_types[game].world_version = tuplize_version(manifest.get("world_version", "0.0.0"))
 
 if apworlds:
     # encapsulation for namespace / gc purposes
@@ -191,8 +334,48 @@ if apworlds:
 
 del apworlds
 
-# Build the data package for each game.
-network_data_package: DataPackage = {
-    "games": {world_name: world.get_data_package_data() for world_name, world in AutoWorldRegister.world_types.items()},
-}
+# only worlds that got imported need their info collected, pending worlds are never listed by the raw dict
+for game, world in dict.items(_world_types):
+    if world and game not in world_info:
+        world_info[game] = get_world_info(world)
+
+if imported_sources or indexed_sources.keys() != cached_sources.keys():
+    sources_by_module = {world_source.module_name: world_source.resolved_path for world_source in world_sources}
+    # other worlds each world uses, including the ones used through them
+    used_sources: Dict[str, Set[str]] = {path: set(indexed_source["uses"])
+                                         for path, indexed_source in indexed_sources.items()}
+    for world_source, _ in imported_sources:
+        used_sources[world_source.resolved_path] = {sources_by_module[module]
+                                                    for module in get_used_worlds(world_source)
+                                                    if module in sources_by_module}
+    for world_source, stamp in imported_sources:
+        module = world_source.module_name
+        uses: Set[str] = set()
+        unvisited = set(used_sources[world_source.resolved_path])
+        while unvisited:
+            path = unvisited.pop()
+            uses.add(path)
+            unvisited |= used_sources.get(path, set()) - uses
+        uses.discard(world_source.resolved_path)
+        indexed_sources[world_source.resolved_path] = {
+            "stamp": stamp,
+            "uses": {path: source_stamps[path] for path in sorted(uses)},
+            "worlds": {game: world_info[game] for game, world in dict.items(_world_types)
+                       if world and (world.__module__ == module or world.__module__.startswith(f"{module}."))},
+        }
+    write_world_index(core_stamp, indexed_sources)
 
+del core_stamp, cached_sources, indexed_sources, imported_sources, source_stamps
+
+
+def load_all_worlds() -> None:
+    """
+    Import all worlds that are still pending from the world index. Needed by anything relying on the side effects of
+    importing a world, like registering launcher components, clients or patch handlers.
+    """
+    _world_types.load_all()
+
+
+# Build the data package for each game.
+network_data_package["games"].update(
+    (game, dict(world_info[game]["data_package"])) for game in AutoWorldRegister.world_types.keys())
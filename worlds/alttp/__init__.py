@@ -132,6 +132,8 @@ class ALTTPWorld(World):
     Ganon!
     """
     game = "A Link to the Past"
+    output_attributes = ("rom_name",)
+    output_events = ("rom_name_available_event",)
     options_dataclass = ALTTPOptions
     options: ALTTPOptions
     settings_key = "lttp_options"
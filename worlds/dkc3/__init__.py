@@ -53,6 +53,8 @@ class DKC3World(World):
     mystery of why Donkey Kong and Diddy disappeared while on vacation.
     """
     game: str = "Donkey Kong Country 3"
+    output_attributes = ("rom_name",)
+    output_events = ("rom_name_available_event",)
     settings: typing.ClassVar[DK3Settings]
 
     options_dataclass = DKC3Options
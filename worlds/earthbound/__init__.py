@@ -67,6 +67,7 @@ class EarthBoundWorld(World):
        across the world in search of 8 Melodies to defeat Giygas, the cosmic evil."""
     
     game = "EarthBound"
+    thread_only_output = True  # generate_output sets the area levels that the spoiler writes
     option_definitions = EBOptions
     data_version = 1
     required_client_version = (0, 5, 0) 
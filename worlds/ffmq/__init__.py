@@ -53,6 +53,8 @@ class FFMQWorld(World):
     # -Giga Otomia
 
     game = "Final Fantasy Mystic Quest"
+    output_attributes = ("rom_name",)
+    output_events = ("rom_name_available_event",)
 
     item_name_to_id = {name: data.id for name, data in item_table.items() if data.id is not None}
     location_name_to_id = location_table
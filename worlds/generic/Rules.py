@@ -96,20 +96,278 @@ def exclusion_rules(multiworld: MultiWorld, player: int, exclude_locations: typi
                 logging.warning(f"Unable to exclude location {loc_name} in player {player}'s world.")
 
 
-def set_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule):
-    spot.access_rule = rule
+class Rule:
+    """
+    Access rule node. set_rule and add_rule flatten trees of these into a single compiled function, so that combining
+    many rules costs no extra call per layer. Any other callable is kept as an opaque leaf.
+    """
+    __slots__ = ("_compiled",)
+    _compiled: typing.Optional[CollectionRule]
+
+    def __init__(self) -> None:
+        self._compiled = None
+
+    def __call__(self, state: "BaseClasses.CollectionState") -> bool:
+        return self.compile()(state)
+
+    def __and__(self, other: typing.Union["Rule", CollectionRule]) -> "Rule":
+        return And(self, other)
+
+    def __or__(self, other: typing.Union["Rule", CollectionRule]) -> "Rule":
+        return Or(self, other)
+
+    def compile(self) -> CollectionRule:
+        """Returns a single function evaluating this rule, with a `rule` attribute pointing back to it."""
+        if self._compiled is None:
+            bound: typing.Dict[str, typing.Any] = {}
+
+            def bind(value: typing.Any) -> str:
+                name = f"_{len(bound)}"
+                bound[name] = value
+                return name
+
+            function = eval(f"lambda state: {self._expression(bind)}", bound)
+            function.rule = self
+            self._compiled = function
+        return self._compiled
+
+    def _expression(self, bind: typing.Callable[[typing.Any], str]) -> str:
+        """Returns a python expression of `state` evaluating this rule, using bind to reference objects."""
+        raise NotImplementedError
+
+    def item_dependencies(self, player: int, analyse: typing.Callable[[CollectionRule], typing.Optional[
+            typing.FrozenSet[str]]]) -> typing.Optional[typing.FrozenSet[str]]:
+        """Returns the item names of player this rule can depend on, or None if it can depend on anything else."""
+        return None
+
+
+class Constant(Rule):
+    __slots__ = ("value",)
+    value: bool
+
+    def __init__(self, value: bool) -> None:
+        super().__init__()
+        self.value = value
+
+    def _expression(self, bind: typing.Callable[[typing.Any], str]) -> str:
+        return repr(self.value)
+
+    def item_dependencies(self, player, analyse):
+        return frozenset()
+
+    def __repr__(self) -> str:
+        return f"Constant({self.value})"
+
+
+TRUE = Constant(True)
+FALSE = Constant(False)
+
+
+class Has(Rule):
+    __slots__ = ("item", "player", "count")
+    item: str
+    player: int
+    count: int
+
+    def __init__(self, item: str, player: int, count: int = 1) -> None:
+        super().__init__()
+        self.item = item
+        self.player = int(player)
+        self.count = int(count)
+
+    def _expression(self, bind: typing.Callable[[typing.Any], str]) -> str:
+        return f"state.prog_items[{self.player}][{bind(self.item)}] >= {self.count}"
+
+    def item_dependencies(self, player, analyse):
+        return frozenset((self.item,)) if player == self.player else None
+
+    def __repr__(self) -> str:
+        return f"Has({self.item!r}, {self.player}, {self.count})"
+
+
+class HasAll(Rule):
+    __slots__ = ("items", "player")
+    items: typing.Tuple[str, ...]
+    player: int
+
+    def __init__(self, items: typing.Iterable[str], player: int) -> None:
+        super().__init__()
+        self.items = tuple(items)
+        self.player = int(player)
 
+    def _expression(self, bind: typing.Callable[[typing.Any], str]) -> str:
+        return f"state.has_all({bind(self.items)}, {self.player})"
 
-def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: CollectionRule, combine="and"):
+    def item_dependencies(self, player, analyse):
+        return frozenset(self.items) if player == self.player else None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.items!r}, {self.player})"
+
+
+class HasAny(HasAll):
+    __slots__ = ()
+
+    def _expression(self, bind: typing.Callable[[typing.Any], str]) -> str:
+        return f"state.has_any({bind(self.items)}, {self.player})"
+
+
+class CanReach(Rule):
+    __slots__ = ("spot", "resolution_hint", "player")
+    spot: str
+    resolution_hint: str
+    player: int
+
+    def __init__(self, spot: str, resolution_hint: str, player: int) -> None:
+        super().__init__()
+        self.spot = spot
+        self.resolution_hint = resolution_hint
+        self.player = int(player)
+
+    def _expression(self, bind: typing.Callable[[typing.Any], str]) -> str:
+        return f"state.can_reach({bind(self.spot)}, {bind(self.resolution_hint)}, {self.player})"
+
+    def __repr__(self) -> str:
+        return f"CanReach({self.spot!r}, {self.resolution_hint!r}, {self.player})"
+
+
+class Opaque(Rule):
+    """Arbitrary callable rule, which is called as is."""
+    __slots__ = ("function",)
+    function: CollectionRule
+
+    def __init__(self, function: CollectionRule) -> None:
+        super().__init__()
+        self.function = function
+
+    def compile(self) -> CollectionRule:
+        return self.function
+
+    def _expression(self, bind: typing.Callable[[typing.Any], str]) -> str:
+        return f"{bind(self.function)}(state)"
+
+    def item_dependencies(self, player, analyse):
+        return analyse(self.function)
+
+    def __repr__(self) -> str:
+        return f"Opaque({self.function!r})"
+
+
+def as_rule(rule: typing.Union[Rule, CollectionRule]) -> Rule:
+    """
+    Returns rule as a Rule node, unwrapping compiled rules, and folding constants to TRUE or FALSE and the default access
+    rules to TRUE.
+    """
+    if isinstance(rule, Constant):
+        return TRUE if rule.value else FALSE
+    if isinstance(rule, Rule):
+        return rule
+    if rule is Location.access_rule or rule is Entrance.access_rule:
+        return TRUE
+    compiled_from = getattr(rule, "rule", None)
+    if isinstance(compiled_from, Rule):
+        return compiled_from
+    return Opaque(rule)
+
+
+class _Combination(Rule):
+    __slots__ = ("rules",)
+    rules: typing.Tuple[Rule, ...]
+    operator: typing.ClassVar[str]
+    absorbing: typing.ClassVar[Constant]
+    """constant that makes the whole combination constant"""
+    neutral: typing.ClassVar[Constant]
+    """constant that doesn't change the combination"""
+
+    def __new__(cls, *rules: typing.Union[Rule, CollectionRule]) -> Rule:
+        flattened: typing.List[Rule] = []
+        for rule in map(as_rule, rules):
+            if type(rule) is cls:
+                flattened.extend(rule.rules)
+            elif rule is cls.absorbing:
+                return rule
+            elif rule is cls.neutral:
+                continue
+            else:
+                flattened.append(rule)
+        if not flattened:
+            return cls.neutral
+        if len(flattened) == 1:
+            return flattened[0]
+        combination = super().__new__(cls)
+        Rule.__init__(combination)
+        combination.rules = tuple(flattened)
+        return combination
+
+    def __init__(self, *rules: typing.Union[Rule, CollectionRule]) -> None:
+        pass  # everything is done in __new__, which may return a different Rule instead
+
+    def _expression(self, bind: typing.Callable[[typing.Any], str]) -> str:
+        return "(" + f" {self.operator} ".join(rule._expression(bind) for rule in self.rules) + ")"
+
+    def item_dependencies(self, player, analyse):
+        dependencies: typing.Set[str] = set()
+        for rule in self.rules:
+            rule_dependencies = rule.item_dependencies(player, analyse)
+            if rule_dependencies is None:
+                return None
+            dependencies |= rule_dependencies
+        return frozenset(dependencies)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join(map(repr, self.rules))})"
+
+
+class And(_Combination):
+    __slots__ = ()
+    operator = "and"
+    absorbing = FALSE
+    neutral = TRUE
+
+
+class Or(_Combination):
+    __slots__ = ()
+    operator = "or"
+    absorbing = TRUE
+    neutral = FALSE
+
+
+def _set_access_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"], rule: Rule) -> None:
+    rule = as_rule(rule)
+    if rule is TRUE:
+        spot.access_rule = Location.access_rule if isinstance(spot, Location) else Entrance.access_rule
+    elif isinstance(rule, Opaque):
+        spot.access_rule = rule.function
+    else:
+        # compiled on first use, so that adding many rules to a spot doesn't compile each intermediate rule
+        def compile_access_rule(state: "BaseClasses.CollectionState") -> bool:
+            function = rule.compile()
+            # the stub may have been copied to another spot, or replaced since, which must keep their rule
+            if spot.access_rule is compile_access_rule:
+                spot.access_rule = function
+            return function(state)
+
+        compile_access_rule.rule = rule
+        spot.access_rule = compile_access_rule
+
+
+def set_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"],
+             rule: typing.Union[Rule, CollectionRule]):
+    if isinstance(rule, Rule):
+        _set_access_rule(spot, rule)
+    else:
+        spot.access_rule = rule
+
+
+def add_rule(spot: typing.Union["BaseClasses.Location", "BaseClasses.Entrance"],
+             rule: typing.Union[Rule, CollectionRule], combine="and"):
     old_rule = spot.access_rule
     # empty rule, replace instead of add
     if old_rule is Location.access_rule or old_rule is Entrance.access_rule:
-        spot.access_rule = rule if combine == "and" else old_rule
-    else:
         if combine == "and":
-            spot.access_rule = lambda state: rule(state) and old_rule(state)
-        else:
-            spot.access_rule = lambda state: rule(state) or old_rule(state)
+            set_rule(spot, rule)
+    else:
+        _set_access_rule(spot, And(rule, old_rule) if combine == "and" else Or(rule, old_rule))
 
 
 def forbid_item(location: "BaseClasses.Location", item: str, player: int):
@@ -62,6 +62,8 @@ class KDL3World(World):
     """
 
     game = "Kirby's Dream Land 3"
+    output_attributes = ("rom_name",)
+    output_events = ("rom_name_available_event",)
     options_dataclass: ClassVar[Type[PerGameCommonOptions]] = KDL3Options
     options: KDL3Options
     item_name_to_id = lookup_item_to_id
@@ -87,6 +87,8 @@ class MM2World(World):
     """
 
     game = "Mega Man 2"
+    output_attributes = ("rom_name",)
+    output_events = ("rom_name_available_event",)
     settings: ClassVar[MM2Settings]
     options_dataclass = MM2Options
     options: MM2Options
@@ -98,6 +98,8 @@ class SMWorld(World):
      between the main Areas!
     """
     game: str = "Super Metroid"
+    output_attributes = ("rom_name",)
+    output_events = ("rom_name_available_event",)
     topology_present = True
     options_dataclass = SMOptions
     options: SMOptions
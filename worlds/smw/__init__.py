@@ -56,6 +56,8 @@ class SMWWorld(World):
     lost all of his abilities. Can he get them back in time to save the Princess?
     """
     game: str = "Super Mario World"
+    output_attributes = ("rom_name",)
+    output_events = ("rom_name_available_event",)
 
     settings: typing.ClassVar[SMWSettings]
 
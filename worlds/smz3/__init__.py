@@ -66,6 +66,8 @@ class SMZ3World(World):
      This is allowed as long as we keep features and logic as close as possible as the original.    
     """
     game: str = "SMZ3"
+    output_attributes = ("rom_name",)
+    output_events = ("rom_name_available_event",)
     topology_present = False
     options_dataclass = SMZ3Options
     options: SMZ3Options
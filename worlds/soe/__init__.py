@@ -173,6 +173,8 @@ class SoEWorld(World):
     space station where the final boss must be defeated.
     """
     game: typing.ClassVar[str] = "Secret of Evermore"
+    output_attributes = ("connect_name",)
+    output_events = ("connect_name_available_event",)
     options_dataclass = SoEOptions
     options: SoEOptions
     settings: typing.ClassVar[SoESettings]
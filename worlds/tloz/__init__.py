@@ -68,6 +68,8 @@ class TLoZWorld(World):
     options: TlozOptions
     settings: typing.ClassVar[TLoZSettings]
     game = "The Legend of Zelda"
+    output_attributes = ("rom_name",)
+    output_events = ("rom_name_available_event",)
     topology_present = False
     base_id = 7000
     web = TLoZWeb()
@@ -49,6 +49,8 @@ class YoshisIslandWorld(World):
     As Yoshi, you must run, jump, and throw eggs to escort the baby Mario across the island to defeat Bowser and reunite the two brothers with their parents.
     """
     game = "Yoshi's Island"
+    output_attributes = ("rom_name",)
+    output_events = ("rom_name_available_event",)
     option_definitions = YoshisIslandOptions
     required_client_version = (0, 4, 4)
 